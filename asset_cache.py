@@ -0,0 +1,141 @@
+"""Content-addressed store of static assets served to the browser across runs.
+
+Doc sites serve the same stylesheets, script bundles and fonts on every page,
+and the browser's own cache is gone when a crawl4ai context closes. With an
+``AssetCache`` on the pool, the route handler answers those requests from
+disk. Only the HTML documents, and assets never seen before, go to the network.
+
+Bodies are stored once per SHA-256 digest under ``objects/``. Each URL has a
+small index entry under ``urls/`` pointing at its digest, so the same bundle
+served from several URLs is stored once. Entries are written with an atomic
+rename, so several crawler processes can share one store.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+CACHE_DIR = Path.home() / ".cache" / "crawl4ai-doc-crawler" / "assets"
+
+# Response headers that describe the transfer rather than the body
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection",
+                 "set-cookie", "date", "age", "expires", "etag", "last-modified"}
+
+
+@dataclass
+class AssetCacheStats:
+    """Lookups answered from disk versus fetched."""
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    bytes_served: int = 0
+    bytes_fetched: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class AssetCache:
+    """Serve cacheable subresources from a local content-addressed store."""
+
+    def __init__(self, root: Path = CACHE_DIR,
+                 resource_types: Tuple[str, ...] = ("stylesheet", "script", "font", "image"),
+                 max_age: float = 7 * 24 * 3600, max_size: int = 20 * 1024 * 1024):
+        """Initialize the store.
+
+        Args:
+            root: Directory holding the objects and URL index
+            resource_types: Playwright resource types served from the store
+            max_age: Seconds before a URL is fetched again
+            max_size: Largest body stored, in bytes
+        """
+        self.root = Path(root)
+        self.resource_types = resource_types
+        self.max_age = max_age
+        self.max_size = max_size
+        self.stats = AssetCacheStats()
+
+    def _index_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.root / "urls" / key[:2] / f"{key}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def cacheable(self, request: Any) -> bool:
+        """Check whether a request is for a static asset the store handles."""
+        return request.method == "GET" and request.resource_type in self.resource_types \
+            and request.url.startswith(("http://", "https://"))
+
+    def get(self, url: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """Look up a URL, returning its index entry and body if fresh."""
+        try:
+            entry = json.loads(self._index_path(url).read_text())
+            if time.time() - entry["stored"] > self.max_age:
+                return None
+            return entry, self._object_path(entry["digest"]).read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        """Store a response body under its digest and point the URL at it."""
+        digest = hashlib.sha256(body).hexdigest()
+        obj = self._object_path(digest)
+        if not obj.exists():
+            _atomic_write(obj, body)
+        entry = {
+            "digest": digest,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+            "stored": time.time(),
+        }
+        _atomic_write(self._index_path(url), json.dumps(entry).encode())
+        self.stats.stored += 1
+
+    async def handle(self, route: Any, request: Any) -> None:
+        """Answer a routed request from the store, fetching and storing it on a miss."""
+        cached = self.get(request.url)
+        if cached:
+            entry, body = cached
+            self.stats.hits += 1
+            self.stats.bytes_served += len(body)
+            await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+            return
+
+        self.stats.misses += 1
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            # Let the browser make the request itself and report any failure
+            await route.continue_()
+            return
+        self.stats.bytes_fetched += len(body)
+        if response.status == 200 and len(body) <= self.max_size:
+            try:
+                self.put(request.url, response.status, response.headers, body)
+            except OSError as e:
+                print(f"Error caching {request.url}: {str(e)}")
+        await route.fulfill(response=response, body=body)
+
+    def report(self) -> None:
+        """Print how many asset requests the store answered."""
+        stats = self.stats
+        if not stats.hits + stats.misses:
+            return
+        print(f"Asset cache: {stats.hits} hits, {stats.misses} misses ({stats.hit_rate:.0%} hit rate), "
+              f"{stats.bytes_served / 1024:.0f} KiB served from disk, "
+              f"{stats.bytes_fetched / 1024:.0f} KiB fetched, {stats.stored} stored")
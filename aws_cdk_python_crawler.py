@@ -6,41 +6,71 @@ import asyncio
 import os
 import json
 import random
-from bs4 import BeautifulSoup
+from typing import List, Optional
 
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+from crawl4ai import BrowserConfig, CrawlerRunConfig
+from browser_pool import BrowserPool, borrow_pool
+from dispatcher import DomainRateLimiter, MemoryAdaptiveDispatcher
+from extraction_rules import load_rules
+from hybrid_fetch import HybridFetcher
+from page_extract import ExtractedPage, ExtractionSpec
+from readiness import ReadinessSpec
+from resource_policy import ResourcePolicy
+from sharding import ShardedRenderer
 
 DEBUG = True
 
 class CDKPythonDocCrawler:
-    def __init__(self, max_concurrent=5):
+    def __init__(self, max_concurrent=5, static_first=True):
         self.base_output_dir = "output"
         self.max_concurrent = max_concurrent
+        self.static_first = static_first  # Try plain HTTP before rendering
         self.semaphore = asyncio.Semaphore(max_concurrent)
         
         # Track visited URLs to prevent infinite loops
         self._visited_urls = set()
         self._processing_urls = set()  # Track URLs being processed
         
+        # Content, links and title are extracted in the page and returned as JSON
+        index_extraction = ExtractionSpec(
+            content_selectors=[".toctree-wrapper"],
+            link_selectors={"links": "a.reference.internal", "modules": "li.toctree-l1 > a"}
+        )
+        page_extraction = ExtractionSpec(
+            content_selectors=["section"],
+            link_selectors={"links": "a[href]"},
+            text_separator="\n\n"
+        )
+        
+        # Link scope for each source, from config/extraction_rules.json
+        self.rules = load_rules("aws_cdk_python")
+        
         # Define sources with extraction strategies
         self.sources = {
             "cdk_python": {
                 "url": "https://docs.aws.amazon.com/cdk/api/v2/python/modules.html",
                 "output_dir": "cdk_python",
+                # Sphinx pages need neither styling nor media to expose their content
+                "resource_policy": ResourcePolicy(
+                    name="cdk_python",
+                    deny_types={"image", "font", "media", "stylesheet"}
+                ),
+                "index_extraction": index_extraction,
+                "page_extraction": page_extraction,
                 "index_config": CrawlerRunConfig(
-                    wait_for="css:.toctree-wrapper",  # Wait for Sphinx toctree
-                    wait_until="networkidle",
+                    # Extract the Sphinx toctree once it is present
+                    js_code=index_extraction.js_code(ReadinessSpec(selector=".toctree-wrapper")),
+                    wait_until="domcontentloaded",
                     process_iframes=True,
                     only_text=False,
-                    css_selector=".toctree-wrapper",  # Get Sphinx toctree
                     page_timeout=120000  # 120 seconds timeout
                 ),
                 "page_config": CrawlerRunConfig(
-                    wait_for="css:section",  # Wait for content section
-                    wait_until="networkidle",
+                    # Extract the content section once it is present
+                    js_code=page_extraction.js_code(ReadinessSpec(selector="section")),
+                    wait_until="domcontentloaded",
                     process_iframes=True,
                     only_text=False,
-                    css_selector="section",  # Get content section
                     page_timeout=120000  # 120 seconds timeout
                 )
             }
@@ -80,30 +110,19 @@ class CDKPythonDocCrawler:
     
     def _is_valid_cdk_link(self, url: str) -> bool:
         """Check if URL is a valid CDK documentation link."""
-        return (
-            'docs.aws.amazon.com/cdk/api/v2/python' in url and
-            not any(x in url.lower() for x in [
-                'privacy', 'terms', 'conditions', 'contributing',
-                'license', 'notice', 'readme', 'changelog'
-            ]) and
-            not url.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg')) and
-            '#' not in url
-        )
+        return self.rules["cdk_python"].in_scope(url)
     
-    def _is_404_page(self, soup: BeautifulSoup) -> bool:
+    def _is_404_page(self, page: ExtractedPage) -> bool:
         """Check if the page is a 404 error page."""
         # Check for AWS 404 page indicators
-        meta_page_type = soup.find('meta', {'name': 'page-type'})
-        if meta_page_type and meta_page_type.get('content') == 'errorPage':
+        if page.page_type == 'errorPage':
             return True
         
         # Check for common 404 indicators
-        title = soup.find('title')
-        if title and any(x in title.text.lower() for x in ['404', 'not found', 'error']):
+        if page.title and any(x in page.title.lower() for x in ['404', 'not found', 'error']):
             return True
         
-        h1 = soup.find('h1')
-        if h1 and any(x in h1.text.lower() for x in ['looking for something', '404', 'not found']):
+        if page.h1 and any(x in page.h1.lower() for x in ['looking for something', '404', 'not found']):
             return True
         
         return False
@@ -125,7 +144,111 @@ class CDKPythonDocCrawler:
         print(f"All {max_retries} attempts failed. Last error: {str(last_error)}")
         raise last_error
     
-    async def process_page(self, source_key: str, crawler: AsyncWebCrawler, url: str = None):
+    def _process_result(self, source_key: str, url: str, result) -> Optional[List[str]]:
+        """Extract and save a loaded page.
+
+        Returns:
+            Optional[List[str]]: Newly discovered links, or None if the page was unusable
+        """
+        is_index = 'modules.html' in url
+        
+        if not result or not result.success:
+            print(f"Failed to load {url}: {result.error_message if result else 'no result'}")
+            return None
+        
+        # Read the extracted page
+        source = self.sources[source_key]
+        extraction = source["index_extraction"] if is_index else source["page_extraction"]
+        page = extraction.extract(result, url)
+        if page is None:
+            print(f"Nothing extracted from {url}")
+            return None
+        
+        # Check for 404 page
+        if self._is_404_page(page):
+            print(f"Skipping 404 page: {url}")
+            return None
+        
+        discovered_links = []
+        if is_index:
+            # For index page, look for toctree entries
+            if not page.found:
+                print(f"No toctree found in {url}")
+                if DEBUG:
+                    print(f"Page title: {page.title!r}, heading: {page.h1!r}")
+                return None
+            
+            # Process toctree links
+            for link in page.links["links"]:
+                href = link['href']
+                if href and not href.startswith(('#', 'javascript:')):
+                    abs_url = self._normalize_url(url, href)
+                    if (abs_url not in self._visited_urls and 
+                        abs_url not in self._processing_urls and 
+                        self._is_valid_cdk_link(abs_url)):
+                        discovered_links.append(abs_url)
+                        print(f"Found link: {abs_url}")
+            
+            # Save index content
+            content = "# AWS CDK Python Modules\n\n"
+            for module_link in page.links["modules"]:
+                content += f"- [{module_link['text']}]({module_link['href']})\n"
+            
+            self.save_markdown(source_key, "index", content)
+            self.save_json(source_key, "index", {
+                "url": url,
+                "module_name": "index",
+                "content": content,
+                "links": discovered_links,
+                "timestamp": datetime.now().isoformat(),
+                "type": "index"
+            })
+        else:
+            # For content pages, look for section content
+            if not page.found:
+                print(f"No content found in {url}")
+                if DEBUG:
+                    print(f"Page title: {page.title!r}, heading: {page.h1!r}")
+                return None
+            
+            # Process content links
+            for link in page.links["links"]:
+                href = link['href']
+                if href and not href.startswith(('#', 'javascript:')):
+                    abs_url = self._normalize_url(url, href)
+                    if (abs_url not in self._visited_urls and 
+                        abs_url not in self._processing_urls and 
+                        self._is_valid_cdk_link(abs_url)):
+                        discovered_links.append(abs_url)
+                        print(f"Found link: {abs_url}")
+            
+            # Save content
+            module_name = os.path.splitext(os.path.basename(url))[0]
+            content = page.text
+            
+            # Save as markdown with better formatting
+            markdown_content = f"""# {module_name}
+
+Source: {url}
+
+{content}
+"""
+            self.save_markdown(source_key, module_name, markdown_content)
+            
+            # Save as JSON with additional metadata
+            data = {
+                "url": url,
+                "module_name": module_name,
+                "content": content,
+                "links": discovered_links,
+                "timestamp": datetime.now().isoformat(),
+                "type": "module"
+            }
+            self.save_json(source_key, module_name, data)
+        
+        return discovered_links
+    
+    async def process_page(self, source_key: str, crawler: HybridFetcher, url: str = None):
         """Process a single page with improved error handling."""
         source = self.sources[source_key]
         if url is None:
@@ -153,114 +276,15 @@ class CDKPythonDocCrawler:
                     crawler.arun,
                     url=url,
                     config=config,
+                    resource_policy=source["resource_policy"],
+                    reuse_tab=True,
                     max_retries=3
                 )
                 
-                if not result.success:
-                    print(f"Failed to load {url}: {result.error_message}")
-                    return []
-                
-                # Parse HTML content
-                soup = BeautifulSoup(result.html, 'html.parser')
-                
-                # Check for 404 page
-                if self._is_404_page(soup):
-                    print(f"Skipping 404 page: {url}")
+                discovered_links = self._process_result(source_key, url, result)
+                if discovered_links is None:
                     return []
                 
-                discovered_links = []
-                if is_index:
-                    # For index page, look for toctree entries
-                    content_div = soup.select_one('.toctree-wrapper')
-                    if not content_div:
-                        print(f"No toctree found in {url}")
-                        if DEBUG:
-                            print("\nAvailable classes:")
-                            for elem in soup.find_all(class_=True):
-                                classes = elem.get('class', [])
-                                if isinstance(classes, list):
-                                    print(f"Found element with classes: {' '.join(classes)}")
-                                else:
-                                    print(f"Found element with class: {classes}")
-                        return []
-                    
-                    # Process toctree links
-                    for link in content_div.select('a.reference.internal'):
-                        href = link.get('href', '')
-                        if href and not href.startswith(('#', 'javascript:')):
-                            abs_url = self._normalize_url(url, href)
-                            if (abs_url not in self._visited_urls and 
-                                abs_url not in self._processing_urls and 
-                                self._is_valid_cdk_link(abs_url)):
-                                discovered_links.append(abs_url)
-                                print(f"Found link: {abs_url}")
-                    
-                    # Save index content
-                    content = "# AWS CDK Python Modules\n\n"
-                    for link in content_div.select('li.toctree-l1'):
-                        module_link = link.find('a')
-                        if module_link:
-                            content += f"- [{module_link.get_text()}]({module_link.get('href', '')})\n"
-                    
-                    self.save_markdown(source_key, "index", content)
-                    self.save_json(source_key, "index", {
-                        "url": url,
-                        "module_name": "index",
-                        "content": content,
-                        "links": discovered_links,
-                        "timestamp": datetime.now().isoformat(),
-                        "type": "index"
-                    })
-                else:
-                    # For content pages, look for section content
-                    content_div = soup.select_one('section')
-                    if not content_div:
-                        print(f"No content found in {url}")
-                        if DEBUG:
-                            print("\nAvailable classes:")
-                            for elem in soup.find_all(class_=True):
-                                classes = elem.get('class', [])
-                                if isinstance(classes, list):
-                                    print(f"Found element with classes: {' '.join(classes)}")
-                                else:
-                                    print(f"Found element with class: {classes}")
-                        return []
-                    
-                    # Process content links
-                    for link in content_div.find_all('a'):
-                        href = link.get('href', '')
-                        if href and not href.startswith(('#', 'javascript:')):
-                            abs_url = self._normalize_url(url, href)
-                            if (abs_url not in self._visited_urls and 
-                                abs_url not in self._processing_urls and 
-                                self._is_valid_cdk_link(abs_url)):
-                                discovered_links.append(abs_url)
-                                print(f"Found link: {abs_url}")
-                    
-                    # Save content
-                    module_name = os.path.splitext(os.path.basename(url))[0]
-                    content = content_div.get_text(separator='\n\n', strip=True)
-                    
-                    # Save as markdown with better formatting
-                    markdown_content = f"""# {module_name}
-
-Source: {url}
-
-{content}
-"""
-                    self.save_markdown(source_key, module_name, markdown_content)
-                    
-                    # Save as JSON with additional metadata
-                    data = {
-                        "url": url,
-                        "module_name": module_name,
-                        "content": content,
-                        "links": discovered_links,
-                        "timestamp": datetime.now().isoformat(),
-                        "type": "module"
-                    }
-                    self.save_json(source_key, module_name, data)
-                
                 # Mark as visited after successful processing
                 self._visited_urls.add(url)
                 self._processing_urls.remove(url)
@@ -276,21 +300,74 @@ Source: {url}
             # Ensure URL is removed from processing set even if an error occurs
             self._processing_urls.discard(url)
     
-    async def crawl(self):
-        """Crawl AWS CDK Python documentation."""
+    async def process_batched(self, source_key: str, crawler: HybridFetcher, urls: List[str]):
+        """Process pages level by level, rendering each level as one dispatched batch.
+
+        Results are extracted and saved as they stream in while the rest of the
+        batch is still rendering; links they reveal form the next batch.
+        """
+        source = self.sources[source_key]
+        dispatcher = MemoryAdaptiveDispatcher(
+            max_session_permit=self.max_concurrent,
+            rate_limiter=DomainRateLimiter(base_delay=(0.05, 0.2))
+        )
+        
+        def next_batch(candidates: List[str]) -> List[str]:
+            return [url for url in dict.fromkeys(candidates)
+                    if url not in self._visited_urls and
+                    url not in self._processing_urls and
+                    self._is_valid_cdk_link(url)]
+        
+        batch = next_batch(urls)
+        while batch:
+            print(f"\nRendering batch of {len(batch)} pages")
+            self._processing_urls.update(batch)
+            discovered = []
+            async for url, result in crawler.arun_many(
+                    batch,
+                    config_for=lambda page_url: source["index_config"] if 'modules.html' in page_url else source["page_config"],
+                    dispatcher=dispatcher,
+                    resource_policy=source["resource_policy"],
+                    reuse_tab=True):
+                try:
+                    links = self._process_result(source_key, url, result)
+                    if links is not None:
+                        self._visited_urls.add(url)
+                        discovered.extend(links)
+                except Exception as e:
+                    print(f"Error processing {url}: {str(e)}")
+                    import traceback
+                    traceback.print_exc()
+                finally:
+                    self._processing_urls.discard(url)
+            batch = next_batch(discovered)
+        
+        dispatcher.report()
+    
+    async def crawl(self, pool: Optional[BrowserPool] = None, batched: bool = True):
+        """Crawl AWS CDK Python documentation.
+
+        Args:
+            pool: Shared browser pool; a private one is opened if omitted
+            batched: Render through the dispatcher in batches instead of gathering tasks per level
+        """
         browser_config = BrowserConfig(
             headless=True,
             ignore_https_errors=True
         )
         
-        async with AsyncWebCrawler(
-            browser_config=browser_config,
-            max_concurrent_pages=self.max_concurrent
-        ) as crawler:
+        # Sphinx pages are complete without JavaScript so try plain HTTP first
+        async with borrow_pool(pool, browser_config=browser_config, pool_size=self.max_concurrent) as browser, \
+                HybridFetcher(browser, "cdk_python", selectors=[".toctree-wrapper", "section"],
+                              static_first=self.static_first) as crawler:
             try:
                 # Start with the index page
                 links_to_process = await self.process_page("cdk_python", crawler)
                 
+                if batched:
+                    await self.process_batched("cdk_python", crawler, links_to_process)
+                    return
+                
                 # Process discovered links in parallel
                 while links_to_process:
                     # Process links in parallel
@@ -320,6 +397,20 @@ Source: {url}
                 import traceback
                 traceback.print_exc()
 
+async def _main(args):
+    if not args.shards:
+        crawler = CDKPythonDocCrawler(max_concurrent=args.concurrency)
+        await crawler.crawl()
+        return
+    # Keep every shard busy: allow one in-flight page per render slot
+    crawler = CDKPythonDocCrawler(max_concurrent=args.shards * args.concurrency)
+    async with ShardedRenderer(num_shards=args.shards, pool_size=args.concurrency) as renderer:
+        await crawler.crawl(pool=renderer)
+
 if __name__ == "__main__":
-    crawler = CDKPythonDocCrawler(max_concurrent=5)  # Process 5 pages concurrently
-    asyncio.run(crawler.crawl())
+    import argparse
+    parser = argparse.ArgumentParser(description='Crawl the AWS CDK Python docs.')
+    parser.add_argument('--concurrency', type=int, default=5, help='Pages processed at once (per shard when sharded)')
+    parser.add_argument('--shards', type=int, default=0, help='Render in this many browser processes')
+    asyncio.run(_main(parser.parse_args()))
+
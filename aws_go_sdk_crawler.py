@@ -8,9 +8,12 @@ import os
 import json
 import time
 import random
-from bs4 import BeautifulSoup
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
-from base import BaseDocCrawler, SDKConfig
+from html_parser import make_soup
+from crawl4ai import BrowserConfig, CrawlerRunConfig
+from base import BaseDocCrawler, RateLimiter, SDKConfig
+from browser_pool import BrowserPool, borrow_pool
+from readiness import ReadinessSpec
+from resource_policy import ResourcePolicy
 
 class GoSDKCrawler(BaseDocCrawler):
     """Crawler for AWS Go SDK v2 documentation using native Crawl4AI methods."""
@@ -33,23 +36,28 @@ class GoSDKCrawler(BaseDocCrawler):
             "gosdk_aws": {
                 "url": "https://pkg.go.dev/github.com/aws/aws-sdk-go-v2/service",
                 "output_dir": "gosdk_aws",
+                # pkg.go.dev renders server-side; styling and media are never needed
+                "resource_policy": ResourcePolicy(
+                    name="gosdk_aws",
+                    deny_types={"image", "font", "media", "stylesheet"}
+                ),
                 "service_list_config": CrawlerRunConfig(
-                    wait_for="css:.Documentation-content",  # Wait for documentation content
-                    wait_until="networkidle",
+                    wait_for=ReadinessSpec(selector=".Documentation-content").wait_for(),  # Documentation content present
+                    wait_until="domcontentloaded",
                     process_iframes=True,
                     only_text=False,
                     css_selector=".Documentation-content"  # Get documentation content
                 ),
                 "service_config": CrawlerRunConfig(
-                    wait_for="css:.Documentation-content",
-                    wait_until="networkidle",
+                    wait_for=ReadinessSpec(selector=".Documentation-content").wait_for(),
+                    wait_until="domcontentloaded",
                     process_iframes=True,
                     only_text=False,
                     css_selector=".Documentation-content"
                 ),
                 "operation_config": CrawlerRunConfig(
-                    wait_for="css:.Documentation-content",
-                    wait_until="networkidle",
+                    wait_for=ReadinessSpec(selector=".Documentation-content").wait_for(),
+                    wait_until="domcontentloaded",
                     process_iframes=True,
                     only_text=False,
                     css_selector=".Documentation-content"
@@ -97,7 +105,7 @@ class GoSDKCrawler(BaseDocCrawler):
                 print(f"Attempt {attempt + 1} failed: {str(e)}. Retrying in {wait_time:.2f}s...")
                 await asyncio.sleep(wait_time)
 
-    async def process_page(self, source_key: str, crawler: AsyncWebCrawler, url: str):
+    async def process_page(self, source_key: str, crawler: BrowserPool, url: str):
         """Process a single page with improved error handling."""
         if url in self._visited_urls:
             return
@@ -124,6 +132,7 @@ class GoSDKCrawler(BaseDocCrawler):
                 crawler.arun,
                 url=url,
                 config=config,
+                resource_policy=source["resource_policy"],
                 max_retries=3
             )
             
@@ -131,7 +140,7 @@ class GoSDKCrawler(BaseDocCrawler):
                 print(f"Failed to load {url}: {result.error_message}")
                 return
             
-            soup = BeautifulSoup(result.html, 'html.parser')
+            soup = make_soup(result.html)
             
             if page_type == "service_list":
                 # Process service list page
@@ -177,18 +186,24 @@ class GoSDKCrawler(BaseDocCrawler):
             import traceback
             traceback.print_exc()
     
-    async def crawl(self):
-        """Crawl all AWS Go SDK v2 documentation."""
+    async def crawl(self, pool: Optional[BrowserPool] = None):
+        """Crawl all AWS Go SDK v2 documentation.
+
+        Args:
+            pool: Shared browser pool; a private one is opened if omitted
+        """
         browser_config = BrowserConfig(
             headless=True,
             ignore_https_errors=True,
             timeout=60000  # Increase timeout to 60 seconds
         )
         
-        async with AsyncWebCrawler(
-            browser_config=browser_config,
-            max_concurrent_pages=1  # Reduce concurrency to prevent timing issues
-        ) as crawler:
+        # pkg.go.dev throttles bursts; the limiter only sleeps for whatever part
+        # of the interval the previous render didn't already use
+        limiter = RateLimiter(requests_per_second=1)
+        
+        # Reduce concurrency to prevent timing issues
+        async with borrow_pool(pool, browser_config=browser_config, pool_size=1) as crawler:
             for source_key, source in self.sources.items():
                 # Start with the service list
                 await self._pending_urls.put(source["url"])
@@ -196,9 +211,8 @@ class GoSDKCrawler(BaseDocCrawler):
                 while not self._pending_urls.empty():
                     url = await self._pending_urls.get()
                     try:
+                        await limiter.wait()
                         await self.process_page(source_key, crawler, url)
-                        # Add small delay between requests
-                        await asyncio.sleep(1)
                     except Exception as e:
                         print(f"Error crawling {url}: {str(e)}")
                     finally:
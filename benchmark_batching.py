@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+"""Compare dispatched arun_many batches against hand-rolled gather loops.
+
+Discovers pages from a source's index, then renders the same pages twice on a
+fresh browser pool each time: once as one ``asyncio.gather`` task per URL (how
+the Boto3 and CDK crawlers used to work) and once through
+``BrowserPool.arun_many`` with the memory-adaptive dispatcher. Reports
+pages/minute, time to first result and failures for each mode.
+
+Usage:
+    python benchmark_batching.py --source cdk_python --pages 60 --pool-size 5
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from aws_cdk_python_crawler import CDKPythonDocCrawler
+from boto3_crawler import Boto3DocCrawler
+from browser_pool import BrowserPool
+from dispatcher import DomainRateLimiter, MemoryAdaptiveDispatcher
+from result_adapter import adapt_result
+
+# Crawler, link filter and the extraction spec used on the index page, if any;
+# sources without one take their links from the crawl result
+SOURCES = {
+    "cdk_python": (CDKPythonDocCrawler, "cdk/api/v2/python/aws_cdk.", "index_extraction"),
+    "boto3": (Boto3DocCrawler, "/documentation/api/latest/reference/services/", None),
+}
+
+
+async def discover(source: Dict[str, Any], extraction: Optional[str], url_filter: str, limit: int) -> List[str]:
+    """Render the index page and take the first matching links."""
+    async with BrowserPool(pool_size=1) as pool:
+        result = await pool.arun(url=source["url"], config=source["index_config"],
+                                 resource_policy=source["resource_policy"])
+    if extraction:
+        page = source[extraction].extract(result, source["url"])
+        hrefs = [link['url'] for link in page.links.get("links", [])] if page else []
+    else:
+        page = adapt_result(result, source["url"], source["index_config"])
+        hrefs = [link['href'] for link in page.internal_links()] if page else []
+    urls = []
+    for href in hrefs:
+        href = href.split('#')[0]
+        if url_filter in href and href not in urls and href != source["url"]:
+            urls.append(href)
+    return urls[:limit]
+
+
+async def run_gather(source: Dict[str, Any], urls: List[str], pool_size: int) -> Dict[str, Any]:
+    """Render every URL as its own task and gather them all."""
+    first = None
+    start = time.perf_counter()
+
+    async with BrowserPool(pool_size=pool_size) as pool:
+        async def render(url: str):
+            nonlocal first
+            try:
+                result = await pool.arun(url=url, config=source["page_config"],
+                                         resource_policy=source["resource_policy"])
+            except Exception:
+                result = None
+            if first is None:
+                first = time.perf_counter() - start
+            return result
+
+        results = await asyncio.gather(*(render(url) for url in urls))
+        elapsed = time.perf_counter() - start
+
+    failed = sum(1 for r in results if r is None or not r.success)
+    return {"elapsed": elapsed, "first": first or 0.0, "failed": failed}
+
+
+async def run_dispatched(source: Dict[str, Any], urls: List[str], pool_size: int) -> Dict[str, Any]:
+    """Render the URLs as one dispatched batch, consuming results as a stream."""
+    first = None
+    failed = 0
+    dispatcher = MemoryAdaptiveDispatcher(max_session_permit=pool_size,
+                                          rate_limiter=DomainRateLimiter(base_delay=(0.05, 0.2)))
+    start = time.perf_counter()
+
+    async with BrowserPool(pool_size=pool_size) as pool:
+        async for url, result in pool.arun_many(urls, config=source["page_config"], dispatcher=dispatcher,
+                                                resource_policy=source["resource_policy"]):
+            if first is None:
+                first = time.perf_counter() - start
+            if result is None or not result.success:
+                failed += 1
+        elapsed = time.perf_counter() - start
+
+    dispatcher.report()
+    return {"elapsed": elapsed, "first": first or 0.0, "failed": failed}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched rendering against gather loops.')
+    parser.add_argument('--source', choices=sorted(SOURCES), default='cdk_python', help='Source to sample pages from')
+    parser.add_argument('--pages', type=int, default=60, help='Number of pages to render in each mode')
+    parser.add_argument('--pool-size', type=int, default=5, help='Pages rendering at once')
+    args = parser.parse_args()
+
+    crawler_class, url_filter, extraction = SOURCES[args.source]
+    source = crawler_class().sources[args.source]
+
+    urls = await discover(source, extraction, url_filter, args.pages)
+    if not urls:
+        print(f"No pages discovered from {source['url']}")
+        return
+    print(f"Benchmarking {len(urls)} pages from {args.source} (pool size {args.pool_size})")
+
+    results = {
+        "gather": await run_gather(source, urls, args.pool_size),
+        "arun_many": await run_dispatched(source, urls, args.pool_size),
+    }
+
+    print(f"\n{'mode':<10} {'pages/min':>10} {'first (s)':>10} {'total (s)':>10} {'failed':>7}")
+    for mode, stats in results.items():
+        pages_per_minute = len(urls) / stats["elapsed"] * 60 if stats["elapsed"] else 0.0
+        print(f"{mode:<10} {pages_per_minute:10.1f} {stats['first']:10.2f} "
+              f"{stats['elapsed']:10.2f} {stats['failed']:7d}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
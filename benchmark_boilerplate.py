@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""Measure what boilerplate learning strips from a site's pages, and what it costs.
+
+A ``BoilerplateLearner`` learns from the first pages given, then strips every
+page after them. For each stripped page the script prints the markup and text
+left, the time fingerprinting and stripping took, and the time converting the
+page to Markdown took before and after stripping. The subtrees learned as
+template are listed with the text they start with, so a subtree that should
+have been kept is easy to spot.
+
+Pages must all come from one site. Without arguments a generated site is
+used: pages sharing a large navigation sidebar, a header and a footer, each
+with its own content.
+
+Usage:
+    python benchmark_boilerplate.py
+    python benchmark_boilerplate.py --learn-pages 10 saved_site/*.html
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from boilerplate import LEARN_PAGES, BoilerplateLearner
+from html_parser import make_soup
+from markdown_convert import tree_to_markdown
+
+SIDEBAR_LINKS = 800
+
+
+def synthetic_site(pages: int) -> List[Tuple[str, str]]:
+    """Pages sharing a header, a navigation sidebar and a footer, each with its own content."""
+    sidebar = "".join(f"<li><a href='/docs/page_{i}.html'>Service page {i}</a></li>" for i in range(SIDEBAR_LINKS))
+    site = []
+    for n in range(pages):
+        content = "".join(f"<h2>Operation {n}.{i}</h2><p>Creates resource {n}.{i}, returning its identifier, "
+                          f"status and tags.</p><pre>client.operation_{n}_{i}(Name='example')</pre>"
+                          for i in range(30))
+        site.append((f"page_{n}", f"<html><body><header><div class='brand'>Example Cloud Documentation</div>"
+                                  f"<div class='search'>Search the documentation</div></header>"
+                                  f"<nav class='sidebar'><ul>{sidebar}</ul></nav>"
+                                  f"<main><h1>Page {n}</h1>{content}</main>"
+                                  f"<footer><div>Was this page helpful? Yes No</div>"
+                                  f"<div>Copyright Example Cloud, all rights reserved.</div></footer></body></html>"))
+    return site
+
+
+def timed_markdown(html: str, learner: BoilerplateLearner = None) -> Tuple[float, float, int, int]:
+    """Parse a page, strip it if a learner is given, and convert it to Markdown.
+
+    Returns:
+        Strip time, conversion time, markup length and text length of the converted page
+    """
+    soup = make_soup(html)
+    strip_time = 0.0
+    if learner is not None:
+        start = time.perf_counter()
+        learner.strip(soup)
+        strip_time = time.perf_counter() - start
+    start = time.perf_counter()
+    markdown = tree_to_markdown(soup)
+    return strip_time, time.perf_counter() - start, len(str(soup)), len(markdown)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark boilerplate learning and stripping.')
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages from one site, in crawl order')
+    parser.add_argument('--learn-pages', type=int, default=LEARN_PAGES, help='Pages to learn from')
+    parser.add_argument('--synthetic-pages', type=int, default=20, help='Pages in the generated site')
+    args = parser.parse_args()
+
+    if args.pages:
+        site = [(Path(p).stem, Path(p).read_text(encoding="utf-8", errors="replace")) for p in args.pages]
+    else:
+        site = synthetic_site(args.synthetic_pages)
+    if len(site) <= args.learn_pages:
+        parser.error(f"Need more than {args.learn_pages} pages: the first ones are only learned from")
+
+    learner = BoilerplateLearner(learn_pages=args.learn_pages)
+    for _, html in site[:args.learn_pages]:
+        learner.strip(make_soup(html))
+
+    print(f"\nTemplate subtrees on {site[args.learn_pages][0]}:")
+    for element in learner.fingerprint(make_soup(site[args.learn_pages][1]))[1]:
+        print(f"    <{element.name}> {' '.join(element.get_text().split())[:80]!r}")
+
+    print(f"\n{'page':<28} {'markup kept':>11} {'md kept':>8} {'strip ms':>9} {'md ms before':>13} {'md ms after':>12}")
+    totals = [0.0, 0.0, 0.0]
+    for name, html in site[args.learn_pages:]:
+        _, before_time, before_markup, before_md = timed_markdown(html)
+        strip_time, after_time, after_markup, after_md = timed_markdown(html, learner)
+        totals[0] += strip_time
+        totals[1] += before_time
+        totals[2] += after_time
+        print(f"{name:<28} {after_markup / before_markup:11.0%} {after_md / max(before_md, 1):8.0%} "
+              f"{strip_time * 1000:9.1f} {before_time * 1000:13.1f} {after_time * 1000:12.1f}")
+    print(f"\nConversion {totals[1] * 1000:.0f} ms unstripped, "
+          f"{(totals[0] + totals[2]) * 1000:.0f} ms stripped, fingerprinting included")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""Compare one-pass page cleanup with the loops ``preprocess_html`` used to run.
+
+``CustomExtractionStrategy.preprocess_html`` in crawl_single_page.py used to
+remove unwanted tags, then run a class-substring lambda over every element,
+then call ``get_text(strip=True)`` on every element to drop the empty ones.
+``html_cleanup.prune_tree`` does all three in one walk. For each page the
+script times both on the blog content container and checks that they leave
+the same HTML, exiting non-zero if they don't.
+
+Pages are saved AWS blog pages: by default the ones in ``tests/fixtures/blog``,
+or any given on the command line. ``--synthetic`` adds generated blog posts
+of growing size: deeply nested content with share widgets, comments, images
+and empty layout elements.
+
+Usage:
+    python benchmark_cleanup.py
+    python benchmark_cleanup.py --synthetic
+    python benchmark_cleanup.py saved_blog_pages/*.html
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from html_cleanup import prune_tree
+from html_parser import make_soup
+
+# AWS blog pages saved with the tests
+BLOG_PAGES_DIR = Path(__file__).parent / "tests" / "fixtures" / "blog"
+
+
+def synthetic_post(sections: int, depth: int = 12) -> str:
+    """A blog post with nested layout wrappers, widgets and empty elements around its paragraphs."""
+    body = []
+    for i in range(sections):
+        paragraph = (f"<p>Amazon S3 feature {i} lets you replicate objects across regions, "
+                     f"tag them and query them in place.</p><span class='spacer'></span>"
+                     f"<img src='/img/{i}.png'><pre><code>aws s3 cp file{i} s3://bucket/</code></pre>")
+        nested = "<div class='row'><div class='col'>" * depth + paragraph + "</div></div>" * depth
+        body.append(f"<h2>Section {i}</h2>{nested}<div class='blog-share-buttons'><a>Share</a></div>")
+    comments = "".join(f"<div class='comment'><p>Comment {i}</p></div>" for i in range(50))
+    return (f"<html><head><script>var x = 1;</script></head><body><header>AWS</header>"
+            f"<div id='aws-page-content'><article class='blog-post'><h1>Post title</h1>"
+            f"{''.join(body)}<div class='comments-section'>{comments}</div><div></div></article>"
+            f"<footer>Footer</footer></div></body></html>")
+
+
+def blog_content(html: str) -> BeautifulSoup:
+    """The content container of a blog page in its own tree, as preprocess_html builds it."""
+    soup = make_soup(html)
+    main_content = (soup.find('div', {'id': 'aws-page-content'}) or soup.find('div', {'class': 'blog-post'})
+                    or soup.find('article'))
+    new_soup = make_soup('<html><body></body></html>')
+    if main_content:
+        new_soup.body.append(main_content)
+    return new_soup
+
+
+def old_cleanup(new_soup: BeautifulSoup) -> None:
+    """The loops preprocess_html used before html_cleanup."""
+    for element in new_soup.find_all(['script', 'style', 'noscript', 'iframe', 'nav', 'header', 'footer']):
+        element.decompose()
+    for element in new_soup.find_all(class_=lambda x: x and any(term in str(x).lower() for term in [
+        'cookie', 'navigation', 'header', 'footer', 'sidebar', 'menu', 'banner',
+        'popup', 'modal', 'overlay', 'social', 'share', 'comment'
+    ])):
+        element.decompose()
+    for element in new_soup.find_all():
+        if len(element.get_text(strip=True)) == 0:
+            element.decompose()
+
+
+def timed(cleanup: Callable[[BeautifulSoup], object], html: str, repeat: int) -> Tuple[float, str]:
+    elapsed = 0.0
+    for _ in range(repeat):
+        tree = blog_content(html)
+        start = time.perf_counter()
+        cleanup(tree)
+        elapsed += time.perf_counter() - start
+    return elapsed / repeat, str(tree)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark one-pass page cleanup.')
+    parser.add_argument('pages', nargs='*', help='Saved AWS blog pages to use instead of the fixture pages')
+    parser.add_argument('--synthetic', action='store_true', help='Also clean generated blog posts')
+    parser.add_argument('--repeat', type=int, default=3, help='Times each page is cleaned per method')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.pages] or sorted(BLOG_PAGES_DIR.glob("*.html"))
+    pages: List[Tuple[str, str]] = [(path.stem, path.read_text(encoding="utf-8", errors="replace"))
+                                    for path in paths]
+    if args.synthetic:
+        pages += [(f"synthetic_{n}_sections", synthetic_post(n)) for n in (50, 200, 800)]
+
+    print(f"{'page':<28} {'old ms':>9} {'one pass ms':>12} {'speedup':>8} {'same html':>10}")
+    totals = [0.0, 0.0]
+    identical = True
+    for name, html in pages:
+        old_time, old = timed(old_cleanup, html, args.repeat)
+        new_time, new = timed(prune_tree, html, args.repeat)
+        totals[0] += old_time
+        totals[1] += new_time
+        identical = identical and old == new
+        print(f"{name:<28} {old_time * 1000:9.1f} {new_time * 1000:12.1f} "
+              f"{old_time / max(new_time, 1e-9):7.1f}x {str(old == new):>10}")
+    print(f"\n{totals[0] / max(totals[1], 1e-9):.1f}x faster overall")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+"""Compare the text-density content detector with the old first-large-div fallback.
+
+The old fallback called ``get_text()`` on every ``<div>`` in document order
+and took the first with more than 1000 characters. Each call re-reads the
+div's whole subtree, so nested divs are read once per ancestor, which is
+quadratic in nesting depth. It also tends to pick a page-wide wrapper or a
+navigation list. ``content_detect.find_main_content`` scores every container
+in one pass.
+
+For each page the script prints both pickers' time and the element each one
+chose. Pages are generated ones (a deeply nested page and a page led by a
+large navigation menu), the pages recorded by ``benchmark_parsing.py
+--record``, and any saved HTML files given on the command line.
+
+Usage:
+    python benchmark_content_detect.py
+    python benchmark_content_detect.py --depth 5000 saved_page.html
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from bs4 import Tag
+
+from benchmark_parsing import PAGES_DIR
+from content_detect import find_main_content
+from html_parser import make_soup
+
+MIN_TEXT = 1000
+PARAGRAPH = "<p>Creates a resource in the account, returning its identifier, status and tags.</p>"
+
+
+def nested_page(depth: int) -> str:
+    """An article next to ``depth`` nested divs, none of which holds enough text to qualify."""
+    return (f"<html><body><article>{PARAGRAPH * 20}</article>"
+            f"{'<div>' * depth}<span></span>{'</div>' * depth}</body></html>")
+
+
+def navigation_page(links: int) -> str:
+    """A page led by a large navigation menu, then the content."""
+    nav = "".join(f"<div class='nav-item'><a href='/page/{i}'>Service page {i}</a></div>" for i in range(links))
+    return (f"<html><body><div class='sidebar-nav'>{nav}</div>"
+            f"<div class='document'>{PARAGRAPH * 20}</div></body></html>")
+
+
+def first_large_div(root: Tag) -> Optional[Tag]:
+    """The fallback the crawlers used before ``content_detect``."""
+    for div in root.find_all('div'):
+        if len(div.get_text().strip()) > MIN_TEXT:
+            return div
+    return None
+
+
+def describe(element: Optional[Tag]) -> str:
+    if element is None:
+        return "none"
+    classes = ".".join(element.get("class", []))
+    return f"<{element.name}{'.' + classes if classes else ''}>"
+
+
+def timed(func: Callable[[Tag], Optional[Tag]], root: Tag, repeat: int) -> Tuple[float, Optional[Tag]]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        element = func(root)
+    return (time.perf_counter() - start) / repeat, element
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the content-block fallback.')
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages to add to the generated ones')
+    parser.add_argument('--depth', type=int, default=3000, help='Nesting depth of the generated page')
+    parser.add_argument('--repeat', type=int, default=3, help='Times each picker runs per page')
+    args = parser.parse_args()
+
+    pages: List[Tuple[str, str]] = [
+        (f"nested_{args.depth}", nested_page(args.depth)),
+        ("navigation_3000", navigation_page(3000)),
+    ]
+    paths = [Path(p) for p in args.pages] or sorted(PAGES_DIR.glob("*.html"))
+    pages += [(path.stem, path.read_text(encoding="utf-8", errors="replace")) for path in paths]
+
+    print(f"{'page':<24} {'first div ms':>13} {'detector ms':>12}  picked (first div / detector)")
+    for name, html in pages:
+        soup = make_soup(html)
+        old_time, old = timed(first_large_div, soup, args.repeat)
+        new_time, new = timed(lambda root: find_main_content(root, MIN_TEXT), soup, args.repeat)
+        print(f"{name:<24} {old_time * 1000:13.1f} {new_time * 1000:12.1f}  {describe(old)} / {describe(new)}")
+
+
+if __name__ == "__main__":
+    main()
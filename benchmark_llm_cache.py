@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+"""Measure chunk memoization and request concurrency in ``llm_extract``.
+
+The script starts a stand-in OpenAI-compatible server on localhost. The server
+answers ``/chat/completions`` after a fixed delay, returning one item per
+chunk and token usage counted from the words in the prompt. It then runs the
+same pages through ``LLMExtractor`` four times, each with a fresh stats object:
+
+- cold, one request at a time
+- cold, with ``--concurrency`` requests in flight
+- again, unchanged, so every chunk comes from the cache
+- after editing one paragraph per page, so only the changed chunks are sent
+
+Pages are Markdown files given on the command line. Without arguments
+generated API reference pages are used. Pass ``--base-url`` to run against a
+real OpenAI-compatible server instead; it gets every request of every run.
+
+Usage:
+    python benchmark_llm_cache.py
+    python benchmark_llm_cache.py --concurrency 16 --latency 0.2 saved_pages/*.md
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+
+from llm_extract import ChunkCache, LLMExtractor
+
+
+def synthetic_page(n: int, operations: int = 40) -> str:
+    """An API reference page with one section per operation."""
+    sections = "\n\n".join(
+        f"## Operation{n}_{i}\n\nCreates resource {n}.{i} in the account and returns its identifier, status, "
+        f"creation time and tags. Calls are throttled per account and region.\n\n"
+        f"```python\nclient.operation_{n}_{i}(\n    Name='example',\n\n    Tags=[]\n)\n```"
+        for i in range(operations))
+    return f"# Service {n} API Reference\n\n{sections}\n"
+
+
+def stand_in_server(latency: float) -> ThreadingHTTPServer:
+    """Start a local server answering chat completions after ``latency`` seconds."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            prompt = request['messages'][-1]['content']
+            time.sleep(latency)
+            body = json.dumps({
+                "choices": [{"message": {"role": "assistant",
+                                         "content": json.dumps([{"name": prompt.split("<content>")[1].split()[1],
+                                                                 "price": "0"}])}}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 12}
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run(name: str, pages: Dict[str, str], base_url: str, cache: ChunkCache, concurrency: int,
+              chunk_tokens: int, model: str) -> Dict[str, list]:
+    extractor = LLMExtractor(instruction="Extract each operation's name.",
+                             schema={"type": "object", "properties": {"name": {"type": "string"}}},
+                             model=model, base_url=base_url, max_concurrency=concurrency,
+                             chunk_tokens=chunk_tokens, cache=cache)
+    start = time.perf_counter()
+    async with extractor:
+        results = await extractor.extract_pages(pages)
+    elapsed = time.perf_counter() - start
+    stats = extractor.stats
+    print(f"{name:<24} {elapsed:8.2f}s {stats.chunks:7d} {stats.cached:7d} {stats.requests:9d} "
+          f"{stats.prompt_tokens + stats.completion_tokens:8d} {stats.saved_tokens:7d}")
+    return results
+
+
+async def benchmark(pages: Dict[str, str], base_url: str, args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print(f"{'run':<24} {'time':>9} {'chunks':>7} {'cached':>7} {'requests':>9} {'tokens':>8} {'saved':>7}")
+        options = dict(base_url=base_url, chunk_tokens=args.chunk_tokens, model=args.model)
+        await run("cold, concurrency 1", pages, cache=None, concurrency=1, **options)
+        cold = await run(f"cold, concurrency {args.concurrency}", pages, cache=ChunkCache(cache_dir),
+                         concurrency=args.concurrency, **options)
+        warm = await run("unchanged re-run", pages, cache=ChunkCache(cache_dir),
+                         concurrency=args.concurrency, **options)
+        edited = {url: text.replace("\n\n", "\n\nEdited paragraph.\n\n", 1) for url, text in pages.items()}
+        await run("one edit per page", edited, cache=ChunkCache(cache_dir),
+                  concurrency=args.concurrency, **options)
+        print(f"\nUnchanged re-run returned the same items: {cold == warm}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memoized, concurrent LLM extraction.')
+    parser.add_argument('pages', nargs='*', help='Markdown pages')
+    parser.add_argument('--base-url', help='Real OpenAI-compatible server to use instead of the stand-in')
+    parser.add_argument('--model', default='stand-in', help='Model name sent with requests')
+    parser.add_argument('--latency', type=float, default=0.1, help="Stand-in server's delay per request")
+    parser.add_argument('--concurrency', type=int, default=8, help='Most requests in flight at once')
+    parser.add_argument('--chunk-tokens', type=int, default=1000, help='Largest chunk size in estimated tokens')
+    parser.add_argument('--synthetic-pages', type=int, default=10, help='Generated pages without arguments')
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = {Path(p).name: Path(p).read_text(encoding="utf-8") for p in args.pages}
+    else:
+        pages = {f"https://example.com/service_{n}.html": synthetic_page(n) for n in range(args.synthetic_pages)}
+
+    server: Optional[ThreadingHTTPServer] = None
+    base_url = args.base_url
+    if not base_url:
+        server = stand_in_server(args.latency)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    try:
+        asyncio.run(benchmark(pages, base_url, args))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
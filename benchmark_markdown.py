@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+"""Check ``markdown_convert`` against html2text and compare their throughput.
+
+Every fixture is parsed with ``parse_document``, and its ``<main>`` (or whole
+tree) is converted twice: by ``HTML2Text.handle`` on the serialized element,
+as ``extract_overview`` used to do, and by ``tree_to_markdown`` on the element
+itself. The two must match exactly. Differences are printed as a diff of the
+first lines that disagree, and the script exits non-zero.
+
+The corpus is the fixtures in ``tests/fixtures/markdown``, which cover each
+construct the converter handles, plus the recorded sample pages (or the
+fixture pages, see ``benchmark_parsing.sample_pages``) and any saved HTML
+files given on the command line. ``--random`` adds generated pages nesting
+those constructs at random, converted with both lxml and ``html.parser``.
+
+The reference is the html2text version pinned in pyproject.toml; other
+versions indent code blocks in lists differently.
+
+Usage:
+    python benchmark_markdown.py              # golden check and throughput
+    python benchmark_markdown.py --check      # golden check only
+    python benchmark_markdown.py --check --random 2000
+    python benchmark_markdown.py --repeat 20 saved_page.html
+"""
+
+import argparse
+import difflib
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import html2text
+
+from benchmark_parsing import sample_pages
+from crawler import APIDocCrawler
+from html_parser import parser_available, use_parser
+from markdown_convert import tree_to_markdown
+
+PINNED_HTML2TEXT = (2024, 2, 26)
+
+# HTML snippets covering each construct the converter handles, with html2text's
+# output saved next to each one; tests/test_markdown_convert.py checks them too
+FIXTURES_DIR = Path(__file__).parent / "tests" / "fixtures" / "markdown"
+
+RANDOM_TAGS = ["p", "div", "span", "em", "strong", "b", "i", "u", "code", "kbd", "pre", "a", "img", "ul", "ol", "li",
+               "h1", "h2", "h3", "blockquote", "br", "hr", "table", "tr", "td", "th", "dl", "dt", "dd", "q", "abbr",
+               "del", "section"]
+RANDOM_TEXT = ["word", "two words", " lead", "trail ", "1. item", "- dash", "+ plus", "a &amp; b", "x &lt; y",
+               "back\\slash", "[br]", "(p)", "\n  multi\n line ", "**", "_u_", "&nbsp;", "12.5",
+               "http://e.com/x", "#", "`tick`", "&mdash;"]
+RANDOM_ATTRS = {
+    "a": ['', ' href="https://e.com/a"', ' href="/rel"', ' href="#x"', ' href="http://e.com/x"',
+          ' href="https://e.com/t" title="T"'],
+    "img": ['', ' src="a.png" alt="alt [x]"', ' src="b.png"', ' src="c.png" alt="http://e.com/x"'],
+    "ol": ['', '', ' start="4"'],
+    "abbr": [' title="Title"'],
+}
+
+
+def random_page(rng: random.Random, depth: int = 5) -> str:
+    """A ``<main>`` nesting the converter's constructs at random."""
+    def children(level: int) -> str:
+        out = []
+        for _ in range(rng.randint(0, 4)):
+            if level == 0 or rng.random() < 0.35:
+                out.append(rng.choice(RANDOM_TEXT))
+                continue
+            tag = rng.choice(RANDOM_TAGS)
+            attrs = rng.choice(RANDOM_ATTRS.get(tag, [""]))
+            if tag in ("br", "hr", "img"):
+                out.append(f"<{tag}{attrs}>")
+            else:
+                out.append(f"<{tag}{attrs}>{children(level - 1)}</{tag}>")
+        return "".join(out)
+    return f"<main>{children(depth)}</main>"
+
+
+def load_fixtures() -> List[Tuple[str, str]]:
+    """Read the HTML fixtures, by name."""
+    return [(path.stem, path.read_text(encoding="utf-8")) for path in sorted(FIXTURES_DIR.glob("*.html"))]
+
+
+def golden_source(crawler: APIDocCrawler, html: str):
+    """Parse a fixture the way the crawler does and pick the element to convert."""
+    soup = crawler.parse_document(html)
+    return soup.select_one('main') or soup
+
+
+def check(crawler: APIDocCrawler, corpus: List[Tuple[str, str]]) -> bool:
+    """Compare the converter with html2text on every fixture."""
+    identical = True
+    for name, html in corpus:
+        element = golden_source(crawler, html)
+        expected = crawler.new_html2text().handle(str(element))
+        actual = tree_to_markdown(element)
+        if actual == expected:
+            continue
+        identical = False
+        print(f"{name}: differs from html2text")
+        diff = difflib.unified_diff(expected.splitlines(), actual.splitlines(),
+                                    "html2text", "markdown_convert", lineterm="", n=1)
+        for line in list(diff)[:20]:
+            print(f"    {line}")
+    print(f"{'All' if identical else 'Not all'} {len(corpus)} fixtures match html2text")
+    return identical
+
+
+def check_random(crawler: APIDocCrawler, pages: int, seed: int) -> bool:
+    """Compare the converter with html2text on generated pages, with each installed parser."""
+    identical = True
+    for parser in ("lxml", "html.parser"):
+        if not parser_available(parser):
+            continue
+        rng = random.Random(seed)
+        differing = []
+        with use_parser(parser):
+            for _ in range(pages):
+                html = random_page(rng)
+                element = golden_source(crawler, html)
+                if tree_to_markdown(element) != crawler.new_html2text().handle(str(element)):
+                    differing.append(html)
+        print(f"{parser}: {pages - len(differing)}/{pages} random pages match html2text")
+        for html in sorted(differing, key=len)[:3]:
+            print(f"    {html}")
+        identical = identical and not differing
+    return identical
+
+
+def benchmark(crawler: APIDocCrawler, corpus: List[Tuple[str, str]], repeat: int) -> None:
+    """Print conversion time per fixture for html2text and the tree converter."""
+    elements = [golden_source(crawler, html) for _, html in corpus]
+    total_mb = sum(len(str(element)) for element in elements) / (1024 * 1024)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for element in elements:
+            crawler.new_html2text().handle(str(element))
+    html2text_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for element in elements:
+            tree_to_markdown(element)
+    tree_time = time.perf_counter() - start
+
+    runs = repeat * len(elements)
+    print(f"\n{'converter':<18} {'ms/page':>9} {'MB/s':>8}")
+    print(f"{'html2text':<18} {html2text_time / runs * 1000:9.2f} {total_mb * repeat / html2text_time:8.2f}")
+    print(f"{'markdown_convert':<18} {tree_time / runs * 1000:9.2f} {total_mb * repeat / tree_time:8.2f}")
+    print(f"{html2text_time / tree_time:.2f}x faster")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the tree Markdown converter against html2text.')
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages to add to the fixture corpus')
+    parser.add_argument('--check', action='store_true', help='Only run the golden-output check')
+    parser.add_argument('--repeat', type=int, default=5, help='Times each fixture is converted per converter')
+    parser.add_argument('--random', type=int, default=0, help='Generated pages to check as well')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the generated pages')
+    args = parser.parse_args()
+
+    installed = tuple(html2text.__version__)
+    if installed != PINNED_HTML2TEXT:
+        print(f"Warning: checking against html2text {installed}, "
+              f"but {PINNED_HTML2TEXT} is pinned; code blocks in lists may differ")
+
+    paths = [Path(p) for p in args.pages] or sample_pages()
+    corpus = load_fixtures()
+    corpus += [(path.stem, path.read_text(encoding="utf-8", errors="replace")) for path in paths]
+    crawler = APIDocCrawler()
+
+    identical = check(crawler, corpus)
+    if args.random:
+        identical = check_random(crawler, args.random, args.seed) and identical
+    if not args.check:
+        benchmark(crawler, corpus, args.repeat)
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
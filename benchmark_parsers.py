@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+"""Check that every installed HTML parser extracts the same pages, and time each one.
+
+Uses the pages recorded by ``benchmark_parsing.py --record``, the fixture pages
+under ``tests/fixtures/pages`` when none are recorded, or any saved HTML files
+given on the command line. Each page goes through the same extraction
+code the crawlers run, once per parser: ``APIDocCrawler``'s document pipeline,
+every source's ``ExtractionSpec``, and ``adapt_result`` on a static fetch for
+every source that reads crawl4ai's Markdown and links. The results are compared against
+``html.parser``, which is what the crawlers used before ``html_parser``
+existed. Any difference is listed by page, extractor and field, and the
+script exits non-zero.
+
+Throughput is reported per parser as parse-only and full-extraction time per
+page, and as MB/s of HTML parsed.
+
+Usage:
+    python benchmark_parsers.py                 # parity check and throughput
+    python benchmark_parsers.py --check         # parity check only
+    python benchmark_parsers.py --repeat 20 saved_page.html
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from aws_cdk_python_crawler import CDKPythonDocCrawler
+from benchmark_parsing import sample_pages
+from boto3_crawler import Boto3DocCrawler
+from cloudformation_crawler import CloudFormationNativeCrawler
+from crawler import APIDocCrawler
+from html_parser import FALLBACK_PARSER, make_soup, parser_available, use_parser
+from page_extract import ExtractionSpec
+from pulumi_aws_crawler import PulumiNativeCrawler
+from result_adapter import adapt_result
+
+PARSERS = ("lxml", "html.parser", "html5lib")
+SCRATCH_DIR = Path("output") / "benchmark_parsers"
+
+
+def extraction_specs() -> Dict[str, ExtractionSpec]:
+    """Collect every source's extraction spec, keyed by crawler source and field."""
+    crawlers = [
+        CDKPythonDocCrawler(),
+        CloudFormationNativeCrawler(str(SCRATCH_DIR)),
+    ]
+    specs = {}
+    for crawler in crawlers:
+        for source_key, source in crawler.sources.items():
+            for field_name, value in source.items():
+                if isinstance(value, ExtractionSpec):
+                    specs[f"{source_key}.{field_name}"] = value
+    return specs
+
+
+def run_configs() -> Dict[str, Any]:
+    """Collect the run configs of the sources read through ``adapt_result``, keyed by source and field."""
+    crawlers = [
+        Boto3DocCrawler(),
+        PulumiNativeCrawler(str(SCRATCH_DIR)),
+    ]
+    configs = {}
+    for crawler in crawlers:
+        for source_key, source in crawler.sources.items():
+            for field_name in ("index_config", "page_config"):
+                configs[f"{source_key}.{field_name}"] = source[field_name]
+    return configs
+
+
+def adapt_static(html: str, url: str, config: Any) -> Dict[str, Any]:
+    """Adapt a page as if it had been fetched statically for a run config."""
+    page = adapt_result(SimpleNamespace(success=True, html=html, url=url), config=config)
+    return asdict(page)
+
+
+def extract_all(api_crawler: APIDocCrawler, specs: Dict[str, Any],
+                name: str, html: str) -> Dict[str, Dict[str, Any]]:
+    """Run every extractor over a page with the current parser.
+
+    ``specs`` holds extraction specs and the run configs given to ``adapt_result``.
+    """
+    soup = api_crawler.parse_document(html)
+    outputs = {"api_docs": api_crawler.extract_document(soup, name, name) if soup is not None else {}}
+    url = f"https://example.com/{name}"
+    for spec_name, spec in specs.items():
+        if isinstance(spec, ExtractionSpec):
+            outputs[spec_name] = asdict(spec.extract_html(html, url))
+        else:
+            outputs[spec_name] = adapt_static(html, url, spec)
+    return outputs
+
+
+def compare(reference: Dict[str, Dict[str, Any]], candidate: Dict[str, Dict[str, Any]]) -> List[str]:
+    """List the extractor fields whose values differ."""
+    diffs = []
+    for extractor, expected in reference.items():
+        actual = candidate.get(extractor, {})
+        for field_name in expected:
+            if expected[field_name] != actual.get(field_name):
+                diffs.append(f"{extractor}.{field_name}")
+    return diffs
+
+
+def check_parity(parsers: List[str], pages: List[Tuple[str, str]], api_crawler: APIDocCrawler,
+                 specs: Dict[str, Any]) -> bool:
+    """Compare every parser's extraction output with html.parser's on every page."""
+    reference = {}
+    with use_parser(FALLBACK_PARSER):
+        for name, html in pages:
+            reference[name] = extract_all(api_crawler, specs, name, html)
+
+    identical = True
+    for parser in parsers:
+        if parser == FALLBACK_PARSER:
+            continue
+        parser_identical = True
+        with use_parser(parser):
+            for name, html in pages:
+                diffs = compare(reference[name], extract_all(api_crawler, specs, name, html))
+                if diffs:
+                    parser_identical = False
+                    print(f"  {parser} differs on {name}: {', '.join(diffs)}")
+        identical = identical and parser_identical
+        print(f"{parser}: {'identical' if parser_identical else 'DIFFERS'} to {FALLBACK_PARSER} "
+              f"on {len(pages)} pages x {len(specs) + 1} extractors")
+    return identical
+
+
+def benchmark(parsers: List[str], pages: List[Tuple[str, str]], api_crawler: APIDocCrawler,
+              specs: Dict[str, Any], repeat: int) -> None:
+    """Print parse-only and full-extraction throughput per parser."""
+    total_mb = sum(len(html.encode("utf-8")) for _, html in pages) / (1024 * 1024)
+    runs = repeat * len(pages)
+    print(f"\n{'parser':<12} {'parse ms/page':>14} {'MB/s':>8} {'extract ms/page':>16}")
+    for parser in parsers:
+        with use_parser(parser):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for _, html in pages:
+                    make_soup(html)
+            parse_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for name, html in pages:
+                    extract_all(api_crawler, specs, name, html)
+            extract_time = time.perf_counter() - start
+
+        print(f"{parser:<12} {parse_time / runs * 1000:14.1f} {total_mb * repeat / parse_time:8.2f} "
+              f"{extract_time / runs * 1000:16.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check parser output parity and benchmark parser throughput.')
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages to use instead of the recorded or fixture samples')
+    parser.add_argument('--check', action='store_true', help='Only run the parity check')
+    parser.add_argument('--repeat', type=int, default=5, help='Times each page is parsed per parser')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.pages] or sample_pages()
+    pages = [(path.stem, path.read_text(encoding="utf-8", errors="replace")) for path in paths]
+    parsers = [name for name in PARSERS if parser_available(name)]
+    api_crawler = APIDocCrawler()
+    specs = {**extraction_specs(), **run_configs()}
+
+    print(f"Parsers installed: {', '.join(parsers)}")
+    identical = check_parity(parsers, pages, api_crawler, specs)
+    if not args.check:
+        benchmark(parsers, pages, api_crawler, specs, args.repeat)
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+"""Compare APIDocCrawler's single-parse pipeline against re-parsing per extractor.
+
+Sample boto3 and Pulumi pages are recorded once with ``--record`` and replayed
+from disk. Until they are recorded, the saved pages in ``tests/fixtures/pages``
+are used instead. Each page then goes through two pipelines:
+
+- reparse: how ``process_page`` used to work, run by ``BaselineExtractors``,
+  a frozen copy of the string-based extractors from before the single-parse
+  pipeline. The page is cleaned back to a string, and the overview, API
+  reference and examples extractors each parse that string again with
+  ``html.parser``.
+- shared: the crawler's current pipeline. The page is parsed once by
+  ``parse_document``, split into sections once, and every extractor walks
+  the same tree.
+
+Both pipelines must produce identical document structures, apart from the
+parameter table rows that only the shared pipeline extracts. Per-stage timings
+and the overall speedup are printed for each.
+
+Usage:
+    python benchmark_parsing.py --record
+    python benchmark_parsing.py --repeat 20
+    python benchmark_parsing.py saved_page.html other_page.html
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.request import Request, urlopen
+
+from bs4 import BeautifulSoup, Comment
+from html2text import HTML2Text
+
+from crawler import APIDocCrawler
+from sections import split_sections
+from stage_timer import StageTimer
+
+PAGES_DIR = Path("output") / "benchmark_pages"
+# Saved pages committed with the tests, used until pages are recorded
+FIXTURE_PAGES_DIR = Path(__file__).parent / "tests" / "fixtures" / "pages"
+
+SAMPLE_PAGES = {
+    "boto3_ec2": "https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/ec2.html",
+    "boto3_s3": "https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3.html",
+    "boto3_s3_put_object": "https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/put_object.html",
+    "pulumi_s3_bucket": "https://www.pulumi.com/registry/packages/aws/api-docs/s3/bucket/",
+    "pulumi_lambda_function": "https://www.pulumi.com/registry/packages/aws/api-docs/lambda/function/",
+}
+
+
+def record_pages() -> None:
+    """Fetch the sample pages and save them for replay."""
+    PAGES_DIR.mkdir(parents=True, exist_ok=True)
+    for name, url in SAMPLE_PAGES.items():
+        request = Request(url, headers={"User-Agent": "Mozilla/5.0 (benchmark_parsing)"})
+        try:
+            with urlopen(request, timeout=30) as response:
+                html = response.read().decode("utf-8", errors="replace")
+        except Exception as e:
+            print(f"Error recording {url}: {str(e)}")
+            continue
+        (PAGES_DIR / f"{name}.html").write_text(html, encoding="utf-8")
+        print(f"Recorded {name} ({len(html) / 1024:.0f} KiB)")
+
+
+def sample_pages(pattern: str = "*.html") -> List[Path]:
+    """Get the recorded sample pages, or the committed fixture pages if none are recorded."""
+    return sorted(PAGES_DIR.glob(pattern)) or sorted(FIXTURE_PAGES_DIR.glob(pattern))
+
+
+class BaselineExtractors:
+    """The string-based extractors ``APIDocCrawler`` used before the single-parse pipeline.
+
+    Kept unchanged as the benchmark's baseline; do not update them to match the crawler.
+    """
+
+    def __init__(self):
+        self.h2t = HTML2Text()
+        self.h2t.ignore_links = False
+        self.h2t.ignore_images = False
+        self.h2t.ignore_tables = False
+        self.h2t.body_width = 0  # Don't wrap lines
+        self.h2t.ignore_emphasis = False
+        self.h2t.ul_item_mark = '-'  # Use - for unordered lists
+        self.h2t.protect_links = True  # Don't wrap links
+        self.h2t.unicode_snob = True  # Use Unicode characters
+        self.h2t.images_to_alt = True  # Use alt text for images
+        self.h2t.single_line_break = True  # Use single line breaks
+
+    def clean_html_content(self, content: str) -> str:
+        """Clean HTML content before processing."""
+        if not content:
+            return ""
+        try:
+            soup = BeautifulSoup(content, 'html.parser')
+            for element in soup(['script', 'style']):
+                element.decompose()
+            for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+                comment.extract()
+            return str(soup)
+        except Exception as e:
+            print(f"Error cleaning HTML content: {str(e)}")
+            return ""
+
+    def html_to_markdown(self, html_content: str) -> str:
+        if not html_content:
+            return ""
+        return self.h2t.handle(html_content).strip()
+
+    def extract_overview(self, content: str) -> str:
+        """Extract overview section from the content."""
+        if not content:
+            return ""
+        try:
+            soup = BeautifulSoup(content, 'html.parser')
+            overview_section = soup.select_one('main')
+            if overview_section:
+                return self.html_to_markdown(str(overview_section))
+            return ""
+        except Exception as e:
+            print(f"Error extracting overview: {str(e)}")
+            return ""
+
+    def extract_api_reference(self, content: str) -> List[Dict[str, str]]:
+        """Extract API reference documentation."""
+        soup = BeautifulSoup(content, 'html.parser')
+        api_refs = []
+        for method in soup.find_all(['h2', 'h3']):
+            if 'method' in method.text.lower() or 'function' in method.text.lower():
+                method_doc = {
+                    "name": method.text.strip(),
+                    "description": "",
+                    "syntax": "",
+                    "parameters": [],
+                    "returns": ""
+                }
+                next_elem = method.find_next(['p', 'pre', 'h2', 'h3'])
+                while next_elem and next_elem.name == 'p':
+                    method_doc["description"] += next_elem.text.strip() + "\n"
+                    next_elem = next_elem.find_next(['p', 'pre', 'h2', 'h3'])
+                api_refs.append(method_doc)
+        return api_refs
+
+    def extract_examples(self, content: str) -> List[Dict[str, str]]:
+        """Extract code examples."""
+        soup = BeautifulSoup(content, 'html.parser')
+        examples = []
+        for example in soup.find_all(['pre', 'code']):
+            if example.text.strip():
+                examples.append({
+                    "code": example.text.strip(),
+                    "language": example.get('class', [''])[0] if example.get('class') else ""
+                })
+        return examples
+
+
+BASELINE = BaselineExtractors()
+
+
+def reparse_pipeline(crawler: APIDocCrawler, html: str, timer: StageTimer) -> Dict[str, Any]:
+    """Clean to a string, then parse it again in every baseline extractor."""
+    with timer.stage("clean"):
+        cleaned = BASELINE.clean_html_content(html)
+    with timer.stage("overview"):
+        overview = BASELINE.extract_overview(cleaned)
+    with timer.stage("api_reference"):
+        api_reference = BASELINE.extract_api_reference(cleaned)
+    with timer.stage("examples"):
+        examples = BASELINE.extract_examples(cleaned)
+    return {"overview": overview, "api_reference": api_reference, "examples": examples}
+
+
+def shared_pipeline(crawler: APIDocCrawler, html: str, timer: StageTimer) -> Dict[str, Any]:
+    """Parse and clean once, then run every extractor on the same tree, as extract_document does."""
+    with timer.stage("parse"):
+        soup = crawler.parse_document(html)
+    with timer.stage("sections"):
+        sections = split_sections(soup)
+    with timer.stage("overview"):
+        overview = crawler.extract_overview(soup)
+    with timer.stage("api_reference"):
+        api_reference = crawler.extract_api_reference(soup, sections)
+    with timer.stage("examples"):
+        examples = crawler.extract_examples(soup, sections)
+    return {"overview": overview, "api_reference": api_reference, "examples": examples}
+
+
+def without_parameters(output: Dict[str, Any]) -> Dict[str, Any]:
+    """Empty each API reference entry's parameter rows, which the baseline never extracted."""
+    return {**output, "api_reference": [{**entry, "parameters": []} for entry in output["api_reference"]]}
+
+
+def run(pipeline: Callable, crawler: APIDocCrawler, pages: List[Tuple[str, str]],
+        repeat: int, name: str) -> Tuple[float, StageTimer, Dict[str, Any]]:
+    """Run a pipeline over every page ``repeat`` times, returning time per page and the outputs."""
+    timer = StageTimer(name)
+    outputs = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page_name, html in pages:
+            outputs[page_name] = pipeline(crawler, html, timer)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(pages)), timer, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the single-parse document pipeline.')
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages to use instead of the recorded or fixture samples')
+    parser.add_argument('--record', action='store_true', help='Fetch and save the sample boto3 and Pulumi pages')
+    parser.add_argument('--repeat', type=int, default=10, help='Times each page is run through each pipeline')
+    args = parser.parse_args()
+
+    if args.record:
+        record_pages()
+        return
+
+    paths = [Path(p) for p in args.pages] or sample_pages()
+    pages = [(path.stem, path.read_text(encoding="utf-8", errors="replace")) for path in paths]
+    crawler = APIDocCrawler()
+
+    print(f"Benchmarking {len(pages)} pages x {args.repeat} runs")
+    reparse_time, reparse_timer, reparse_out = run(reparse_pipeline, crawler, pages, args.repeat, "reparse")
+    shared_time, shared_timer, shared_out = run(shared_pipeline, crawler, pages, args.repeat, "shared")
+    reparse_timer.report()
+    shared_timer.report()
+
+    shared_out = {name: without_parameters(output) for name, output in shared_out.items()}
+    mismatched = [name for name in reparse_out if reparse_out[name] != shared_out[name]]
+    print(f"\nreparse: {reparse_time * 1000:.1f} ms/page")
+    print(f"shared:  {shared_time * 1000:.1f} ms/page ({reparse_time / shared_time:.2f}x faster)")
+    if mismatched:
+        for name in mismatched:
+            fields = [key for key in reparse_out[name] if reparse_out[name][key] != shared_out[name][key]]
+            print(f"Output differs from the baseline for {name}: {', '.join(fields)}")
+        sys.exit(1)
+    print("Outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""Compare per-page rule evaluation before and after the extraction rules engine.
+
+``DocCrawler.process_page`` used to try each of a source's content selectors
+in turn with ``soup.select_one``, which parses the selector again on every
+call, and then filtered links with a substring test. ``SourceRules`` compiles
+the selectors and scope patterns once and tries them in the same order. The
+script times both on the same pages and checks they pick the same content
+element and links.
+
+Pages are saved HTML files of one source given on the command line. Without
+arguments generated pages are used, laid out so that the matching selector is
+the last of the source's candidates.
+
+Usage:
+    python benchmark_rules.py
+    python benchmark_rules.py --source cdkpython saved_cdk_pages/*.html
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin
+
+from bs4 import Tag
+
+from extraction_rules import SourceRules, load_rules
+from html_parser import make_soup
+
+
+def synthetic_page(n: int, selector_class: str) -> str:
+    """A page whose content sits in a div of the given class, with links in and out of scope."""
+    links = "".join(f"<li><a href='/AWSCloudFormation/latest/UserGuide/AWS_Service{n}_{i}.html'>AWS::S{i}</a></li>"
+                    f"<li><a href='#section-{i}'>Section {i}</a></li>" for i in range(150))
+    return (f"<html><body><header><div>Header</div></header><div class='{selector_class}'>"
+            f"<nav>Breadcrumbs</nav><h1>Page {n}</h1><ul>{links}</ul></div></body></html>")
+
+
+def old_rules(root: Tag, selectors: List[str], pattern: str, page_url: str) -> Tuple[Tag, List[Dict[str, str]]]:
+    """The selector loop and link filter process_page used before the rules engine."""
+    article = None
+    for selector in selectors:
+        article = root.select_one(selector)
+        if article:
+            break
+    links = []
+    for link in article.find_all('a', href=True) if article else []:
+        href, text = link['href'], link.get_text().strip()
+        if href and text and pattern in href and not href.startswith('#'):
+            links.append({'href': urljoin(page_url, href), 'text': text})
+    return article, links
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the precompiled extraction rules.')
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages of one source')
+    parser.add_argument('--source', default='cloudformation', help='Source key in the doc_crawler rules')
+    parser.add_argument('--synthetic-pages', type=int, default=50, help='Generated pages without arguments')
+    args = parser.parse_args()
+
+    rules: SourceRules = load_rules("doc_crawler")[args.source]
+    if args.pages:
+        pages = [Path(p).read_text(encoding="utf-8", errors="replace") for p in args.pages]
+    else:
+        last = rules.content_selectors[-1].split('.')[-1]
+        pages = [synthetic_page(n, last) for n in range(args.synthetic_pages)]
+    pattern = rules.include[0] if rules.include else ""
+    roots = [make_soup(html) for html in pages]
+
+    start = time.perf_counter()
+    old = [old_rules(root, rules.content_selectors, pattern, rules.url) for root in roots]
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    new = []
+    for root in roots:
+        article = rules.select_content(root)
+        new.append((article, rules.links(article, rules.url) if article is not None else []))
+    new_time = time.perf_counter() - start
+
+    same = sum(o[0] is n[0] and o[1] == n[1] for o, n in zip(old, new))
+    print(f"{len(roots)} pages, winning selector {rules.winning_selector!r}")
+    print(f"Selector loop + link filter: {old_time * 1000:8.1f} ms")
+    print(f"Compiled rules:              {new_time * 1000:8.1f} ms ({old_time / new_time:.1f}x)")
+    print(f"Same content element and links on {same}/{len(roots)} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""Compare the single-pass section walker against per-heading forward searches.
+
+Runs ``extract_api_reference`` and ``extract_examples`` on the largest recorded
+boto3 page (see ``benchmark_parsing.py --record``), on the largest boto3 page in
+``tests/fixtures/pages`` when none are recorded, or on saved HTML files given
+on the command line. It runs them twice: as they were before
+``sections.split_sections``, calling ``find_next`` from every heading, and
+built on one walk of the document. It checks that names, descriptions and
+examples match, and prints the time per page for each.
+
+Usage:
+    python benchmark_sections.py
+    python benchmark_sections.py --repeat 10 saved_page.html
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from benchmark_parsing import sample_pages
+from crawler import APIDocCrawler
+from sections import split_sections
+
+
+def find_next_api_reference(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    """extract_api_reference as it was: a forward search per heading and per paragraph."""
+    api_refs = []
+    for method in soup.find_all(['h2', 'h3']):
+        if 'method' in method.text.lower() or 'function' in method.text.lower():
+            method_doc = {"name": method.text.strip(), "description": ""}
+            next_elem = method.find_next(['p', 'pre', 'h2', 'h3'])
+            while next_elem and next_elem.name == 'p':
+                method_doc["description"] += next_elem.text.strip() + "\n"
+                next_elem = next_elem.find_next(['p', 'pre', 'h2', 'h3'])
+            api_refs.append(method_doc)
+    return api_refs
+
+
+def find_all_examples(soup: BeautifulSoup) -> List[Dict[str, str]]:
+    """extract_examples as it was: a separate search of the whole document."""
+    return [{
+        "code": example.text.strip(),
+        "language": example.get('class', [''])[0] if example.get('class') else ""
+    } for example in soup.find_all(['pre', 'code']) if example.text.strip()]
+
+
+def time_per_page(func: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the single-pass section walker.')
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages to use instead of the largest recorded boto3 page')
+    parser.add_argument('--repeat', type=int, default=5, help='Times each extractor runs per page')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.pages]
+    if not paths:
+        paths = sorted(sample_pages("boto3_*.html"), key=lambda p: p.stat().st_size)[-1:]
+
+    crawler = APIDocCrawler()
+    failed = False
+    for path in paths:
+        soup = crawler.parse_document(path.read_text(encoding="utf-8", errors="replace"))
+        headings = len(soup.find_all(['h2', 'h3']))
+        print(f"\n{path.name}: {path.stat().st_size / 1024:.0f} KiB, {headings} h2/h3 headings")
+
+        def sectioned():
+            sections = split_sections(soup)
+            return crawler.extract_api_reference(soup, sections), crawler.extract_examples(soup, sections)
+
+        def searched():
+            return find_next_api_reference(soup), find_all_examples(soup)
+
+        new_refs, new_examples = sectioned()
+        old_refs, old_examples = searched()
+        new_summary = [{"name": r["name"], "description": r["description"]} for r in new_refs]
+        if new_summary != old_refs or new_examples != old_examples:
+            failed = True
+            print("  Output differs from the find_next implementation")
+
+        searched_time = time_per_page(searched, args.repeat)
+        sectioned_time = time_per_page(sectioned, args.repeat)
+        print(f"  find_next:    {searched_time * 1000:9.1f} ms/page")
+        print(f"  single pass:  {sectioned_time * 1000:9.1f} ms/page "
+              f"({searched_time / sectioned_time:.1f}x faster)")
+        print(f"  {len(new_refs)} methods, {len(new_examples)} examples, "
+              f"{sum(len(r['parameters']) for r in new_refs)} parameter rows")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""Compare peak memory of tree and streaming extraction, and check they agree.
+
+Each page goes through ``APIDocCrawler``'s tree pipeline (``parse_document``
+then ``extract_document``) and through ``stream_document``. Both must give
+identical document structures. For each pipeline the script prints the time
+per page, the peak memory it allocated, and its working memory: the peak less
+the document it returned, which is what a page costs while it is in flight.
+
+Pages are the ones recorded by ``benchmark_parsing.py --record``, the saved
+pages in ``tests/fixtures/pages`` when none are recorded, or saved HTML files
+given on the command line. ``--synthetic`` generates Sphinx-style
+reference pages of the given sizes instead, to show how memory grows with
+page size.
+
+Usage:
+    python benchmark_streaming.py
+    python benchmark_streaming.py saved_page.html
+    python benchmark_streaming.py --synthetic 1,4,16
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmark_parsing import sample_pages
+from crawler import APIDocCrawler
+
+
+def synthetic_page(size_mb: float) -> str:
+    """Build a boto3-style client reference page of about the given size."""
+    parts = ['<html><head><script>var nav = "<h2>not content</h2>";</script></head><body>'
+             '<nav><a href="/">Home</a></nav><main><h1>Client</h1><p>Service overview.</p>']
+    target = size_mb * 1024 * 1024
+    length, i = 0, 0
+    while length < target:
+        method = (f'<div class="section"><h3>method_{i}(**kwargs) function</h3>'
+                  f'<p>Calls operation {i} &amp; returns its response.</p><p>See also the guide.</p>'
+                  f'<div class="highlight-python"><pre>response = client.method_{i}(\n    Name=&quot;example&quot;\n)</pre></div>'
+                  f'<p>Parameters are <code class="docutils">Name</code> and <code>Id</code>.</p>'
+                  f'<table><tr><th>Name</th><th>Type</th></tr><tr><td>Name</td><td><em>string</em></td></tr>'
+                  f'<tr><td>Id</td><td>integer</td></tr></table>'
+                  f'<ul><li><a href="#method_{i}">method_{i}</a></li></ul></div>')
+        parts.append(method)
+        length += len(method)
+        i += 1
+    parts.append('</main></body></html>')
+    return "".join(parts)
+
+
+def measure(func: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], float, int, int]:
+    """Run a pipeline, returning its output, time, peak and retained allocation in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    # BeautifulSoup trees are cyclic; collect them so only the output is retained
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare tree and streaming extraction memory.')
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages to use instead of the recorded or fixture samples')
+    parser.add_argument('--synthetic', help='Comma-separated sizes in MB of generated pages to use instead')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        pages = [(f"synthetic_{size}mb", synthetic_page(float(size))) for size in args.synthetic.split(",")]
+    else:
+        paths = [Path(p) for p in args.pages] or sample_pages()
+        pages = [(path.stem, path.read_text(encoding="utf-8", errors="replace")) for path in paths]
+    crawler = APIDocCrawler()
+
+    mismatched: List[str] = []
+    print(f"{'page':<28} {'MB':>6} {'pipeline':<8} {'ms':>8} {'peak MB':>8} {'working MB':>11}")
+    for name, html in pages:
+        url = f"https://example.com/{name}"
+
+        def tree() -> Dict[str, Any]:
+            return crawler.extract_document(crawler.parse_document(html), url, name)
+
+        outputs = {}
+        for label, pipeline in (("tree", tree), ("stream", lambda: crawler.stream_document(html, url, name))):
+            outputs[label], elapsed, peak, retained = measure(pipeline)
+            print(f"{name:<28} {len(html) / (1024 * 1024):6.1f} {label:<8} {elapsed * 1000:8.0f} "
+                  f"{peak / (1024 * 1024):8.1f} {(peak - retained) / (1024 * 1024):11.1f}")
+        if outputs["tree"] != outputs["stream"]:
+            mismatched.append(name)
+
+    if mismatched:
+        print(f"\nOutput differs for: {', '.join(mismatched)}")
+        sys.exit(1)
+    print("\nOutputs identical")
+
+
+if __name__ == "__main__":
+    main()
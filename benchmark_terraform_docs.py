@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""Compare the Markdown-native Terraform doc path with the html2text round trip.
+
+``process_terraform_docs`` used to feed each doc, front matter and all, to
+html2text as if it were HTML. ``parse_markdown_doc`` splits off the front
+matter and normalizes the Markdown instead. For each doc the script times
+both and checks whether the code blocks survive: a code line survives if it
+appears unchanged in the output. html2text collapses the whitespace inside
+the Markdown source, so indented HCL is flattened.
+
+Docs are the ``.md`` and ``.html.markdown`` files given on the command line,
+for example from a checkout of hashicorp/terraform-provider-aws's
+``website/docs``. Without arguments a generated resource doc is used.
+
+Usage:
+    python benchmark_terraform_docs.py
+    python benchmark_terraform_docs.py terraform-provider-aws/website/docs/r/*.markdown
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from crawler import APIDocCrawler
+from markdown_docs import parse_markdown_doc
+
+
+def synthetic_doc(arguments: int) -> str:
+    """A resource doc in the provider's layout with the given number of arguments."""
+    argument_list = "\n".join(f"* `argument_{i}` - (Optional) Setting {i} of the bucket. Defaults to `{i}`."
+                              for i in range(arguments))
+    return f"""---
+subcategory: "S3 (Simple Storage)"
+layout: "aws"
+page_title: "AWS: aws_s3_bucket"
+description: |-
+  Provides a S3 bucket resource.
+---
+
+# Resource: aws_s3_bucket
+
+Provides a S3 bucket resource.
+
+-> **Note:** Buckets names must be unique across all accounts & regions, and `<name>` must be lowercase.
+
+## Example Usage
+
+### Private Bucket With Tags
+
+```terraform
+resource "aws_s3_bucket" "example" {{
+  bucket = "my-tf-test-bucket"
+
+  tags = {{
+    Name        = "My bucket"
+    Environment = "Dev"
+  }}
+}}
+```
+
+## Argument Reference
+
+{argument_list}
+
+## Import
+
+```console
+% terraform import aws_s3_bucket.bucket bucket-name
+```
+"""
+
+
+def code_lines(markdown: str) -> List[str]:
+    """Non-blank lines inside fenced code blocks."""
+    lines, inside = [], False
+    for line in markdown.splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            inside = not inside
+        elif inside and line.strip():
+            lines.append(line)
+    return lines
+
+
+def timed(func: Callable[[str], str], text: str, repeat: int) -> Tuple[float, str]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        output = func(text)
+    return (time.perf_counter() - start) / repeat, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Markdown-native Terraform doc path.')
+    parser.add_argument('docs', nargs='*', help='Terraform provider Markdown docs')
+    parser.add_argument('--repeat', type=int, default=20, help='Times each doc is converted per path')
+    args = parser.parse_args()
+
+    if args.docs:
+        docs = [(Path(p).name, Path(p).read_text(encoding="utf-8")) for p in args.docs]
+    else:
+        docs = [("synthetic_200_args", synthetic_doc(200))]
+    crawler = APIDocCrawler()
+
+    print(f"{'doc':<36} {'html2text ms':>13} {'native ms':>10} {'code kept (html2text / native)':>32}")
+    totals = [0.0, 0.0]
+    for name, text in docs:
+        expected = code_lines(text)
+        old_time, old = timed(lambda t: crawler.new_html2text().handle(t), text, args.repeat)
+        new_time, new = timed(lambda t: parse_markdown_doc(t).markdown, text, args.repeat)
+        totals[0] += old_time
+        totals[1] += new_time
+        old_kept = sum(line in old for line in expected)
+        new_kept = sum(line in new for line in expected)
+        print(f"{name:<36} {old_time * 1000:13.2f} {new_time * 1000:10.2f} "
+              f"{f'{old_kept}/{len(expected)} / {new_kept}/{len(expected)}':>32}")
+    print(f"\n{totals[0] / totals[1]:.1f}x faster per doc")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Learn the boilerplate a documentation site repeats on every page, and strip it.
+
+Every page of one site carries the same sidebar, header, footer and feedback
+widgets. ``BoilerplateLearner`` fingerprints each subtree of the first pages
+it sees from a source. Subtrees that turn up on most of those pages are
+template, and from then on they are removed from every page before content
+is extracted or converted.
+
+A fingerprint is computed bottom-up in one pass over the tree: a hash of the
+tag name, the element's own text and its children's fingerprints. Attributes
+are left out, so a sidebar whose "current page" link changes class from page
+to page still matches. Only container elements with some text can be
+template, so a repeated heading such as "Syntax" is never stripped.
+
+Crawlers that keep crawl4ai's Markdown instead of a tree use
+``strip_markdown``. Their pages are split into blocks at blank lines, code
+fences kept whole, and each block is fingerprinted by its text. Headings and
+code blocks are never template.
+
+Learned templates are saved per source, so later runs strip from the first
+page. They are learned again when they no longer describe the site:
+
+- after ``max_age`` seconds, so new chrome such as a banner is picked up
+- when ``relearn_after`` pages in a row hold less than ``min_fit`` of the
+  learned subtrees, as happens when the site's layout changes
+- when the saved file was written by another fingerprint version or with
+  another ``min_text``
+"""
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from bs4 import Tag
+from bs4.element import PreformattedString
+
+# Elements that can be learned as template
+TEMPLATE_TAGS = {"nav", "header", "footer", "aside", "div", "section", "ul", "ol", "form", "menu"}
+
+LEARN_PAGES = 5
+MIN_SHARE = 0.8
+MIN_TEMPLATE_TEXT = 20
+MAX_AGE = 7 * 24 * 3600
+MIN_FIT = 0.5
+RELEARN_AFTER = 3
+
+# Bump when the fingerprint changes, so saved templates are learned again
+FINGERPRINT_VERSION = 1
+
+# Per-element state, kept in lists for speed
+_ELEMENT, _HASH, _TEXT, _MATCHES = range(4)
+
+_FENCE = re.compile(r" {0,3}(`{3,}|~{3,})")
+
+
+def markdown_blocks(markdown: str) -> List[str]:
+    """Split Markdown into blocks at blank lines, keeping each fenced code block whole."""
+    blocks: List[str] = []
+    lines: List[str] = []
+    fence = ""
+    for line in markdown.splitlines():
+        opening = _FENCE.match(line)
+        if fence:
+            # A fence closes on a bare run of its own character at least as long
+            if opening and opening.group(1)[0] == fence[0] and len(opening.group(1)) >= len(fence) \
+                    and not line[opening.end():].strip():
+                fence = ""
+        elif opening:
+            fence = opening.group(1)
+        elif not line.strip():
+            if lines:
+                blocks.append("\n".join(lines))
+                lines = []
+            continue
+        lines.append(line)
+    if lines:
+        blocks.append("\n".join(lines))
+    return blocks
+
+
+class BoilerplateLearner:
+    """Learns the repeating subtrees of one source and strips them."""
+
+    def __init__(self, path: Optional[Path] = None, learn_pages: int = LEARN_PAGES,
+                 min_share: float = MIN_SHARE, min_text: int = MIN_TEMPLATE_TEXT,
+                 max_age: Optional[float] = MAX_AGE, min_fit: float = MIN_FIT,
+                 relearn_after: int = RELEARN_AFTER):
+        """Initialize the learner.
+
+        Args:
+            path: File the learned templates are saved to and loaded from
+            learn_pages: Pages to learn from before stripping starts
+            min_share: Share of learned pages a subtree must appear on to be template
+            min_text: Least text, in characters, a template subtree holds
+            max_age: Seconds before learned templates are learned again; None keeps them
+            min_fit: Share of the learned subtrees a page must hold to fit the learned layout
+            relearn_after: Pages in a row that don't fit before learning starts over
+        """
+        self.path = path
+        self.learn_pages = learn_pages
+        self.min_share = min_share
+        self.min_text = min_text
+        self.max_age = max_age
+        self.min_fit = min_fit
+        self.relearn_after = relearn_after
+        self.pages_seen = 0
+        self.counts: Dict[str, int] = {}
+        self.templates: Set[str] = set()
+        self.learned_at = 0.0
+        self.misfits = 0
+        if path is not None and path.exists():
+            self.load()
+
+    @property
+    def learned(self) -> bool:
+        """Whether learning is finished and pages are being stripped."""
+        return self.pages_seen >= self.learn_pages
+
+    def fingerprint(self, root: Tag) -> Tuple[Set[str], List[Tag]]:
+        """Fingerprint every subtree under root in one bottom-up pass.
+
+        Returns:
+            Tuple[Set[str], List[Tag]]: Fingerprints of the subtrees that could be
+            template, and the outermost subtrees matching a learned template
+        """
+        keys: Set[str] = set()
+        matches: List[Tag] = []
+        stack = [([root, hashlib.blake2b(root.name.encode(), digest_size=8), 0, 0], iter(root.contents))]
+        while stack:
+            frame, children = stack[-1]
+            for child in children:
+                if isinstance(child, Tag):
+                    # Remember where this element's matches start, to drop them if it matches itself
+                    child_frame = [child, hashlib.blake2b(child.name.encode(), digest_size=8), 0, len(matches)]
+                    stack.append((child_frame, iter(child.contents)))
+                    break
+                if isinstance(child, PreformattedString):
+                    continue
+                text = " ".join(child.split())
+                if text:
+                    frame[_HASH].update(text.encode())
+                    frame[_TEXT] += len(text)
+            else:
+                stack.pop()
+                element = frame[_ELEMENT]
+                digest = frame[_HASH].digest()
+                if stack:
+                    parent = stack[-1][0]
+                    parent[_HASH].update(b"<" + digest + b">")
+                    parent[_TEXT] += frame[_TEXT]
+                if element.name not in TEMPLATE_TAGS or frame[_TEXT] < self.min_text:
+                    continue
+                key = digest.hex()
+                keys.add(key)
+                if key in self.templates and element is not root:
+                    del matches[frame[_MATCHES]:]
+                    matches.append(element)
+        return keys, matches
+
+    def observe(self, keys: Set[str]) -> None:
+        """Count a page's subtrees towards learning, and finish learning on the last page."""
+        for key in keys:
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.pages_seen += 1
+        if self.learned:
+            needed = max(2, self.min_share * self.pages_seen)
+            self.templates = {key for key, count in self.counts.items() if count >= needed}
+            self.counts = {}
+            self.learned_at = time.time()
+            print(f"Learned {len(self.templates)} boilerplate subtrees from {self.pages_seen} pages", flush=True)
+            self.save()
+
+    def reset(self) -> None:
+        """Forget the learned templates and start learning again."""
+        self.pages_seen = 0
+        self.counts = {}
+        self.templates = set()
+        self.learned_at = 0.0
+        self.misfits = 0
+
+    def expired(self) -> bool:
+        """Whether the learned templates are older than ``max_age``."""
+        return self.max_age is not None and time.time() - self.learned_at > self.max_age
+
+    def fits(self, keys: Set[str]) -> bool:
+        """Check a page's fingerprints against the learned layout, counting pages in a row that miss.
+
+        Returns:
+            bool: False once ``relearn_after`` pages in a row held too few learned subtrees
+        """
+        if not self.templates or len(keys & self.templates) >= self.min_fit * len(self.templates):
+            self.misfits = 0
+            return True
+        self.misfits += 1
+        return self.misfits < self.relearn_after
+
+    def learn(self, keys: Set[str]) -> bool:
+        """Learn from a page's fingerprints while learning, starting over if the templates are stale.
+
+        Returns:
+            bool: True if this page finished learning
+        """
+        if self.learned and (self.expired() or not self.fits(keys)):
+            print(f"Boilerplate templates {'expired' if self.expired() else 'no longer fit the layout'}, "
+                  f"learning again", flush=True)
+            self.reset()
+        if self.learned:
+            return False
+        self.observe(keys)
+        return self.learned
+
+    def strip(self, root: Optional[Tag]) -> int:
+        """Learn from a page if still learning, then remove its template subtrees.
+
+        Args:
+            root: Parsed page, cleaned in place
+
+        Returns:
+            int: Number of subtrees removed
+        """
+        if root is None:
+            return 0
+        keys, matches = self.fingerprint(root)
+        if self.learn(keys):
+            # The page that finishes learning is stripped with what was learned
+            keys, matches = self.fingerprint(root)
+        if not self.learned:
+            return 0
+        for element in matches:
+            element.decompose()
+        return len(matches)
+
+    def block_key(self, block: str) -> Optional[str]:
+        """Fingerprint a Markdown block, or None for headings, code and short blocks."""
+        text = " ".join(block.split())
+        if len(text) < self.min_text or text.startswith("#") or _FENCE.match(block):
+            return None
+        return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+    def strip_markdown(self, markdown: str) -> str:
+        """Learn from a page's Markdown if still learning, then drop its template blocks.
+
+        Args:
+            markdown: The page's Markdown
+
+        Returns:
+            str: The Markdown without template blocks, unchanged while still learning
+        """
+        blocks = markdown_blocks(markdown)
+        keys = [self.block_key(block) for block in blocks]
+        self.learn({key for key in keys if key})
+        kept = [block for block, key in zip(blocks, keys) if key not in self.templates]
+        if not self.learned or len(kept) == len(blocks):
+            return markdown
+        return "\n\n".join(kept)
+
+    def load(self) -> None:
+        """Load learned templates from the learner's file."""
+        try:
+            with self.path.open('r') as f:
+                data = json.load(f)
+            if data.get('version') != FINGERPRINT_VERSION or data.get('min_text') != self.min_text:
+                print(f"Boilerplate templates in {self.path} were learned with other settings, "
+                      f"learning again", flush=True)
+                return
+            self.pages_seen = data.get('pages_seen', 0)
+            self.templates = set(data.get('templates', []))
+            self.learned_at = data.get('learned_at', 0.0)
+        except Exception as e:
+            print(f"Error loading boilerplate templates from {self.path}: {e}", flush=True)
+
+    def save(self) -> None:
+        """Save learned templates to the learner's file."""
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open('w') as f:
+                json.dump({'version': FINGERPRINT_VERSION, 'min_text': self.min_text,
+                           'learned_at': self.learned_at, 'pages_seen': self.pages_seen,
+                           'templates': sorted(self.templates)}, f)
+        except Exception as e:
+            print(f"Error saving boilerplate templates to {self.path}: {e}", flush=True)
+
+
+class BoilerplateStore:
+    """One boilerplate learner per source, saved under a cache directory."""
+
+    def __init__(self, cache_dir: str = ".cache/boilerplate", **learner_args):
+        """Initialize the store.
+
+        Args:
+            cache_dir: Directory learned templates are saved in, one file per source
+            learner_args: Settings passed to each source's BoilerplateLearner
+        """
+        self.cache_dir = Path(cache_dir)
+        self.learner_args = learner_args
+        self.learners: Dict[str, BoilerplateLearner] = {}
+
+    def learner(self, source_key: str) -> BoilerplateLearner:
+        """Get the learner for a source, loading its saved templates on first use."""
+        if source_key not in self.learners:
+            path = self.cache_dir / f"{source_key}.json"
+            self.learners[source_key] = BoilerplateLearner(path, **self.learner_args)
+        return self.learners[source_key]
+
+    def strip(self, source_key: str, root: Tag) -> int:
+        """Learn from and strip a page of the given source."""
+        return self.learner(source_key).strip(root)
+
+    def strip_markdown(self, source_key: str, markdown: str) -> str:
+        """Learn from and strip the Markdown of a page of the given source.
+
+        Markdown templates are saved apart from the source's tree templates.
+        """
+        return self.learner(f"{source_key}.markdown").strip_markdown(markdown)
@@ -1,35 +1,55 @@
+import asyncio
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from typing import List, Optional
+from urllib.parse import urlparse
 
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+from crawl4ai import BrowserConfig, CrawlerRunConfig
+from boilerplate import BoilerplateStore
+from browser_pool import BrowserPool, borrow_pool
+from dispatcher import DomainRateLimiter, MemoryAdaptiveDispatcher
+from hybrid_fetch import HybridFetcher
+from readiness import ReadinessSpec
+from resource_policy import ResourcePolicy
+from result_adapter import adapt_result
 
 DEBUG = False
 
 class Boto3DocCrawler:
-    def __init__(self):
+    def __init__(self, static_first: bool = True):
         self.base_output_dir = "output"
+        self.static_first = static_first  # Try plain HTTP before rendering
         
         # Track visited URLs to prevent infinite loops
         self._visited_urls = set()
         
+        # Learns the page furniture each source repeats and strips it
+        self.boilerplate = BoilerplateStore()
+        
         # Define sources with extraction strategies
         self.sources = {
             "boto3": {
                 "url": "https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/index.html",
                 "output_dir": "boto3",
+                # Sphinx pages need neither styling nor media to expose their content
+                "resource_policy": ResourcePolicy(
+                    name="boto3",
+                    deny_types={"image", "font", "media", "stylesheet"}
+                ),
                 "index_config": CrawlerRunConfig(
-                    wait_for="css:.toctree-wrapper",  # Wait for toctree to load
-                    wait_until="networkidle",  # Wait for network requests to finish
+                    wait_for=ReadinessSpec(selector=".toctree-wrapper").wait_for(),  # Toctree in the DOM
+                    wait_until="domcontentloaded",
                     process_iframes=True,  # Handle any iframe content
                     only_text=False,  # Keep HTML structure for markdown conversion
-                    css_selector=".toctree-wrapper",  # Get toctree content
+                    css_selector="article",  # Get the Sphinx article
+                    excluded_selector=".headerlink, .sphinx-tabs-tab, .sphinx-tabs-panel"
                 ),
                 "page_config": CrawlerRunConfig(
-                    wait_for="css:article",  # Wait for article content to load
-                    wait_until="networkidle",  # Wait for network requests to finish
+                    wait_for=ReadinessSpec(selector="article").wait_for(),  # Article in the DOM
+                    wait_until="domcontentloaded",
                     process_iframes=True,  # Handle any iframe content
                     only_text=False,  # Keep HTML structure for markdown conversion
-                    css_selector="article",  # Get article content
+                    css_selector="article",  # Get the Sphinx article
+                    excluded_selector=".headerlink, .sphinx-tabs-tab, .sphinx-tabs-panel"
                 )
             }
         }
@@ -59,6 +79,111 @@ class Boto3DocCrawler:
             json.dump(data, f, indent=2)
         print(f"Saved JSON to {filename}")
     
+    def _config_for(self, source_key: str, url: str):
+        """Pick the run configuration for a page."""
+        source = self.sources[source_key]
+        if '/services/index.html' in url:
+            return source.get("index_config")
+        return source.get("page_config")
+    
+    def _process_result(self, source_key: str, url: str, result) -> List[str]:
+        """Extract and save a loaded page, returning the links to crawl next."""
+        is_index = '/services/index.html' in url
+        
+        if not result or not result.success:
+            print(f"Failed to load page {url}")
+            return []
+        
+        print(f"Result success: {result.success}")
+        print(f"Result status code: {result.status_code}")
+        print(f"Result error message: {result.error_message}")
+        print(f"Result HTML length: {len(result.html) if result.html else 0}")
+        print(f"Result cleaned HTML length: {len(result.cleaned_html) if result.cleaned_html else 0}")
+        
+        # Take links and Markdown straight from the result
+        page = adapt_result(result, url, self._config_for(source_key, url))
+        if page is None:
+            print(f"Nothing extracted from {url}")
+            return []
+        
+        # Extract links based on page type
+        domain = urlparse(url).netloc
+        if is_index:
+            # For index pages, keep the service pages next to the index
+            links = [link for link in page.internal_links(
+                         domain=domain, prefix=url.rsplit('/', 1)[0] + '/',
+                         skip_text=('index', 'search', 'next', 'previous'))
+                     if link['href'] != url]
+        else:
+            # For content pages, look for method links
+            links = [link for link in page.internal_links(domain=domain, skip_text=())
+                     if '/documentation/api/' in link['href']]
+        
+        print(f"Found {len(links)} {'service' if is_index else 'method'} links")
+        
+        # Get the article's Markdown, already without header links and tabs,
+        # less the blocks every page repeats
+        content = self.boilerplate.strip_markdown(source_key, page.content)
+        if content:
+            # Create data structure
+            data = {
+                'content': content,
+                'links': links
+            }
+            
+            # Extract service name from URL
+            parts = url.rstrip('/').split('/')
+            if 'client' in parts:
+                # This is a method page
+                service_name = parts[parts.index('services') + 1]
+                method_name = parts[-1].replace('.html', '')
+                file_name = f"{service_name}_{method_name}"
+            else:
+                # This is a service page
+                service_name = parts[-1].replace('.html', '')
+                if not service_name or service_name == 'index':
+                    service_name = parts[-2]
+                file_name = service_name
+            
+            print(f"Saving content for {file_name}")
+            
+            # Save the content as markdown
+            if data.get('content'):
+                markdown_content = f"# {file_name}\n\n"
+                markdown_content += f"URL: {url}\n\n"
+                markdown_content += data['content']
+                
+                # Save markdown file
+                self.save_markdown(source_key, file_name, markdown_content)
+                
+                # Save JSON for LLM consumption
+                doc_structure = {
+                    "url": url,
+                    "service": service_name,
+                    "content": data['content'],
+                    "navigation": data.get('links', []),
+                    "timestamp": datetime.now().isoformat()
+                }
+                self.save_json(source_key, file_name, doc_structure)
+                print(f"Saved content for {file_name}")
+        
+        # Collect navigation links for recursive crawling
+        next_urls = []
+        for link in links:
+            href = link['href']
+            if href and not href.startswith('#'):
+                # Remove any anchor fragments
+                href = href.split('#')[0]
+                
+                # Only crawl URLs from the same domain and path
+                parsed_url = urlparse(href)
+                parsed_base = urlparse(url)
+                if (parsed_url.netloc == parsed_base.netloc and
+                    '/documentation/api/' in parsed_url.path):
+                    print(f"Found valid link to gather: {href}")
+                    next_urls.append(href)
+        return next_urls
+    
     async def process_page(self, source_key: str, crawler, url: str = None):
         """Process a single page using Crawl4ai's native extraction."""
         source = self.sources[source_key]
@@ -75,142 +200,20 @@ class Boto3DocCrawler:
         
         try:
             # Determine page type and config
-            if '/services/index.html' in url:
-                config = source.get("index_config")
-                is_index = True
-            else:
-                config = source.get("page_config")
-                is_index = False
+            config = self._config_for(source_key, url)
+            is_index = '/services/index.html' in url
             
             print(f"Crawling {url} {'(index page)' if is_index else '(content page)'}")
             
             if config:
                 try:
                     # First, load the page and wait for content
-                    result = await asyncio.wait_for(
-                        crawler.arun(url=url, config=config),
-                        timeout=30  # 30 seconds timeout for dynamic content
-                    )
-                    
-                    if not result or not result.success:
-                        print(f"Failed to load page {url}")
-                        return
-                    
-                    print(f"Result success: {result.success}")
-                    print(f"Result status code: {result.status_code}")
-                    print(f"Result error message: {result.error_message}")
-                    print(f"Result HTML length: {len(result.html) if result.html else 0}")
-                    print(f"Result cleaned HTML length: {len(result.cleaned_html) if result.cleaned_html else 0}")
-                    
-                    # Parse the HTML
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(result.html, 'html.parser')
-                    
-                    # Extract links based on page type
-                    links = []
-                    if is_index:
-                        # For index pages, look for service links
-                        for link in soup.find_all('a', class_='reference internal'):
-                            href = link.get('href', '')
-                            text = link.get_text().strip()
-                            
-                            # Skip navigation and index links
-                            if (href and not href.startswith(('http', '#', '../../guide/', 'index.html')) and 
-                                text and not text.lower() in ['index', 'search', 'next', 'previous']):
-                                
-                                # Convert relative URL to absolute
-                                if not href.startswith('http'):
-                                    href = urljoin(url, href)
-                                
-                                links.append({
-                                    'href': href,
-                                    'text': text
-                                })
-                    else:
-                        # For content pages, look for method links
-                        for link in soup.select('a.reference.internal'):
-                            href = link.get('href', '')
-                            text = link.get_text().strip()
-                            
-                            if href and not href.startswith('#'):
-                                # Convert relative URL to absolute
-                                if not href.startswith('http'):
-                                    href = urljoin(url, href)
-                                
-                                if '/documentation/api/' in href:
-                                    links.append({
-                                        'href': href,
-                                        'text': text
-                                    })
-                    
-                    print(f"Found {len(links)} {'service' if is_index else 'method'} links")
+                    result = await crawler.arun(url=url, config=config,
+                                                resource_policy=source["resource_policy"],
+                                                reuse_tab=True, timeout=30)  # Upper bound; the pool adapts it to the source
                     
-                    # Get article content
-                    article = soup.find('article')
-                    if article:
-                        # Clean up content
-                        for el in article.select('.headerlink, .sphinx-tabs-tab, .sphinx-tabs-panel'):
-                            el.decompose()
-                        
-                        # Extract content
-                        content = article.get_text(strip=True)
-                        
-                        # Create data structure
-                        data = {
-                            'content': content,
-                            'links': links
-                        }
-                        
-                        # Extract service name from URL
-                        parts = url.rstrip('/').split('/')
-                        if 'client' in parts:
-                            # This is a method page
-                            service_name = parts[parts.index('services') + 1]
-                            method_name = parts[-1].replace('.html', '')
-                            file_name = f"{service_name}_{method_name}"
-                        else:
-                            # This is a service page
-                            service_name = parts[-1].replace('.html', '')
-                            if not service_name or service_name == 'index':
-                                service_name = parts[-2]
-                            file_name = service_name
-                        
-                        print(f"Saving content for {file_name}")
-                        
-                        # Save the content as markdown
-                        if data.get('content'):
-                            markdown_content = f"# {file_name}\n\n"
-                            markdown_content += f"URL: {url}\n\n"
-                            markdown_content += data['content']
-                            
-                            # Save markdown file
-                            self.save_markdown(source_key, file_name, markdown_content)
-                            
-                            # Save JSON for LLM consumption
-                            doc_structure = {
-                                "url": url,
-                                "service": service_name,
-                                "content": data['content'],
-                                "navigation": data.get('links', []),
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            self.save_json(source_key, file_name, doc_structure)
-                            print(f"Saved content for {file_name}")
-                    
-                    # Process navigation links for recursive crawling
-                    for link in links:
-                        href = link['href']
-                        if href and not href.startswith('#'):
-                            # Remove any anchor fragments
-                            href = href.split('#')[0]
-                            
-                            # Only crawl URLs from the same domain and path
-                            parsed_url = urlparse(href)
-                            parsed_base = urlparse(url)
-                            if (parsed_url.netloc == parsed_base.netloc and
-                                '/documentation/api/' in parsed_url.path):
-                                print(f"Found valid link to gather: {href}")
-                                await self.process_page(source_key, crawler, href)
+                    for href in self._process_result(source_key, url, result):
+                        await self.process_page(source_key, crawler, href)
                 
                 except asyncio.TimeoutError:
                     print(f"Timeout gathering URLs from {url}")
@@ -223,6 +226,40 @@ class Boto3DocCrawler:
             print(f"Error in process_page for {url}: {str(e)}")
             import traceback
             traceback.print_exc()
+    
+    async def process_batched(self, source_key: str, crawler: HybridFetcher, urls: List[str]):
+        """Process pages level by level, rendering each level as one dispatched batch.
+
+        Results are extracted and saved as they stream in while the rest of the
+        batch is still rendering; links they reveal form the next batch.
+        """
+        source = self.sources[source_key]
+        dispatcher = MemoryAdaptiveDispatcher(
+            max_session_permit=5,
+            rate_limiter=DomainRateLimiter(base_delay=(0.1, 0.3)),
+            timeout=30  # 30 seconds timeout for dynamic content
+        )
+        
+        batch = [url for url in dict.fromkeys(urls) if url not in self._visited_urls]
+        while batch:
+            print(f"Rendering batch of {len(batch)} pages")
+            self._visited_urls.update(batch)
+            next_batch = []
+            async for url, result in crawler.arun_many(
+                    batch,
+                    config_for=lambda page_url: self._config_for(source_key, page_url),
+                    dispatcher=dispatcher,
+                    resource_policy=source["resource_policy"],
+                    reuse_tab=True):
+                try:
+                    next_batch.extend(self._process_result(source_key, url, result))
+                except Exception as e:
+                    print(f"Error processing page {url}: {str(e)}")
+                    import traceback
+                    traceback.print_exc()
+            batch = [url for url in dict.fromkeys(next_batch) if url not in self._visited_urls]
+        
+        dispatcher.report()
 
     async def _gather_urls(self, source_key: str, crawler, urls_to_crawl: set, url: str = None):
         """Recursively gather all URLs to crawl."""
@@ -245,10 +282,9 @@ class Boto3DocCrawler:
             
             if config:
                 # Add timeout to arun
-                result = await asyncio.wait_for(
-                    crawler.arun(url=url, config=config),
-                    timeout=30  # 30 seconds timeout
-                )
+                result = await crawler.arun(url=url, config=config,
+                                            resource_policy=source["resource_policy"],
+                                            reuse_tab=True, timeout=30)
                 
                 if not result:
                     print(f"No result from {url}")
@@ -285,8 +321,14 @@ class Boto3DocCrawler:
             import traceback
             traceback.print_exc()
 
-    async def crawl(self, source_key: str):
-        """Crawl documentation for a specific source."""
+    async def crawl(self, source_key: str, pool: Optional[BrowserPool] = None, batched: bool = True):
+        """Crawl documentation for a specific source.
+
+        Args:
+            source_key: Key of the source to crawl
+            pool: Shared browser pool; a private one is opened if omitted
+            batched: Render through the dispatcher in batches instead of one task per URL
+        """
         if source_key not in self.sources:
             print(f"Source {source_key} not found")
             return
@@ -299,11 +341,10 @@ class Boto3DocCrawler:
             ignore_https_errors=True  # Ignore HTTPS errors
         )
         
-        # Create the crawler instance with concurrency settings
-        async with AsyncWebCrawler(
-            browser_config=browser_config,
-            max_concurrent_pages=5  # Process up to 5 pages concurrently
-        ) as crawler:
+        # Borrow the shared browser, processing up to 5 pages concurrently;
+        # Sphinx pages are complete without JavaScript so try plain HTTP first
+        async with borrow_pool(pool, browser_config=browser_config, pool_size=5) as browser, \
+                HybridFetcher(browser, source_key, static_first=self.static_first) as crawler:
             try:
                 # First gather all URLs to crawl
                 urls_to_crawl = set()
@@ -313,6 +354,10 @@ class Boto3DocCrawler:
                 for url in urls_to_crawl:
                     print(f"  - {url}")
                 
+                if batched:
+                    await self.process_batched(source_key, crawler, sorted(urls_to_crawl))
+                    return
+                
                 # Process URLs concurrently
                 tasks = []
                 for url in urls_to_crawl:
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+
+"""Long-lived local Chromium that crawlers attach to over CDP.
+
+Launching Playwright and Chromium costs a few seconds on every run, which is
+most of the time a targeted refresh like ``main.py --boto3 --service s3``
+takes. The daemon keeps one headless Chromium running with remote debugging
+enabled and records where it is in a state file. ``BrowserPool`` checks that
+file on start and connects to the running browser instead of launching one.
+
+The daemon health-checks Chromium, restarts it if it dies or grows past a
+memory limit while no pages are open, and exits once no pages have been open
+for ``--idle-timeout`` seconds.
+
+Chromium runs on a persistent profile (``PROFILE_DIR`` by default), so its
+HTTP disk cache of stylesheets, scripts and fonts survives restarts. A
+``BrowserPool`` given a ``profile_dir`` launches its own Chromium on that
+profile the same way when no daemon is running.
+
+Usage:
+    python browser_daemon.py start [--port 9333] [--idle-timeout 900]
+    python browser_daemon.py status
+    python browser_daemon.py stop
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.error import URLError
+from urllib.request import urlopen
+
+import psutil
+
+CACHE_DIR = Path.home() / ".cache" / "crawl4ai-doc-crawler"
+STATE_FILE = CACHE_DIR / "browser_daemon.json"
+LOG_FILE = STATE_FILE.with_suffix(".log")
+PROFILE_DIR = CACHE_DIR / "profile"
+DEFAULT_PORT = 9333
+
+CHROMIUM_ARGS = [
+    "--headless=new",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-blink-features=AutomationControlled",
+    # Attached crawlers share the default context, which can't be given ignore_https_errors
+    "--ignore-certificate-errors",
+    "--mute-audio",
+    f"--disk-cache-size={1024 * 1024 * 1024}",
+]
+
+
+def _get_json(url: str, timeout: float = 0.5) -> Optional[Any]:
+    """GET a DevTools HTTP endpoint, returning None if it doesn't answer."""
+    try:
+        with urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read())
+    except (URLError, OSError, ValueError):
+        return None
+
+
+def read_state(state_file: Path = STATE_FILE) -> Optional[Dict[str, Any]]:
+    """Read the daemon's state file, or None if no daemon has written one."""
+    try:
+        return json.loads(Path(state_file).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def daemon_endpoint(state_file: Path = STATE_FILE) -> Optional[str]:
+    """Get the CDP URL of a running, responsive daemon, or None if there isn't one."""
+    state = read_state(state_file)
+    if not state or not psutil.pid_exists(state.get("pid", -1)):
+        return None
+    endpoint = f"http://127.0.0.1:{state['port']}"
+    return endpoint if _get_json(f"{endpoint}/json/version") else None
+
+
+def _chromium_executable() -> str:
+    """Find the Chromium build Playwright installed."""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as playwright:
+        return playwright.chromium.executable_path
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def profile_in_use(profile_dir: Path) -> bool:
+    """Check whether a live Chromium holds the profile's singleton lock."""
+    lock = Path(profile_dir) / "SingletonLock"
+    try:
+        # The lock is a symlink to "<hostname>-<pid>"
+        pid = int(os.readlink(lock).rsplit("-", 1)[-1])
+    except (OSError, ValueError):
+        return False
+    return psutil.pid_exists(pid)
+
+
+def launch_chromium(port: int, profile_dir: Path, extra_args: Optional[List[str]] = None,
+                    timeout: float = 15.0) -> subprocess.Popen:
+    """Start Chromium with remote debugging on a profile and wait until DevTools answers."""
+    Path(profile_dir).mkdir(parents=True, exist_ok=True)
+    process = subprocess.Popen(
+        [_chromium_executable(), f"--remote-debugging-port={port}", f"--user-data-dir={profile_dir}",
+         *CHROMIUM_ARGS, *(extra_args or []), "about:blank"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while not _get_json(f"http://127.0.0.1:{port}/json/version"):
+        if process.poll() is not None or time.monotonic() > deadline:
+            stop_chromium(process)
+            raise RuntimeError(f"Chromium did not start listening on port {port}")
+        time.sleep(0.1)
+    return process
+
+
+def stop_chromium(process: Optional[subprocess.Popen]) -> None:
+    """Terminate a Chromium started by ``launch_chromium``, killing it if it won't exit."""
+    if process and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+class DaemonBrowser:
+    """Stands in for crawl4ai's ``ManagedBrowser`` so a crawler connects to the daemon.
+
+    ``start`` hands back the daemon's CDP URL instead of launching Chromium,
+    and ``cleanup`` leaves the browser running for the next crawl.
+    """
+
+    def __init__(self, cdp_url: str):
+        self.cdp_url = cdp_url
+
+    async def start(self) -> str:
+        return self.cdp_url
+
+    async def cleanup(self) -> None:
+        pass
+
+
+class ProfileBrowser:
+    """Stands in for crawl4ai's ``ManagedBrowser`` to run Playwright's Chromium on a persistent profile.
+
+    crawl4ai 0.4.247 only supports persistent profiles by launching a system
+    Chrome; this launches the Chromium the rest of the crawlers use instead.
+    The profile, and the disk cache in it, is kept when the browser closes.
+    """
+
+    def __init__(self, profile_dir: Path, extra_args: Optional[List[str]] = None):
+        self.profile_dir = Path(profile_dir)
+        self.extra_args = extra_args or []
+        self.process: Optional[subprocess.Popen] = None
+
+    async def start(self) -> str:
+        port = _free_port()
+        self.process = await asyncio.to_thread(launch_chromium, port, self.profile_dir, self.extra_args)
+        return f"http://127.0.0.1:{port}"
+
+    async def cleanup(self) -> None:
+        await asyncio.to_thread(stop_chromium, self.process)
+        self.process = None
+
+
+def attach(crawler: Any, browser: Any) -> None:
+    """Make an unstarted ``AsyncWebCrawler`` use a ``DaemonBrowser`` or ``ProfileBrowser``.
+
+    The crawler's ``BrowserConfig`` must have ``use_managed_browser=True`` so
+    crawl4ai connects over CDP rather than launching its own browser.
+    """
+    crawler.crawler_strategy.browser_manager.managed_browser = browser
+
+
+class BrowserDaemon:
+    """Keep one Chromium with remote debugging alive until it sits idle."""
+
+    def __init__(self, port: int = DEFAULT_PORT, idle_timeout: float = 900.0,
+                 max_rss_mb: float = 2048.0, check_interval: float = 5.0,
+                 state_file: Path = STATE_FILE, profile_dir: Path = PROFILE_DIR):
+        """Initialize the daemon.
+
+        Args:
+            port: Remote debugging port Chromium listens on
+            idle_timeout: Seconds without an open page before the daemon exits
+            max_rss_mb: Chromium memory above which it is restarted once no pages are open
+            check_interval: Seconds between health checks
+            state_file: Where the daemon advertises its pid and port
+            profile_dir: Persistent Chromium profile holding the disk cache
+        """
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.max_rss_mb = max_rss_mb
+        self.check_interval = check_interval
+        self.state_file = Path(state_file)
+        self.profile_dir = Path(profile_dir)
+        self.endpoint = f"http://127.0.0.1:{port}"
+        self.process: Optional[subprocess.Popen] = None
+        self._stopping = False
+        self.launches = 0
+
+    def _launch(self) -> None:
+        """Start Chromium and wait until its DevTools endpoint answers."""
+        self.process = launch_chromium(self.port, self.profile_dir)
+        self.launches += 1
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.state_file.write_text(json.dumps({
+            "pid": os.getpid(),
+            "browser_pid": self.process.pid,
+            "port": self.port,
+            "started": time.time(),
+        }))
+        print(f"Chromium {self.process.pid} listening on {self.endpoint}")
+
+    def _stop_browser(self) -> None:
+        """Terminate Chromium, keeping its profile for the next launch."""
+        stop_chromium(self.process)
+        self.process = None
+
+    def _healthy(self) -> bool:
+        return self.process is not None and self.process.poll() is None and \
+            _get_json(f"{self.endpoint}/json/version", timeout=2) is not None
+
+    def _open_pages(self) -> int:
+        """Count pages crawlers have open, ignoring Chromium's initial blank tab."""
+        targets = _get_json(f"{self.endpoint}/json/list", timeout=2) or []
+        return sum(1 for t in targets if t.get("type") == "page" and t.get("url") != "about:blank")
+
+    def _rss_mb(self) -> float:
+        try:
+            browser = psutil.Process(self.process.pid)
+            processes = [browser] + browser.children(recursive=True)
+        except psutil.Error:
+            return 0.0
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    def _handle_signal(self, signum, frame) -> None:
+        self._stopping = True
+
+    def run(self) -> None:
+        """Run until stopped or idle, keeping Chromium healthy in between."""
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+        self._launch()
+        last_active = time.monotonic()
+        try:
+            while not self._stopping:
+                time.sleep(self.check_interval)
+                if not self._healthy():
+                    print("Chromium stopped responding, restarting")
+                    self._stop_browser()
+                    self._launch()
+                    continue
+
+                if self._open_pages():
+                    last_active = time.monotonic()
+                    continue
+                if time.monotonic() - last_active > self.idle_timeout:
+                    print(f"No pages open for {self.idle_timeout:.0f}s, shutting down")
+                    break
+                rss = self._rss_mb()
+                if rss > self.max_rss_mb:
+                    print(f"Chromium using {rss:.0f} MB while idle, restarting")
+                    self._stop_browser()
+                    self._launch()
+        finally:
+            self._stop_browser()
+            state = read_state(self.state_file)
+            if state and state.get("pid") == os.getpid():
+                self.state_file.unlink(missing_ok=True)
+            print(f"Browser daemon stopped after {self.launches} launch(es)")
+
+
+def start_daemon(port: int, idle_timeout: float, max_rss_mb: float,
+                 profile_dir: Path = PROFILE_DIR) -> Optional[str]:
+    """Start the daemon in the background unless one is already running.
+
+    Returns:
+        Optional[str]: The daemon's CDP URL, or None if it failed to come up
+    """
+    endpoint = daemon_endpoint()
+    if endpoint:
+        print(f"Browser daemon already running at {endpoint}")
+        return endpoint
+
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOG_FILE, "a") as log:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "run", "--port", str(port),
+             "--idle-timeout", str(idle_timeout), "--max-rss-mb", str(max_rss_mb),
+             "--profile-dir", str(profile_dir)],
+            stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        endpoint = daemon_endpoint()
+        if endpoint:
+            print(f"Browser daemon started at {endpoint} (idle timeout {idle_timeout:.0f}s)")
+            return endpoint
+        time.sleep(0.2)
+    print(f"Browser daemon did not start, see {LOG_FILE}")
+    return None
+
+
+def stop_daemon() -> bool:
+    """Stop a running daemon. Returns True if one was running."""
+    state = read_state()
+    if not state or not psutil.pid_exists(state.get("pid", -1)):
+        print("Browser daemon is not running")
+        return False
+    try:
+        daemon = psutil.Process(state["pid"])
+        daemon.terminate()
+        daemon.wait(timeout=10)
+    except psutil.TimeoutExpired:
+        daemon.kill()
+    except psutil.Error:
+        pass
+    print("Browser daemon stopped")
+    return True
+
+
+def daemon_status() -> None:
+    """Print where the daemon is listening and which Chromium it runs."""
+    endpoint = daemon_endpoint()
+    if not endpoint:
+        print("Browser daemon is not running")
+        return
+    state = read_state()
+    version = _get_json(f"{endpoint}/json/version") or {}
+    pages = _get_json(f"{endpoint}/json/list") or []
+    print(f"Browser daemon {state['pid']} at {endpoint}")
+    print(f"  Browser: {version.get('Browser', 'unknown')} (pid {state.get('browser_pid')})")
+    print(f"  Up since: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(state['started']))}")
+    print(f"  Open pages: {sum(1 for t in pages if t.get('type') == 'page' and t.get('url') != 'about:blank')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep a warm Chromium running for crawlers to attach to.')
+    parser.add_argument('command', choices=['start', 'stop', 'status', 'run'],
+                        help='start in the background, stop, show status, or run in the foreground')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Remote debugging port')
+    parser.add_argument('--idle-timeout', type=float, default=900.0,
+                        help='Seconds without open pages before the daemon exits')
+    parser.add_argument('--max-rss-mb', type=float, default=2048.0,
+                        help='Restart Chromium when idle and using more memory than this')
+    parser.add_argument('--profile-dir', type=Path, default=PROFILE_DIR,
+                        help='Persistent Chromium profile, kept across restarts for its disk cache')
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        sys.exit(0 if start_daemon(args.port, args.idle_timeout, args.max_rss_mb, args.profile_dir) else 1)
+    elif args.command == 'stop':
+        stop_daemon()
+    elif args.command == 'status':
+        daemon_status()
+    else:
+        BrowserDaemon(port=args.port, idle_timeout=args.idle_timeout, max_rss_mb=args.max_rss_mb,
+                      profile_dir=args.profile_dir).run()
+
+
+if __name__ == "__main__":
+    main()
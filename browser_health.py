@@ -0,0 +1,122 @@
+"""Health tracking for the shared browser: memory, errors and hung renders."""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import psutil
+
+# Substrings of the process names Playwright's Chromium builds run under
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+
+# crawl4ai error messages that mean the page or browser died under the render
+BROWSER_CRASH_MARKERS = (
+    "Target page, context or browser has been closed",
+    "Browser has been closed",
+    "Target closed",
+    "Page crashed",
+)
+
+
+@dataclass
+class HealthThresholds:
+    """Limits that trigger a browser recycle.
+
+    Attributes:
+        max_rss_mb: Combined resident memory of the browser processes
+        max_pages: Renders served by one browser before it is replaced
+        max_error_rate: Share of failed renders in the recent window
+        error_window: Number of recent renders the error rate is measured over
+        max_consecutive_timeouts: Hung renders in a row
+        check_every: Renders between memory samples
+    """
+    max_rss_mb: int = 2048
+    max_pages: int = 1000
+    max_error_rate: float = 0.5
+    error_window: int = 40
+    max_consecutive_timeouts: int = 3
+    check_every: int = 20
+
+
+def browser_rss_mb() -> float:
+    """Sum the resident memory of the browser processes started by this process."""
+    total = 0
+    try:
+        children = psutil.Process().children(recursive=True)
+    except psutil.Error:
+        return 0.0
+    for child in children:
+        try:
+            if any(name in child.name().lower() for name in BROWSER_PROCESS_NAMES):
+                total += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+
+def is_browser_crash(error_message: Optional[str]) -> bool:
+    """Check whether a render failed because its page or browser went away."""
+    return bool(error_message) and any(marker in error_message for marker in BROWSER_CRASH_MARKERS)
+
+
+class BrowserSupervisor:
+    """Track the health of one browser and decide when to recycle it.
+
+    The pool reports every render outcome; ``recycle_reason`` returns why the
+    browser should be replaced, or None while it is healthy.
+    """
+
+    def __init__(self, thresholds: Optional[HealthThresholds] = None):
+        self.thresholds = thresholds or HealthThresholds()
+        self._recent = deque(maxlen=self.thresholds.error_window)
+        self.pages = 0
+        self.consecutive_timeouts = 0
+        self.peak_rss_mb = 0.0
+        self.last_rss_mb = 0.0
+
+        # Run statistics
+        self.recycles: Dict[str, int] = {}
+        self.timeouts = 0
+        self.pages_closed = 0
+
+    def record(self, success: bool, timed_out: bool = False) -> None:
+        """Record the outcome of one render."""
+        self.pages += 1
+        self._recent.append(success)
+        if timed_out:
+            self.timeouts += 1
+            self.consecutive_timeouts += 1
+        else:
+            self.consecutive_timeouts = 0
+        if self.pages % self.thresholds.check_every == 0:
+            self.last_rss_mb = browser_rss_mb()
+            self.peak_rss_mb = max(self.peak_rss_mb, self.last_rss_mb)
+
+    def recycle_reason(self) -> Optional[str]:
+        """Get the reason the browser should be recycled, if any."""
+        limits = self.thresholds
+        if self.consecutive_timeouts >= limits.max_consecutive_timeouts:
+            return "timeouts"
+        if self.last_rss_mb >= limits.max_rss_mb:
+            return "memory"
+        if self.pages >= limits.max_pages:
+            return "page_limit"
+        if len(self._recent) == self._recent.maxlen:
+            error_rate = self._recent.count(False) / len(self._recent)
+            if error_rate >= limits.max_error_rate:
+                return "errors"
+        return None
+
+    def reset(self, reason: str) -> None:
+        """Start tracking a fresh browser after a recycle."""
+        self.recycles[reason] = self.recycles.get(reason, 0) + 1
+        self._recent.clear()
+        self.pages = 0
+        self.consecutive_timeouts = 0
+        self.last_rss_mb = 0.0
+
+    def report(self) -> None:
+        """Print recycles, timeouts and peak browser memory."""
+        recycles = ", ".join(f"{reason}: {n}" for reason, n in sorted(self.recycles.items())) or "none"
+        print(f"Browser health: peak RSS {self.peak_rss_mb:.0f} MiB, {self.timeouts} timeouts, "
+              f"{self.pages_closed} hung pages closed, recycles ({recycles})")
@@ -0,0 +1,456 @@
+"""Shared browser pool for crawl4ai-based crawlers."""
+
+import asyncio
+import copy
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+
+from asset_cache import AssetCache
+from browser_daemon import DaemonBrowser, ProfileBrowser, attach, daemon_endpoint, profile_in_use
+from browser_health import BrowserSupervisor, HealthThresholds, is_browser_crash
+from dispatcher import MemoryAdaptiveDispatcher
+from latency import LatencyTracker
+from readiness import ReadinessRecorder
+from resource_policy import ResourceBlocker, ResourcePolicy
+from tab_sessions import TabSessions
+
+# Policy and page of the render running in the current task, read by the crawl4ai hook
+_render_state: ContextVar[Optional[Dict[str, Any]]] = ContextVar("render_state", default=None)
+
+
+class BrowserPool:
+    """A single managed browser that every browser-based crawler borrows from.
+
+    The pool exposes the same ``arun(url=..., config=...)`` call as
+    ``AsyncWebCrawler`` so it can be passed anywhere a crawler instance was
+    expected. Chromium is launched once on first use and ``pool_size`` caps how
+    many pages render at the same time across all sources sharing the pool.
+
+    A ``BrowserSupervisor`` watches every render. Hung pages are closed, and
+    the whole browser is recycled once memory, error-rate, timeout or page-count
+    thresholds are crossed. A render that timed out or lost its browser is
+    requeued only when a recycle replaced the browser since it started.
+
+    Render latency is tracked per source. Once enough renders have been seen,
+    timeouts follow the source's p99 latency, and a render running past the
+    p95 gets a hedged second attempt on a fresh page.
+
+    When a ``browser_daemon`` is running, the pool connects to its warm
+    Chromium over CDP instead of launching one, and closing the pool only
+    disconnects.
+
+    With a ``profile_dir`` the browser keeps its HTTP disk cache between
+    runs, and an ``asset_cache`` serves static assets from a local store.
+
+    Renders called with ``reuse_tab=True`` navigate an idle tab that already
+    rendered the same site, keeping the site's shell assets warm.
+    """
+
+    def __init__(self, browser_config: Optional[BrowserConfig] = None, pool_size: int = 5,
+                 resource_policy: Optional[ResourcePolicy] = None,
+                 health: Optional[HealthThresholds] = None,
+                 render_timeout: Optional[float] = None,
+                 max_requeues: int = 1, launch_retries: int = 3,
+                 adaptive_timeouts: bool = True, hedging: bool = True,
+                 use_daemon: bool = True, reuse_tabs: bool = True,
+                 profile_dir: Optional[Path] = None, asset_cache: Optional[AssetCache] = None):
+        """Initialize the pool.
+
+        Args:
+            browser_config: Browser settings for the shared Chromium instance
+            pool_size: Maximum number of pages rendering concurrently
+            resource_policy: Request blocking for renders that don't pass their own
+            health: Thresholds that trigger a browser recycle
+            render_timeout: Seconds before a render counts as hung; None waits indefinitely
+            max_requeues: Times a hung or crashed render is retried on a fresh browser
+            launch_retries: Attempts at launching the browser before giving up
+            adaptive_timeouts: Derive each source's timeout from its p99 render latency
+            hedging: Start a second attempt when a render passes the source's p95 latency
+            use_daemon: Attach to a running ``browser_daemon`` instead of launching Chromium
+            reuse_tabs: Let renders that ask for it navigate a warm same-site tab in place
+            profile_dir: Persistent Chromium profile whose disk cache outlives the run
+            asset_cache: Store answering static asset requests across runs
+        """
+        self.browser_config = browser_config or BrowserConfig(
+            headless=True,
+            ignore_https_errors=True
+        )
+        self.pool_size = pool_size
+        self._crawler: Optional[AsyncWebCrawler] = None
+        self._slots = asyncio.Semaphore(pool_size)
+        self._start_lock = asyncio.Lock()
+        self._recycling = False
+        self.use_daemon = use_daemon
+        self.attached: Optional[str] = None
+        self.profile_dir = profile_dir
+
+        # Health supervision
+        self.supervisor = BrowserSupervisor(health)
+        self.render_timeout = render_timeout
+        self.max_requeues = max_requeues
+        self.launch_retries = launch_retries
+
+        # Adaptive timeouts and hedged attempts
+        self.latency = LatencyTracker()
+        self.adaptive_timeouts = adaptive_timeouts
+        self.hedging = hedging
+        self.hedges = 0
+        self.hedges_won = 0
+
+        # Warm same-site tabs, one crawl4ai session each
+        self.reuse_tabs = reuse_tabs
+        self.tabs = TabSessions(max_idle_per_site=pool_size)
+
+        # Request interception
+        self.resource_policy = resource_policy
+        self.asset_cache = asset_cache
+        self.blocker = ResourceBlocker(asset_cache)
+
+        # Run statistics
+        self.readiness = ReadinessRecorder()
+        self.launches = 0
+        self.pages_rendered = 0
+        self.pages_in_flight = 0
+
+    async def start(self) -> "BrowserPool":
+        """Launch the shared browser if it is not running yet."""
+        async with self._start_lock:
+            if self._crawler is None:
+                for attempt in range(self.launch_retries):
+                    try:
+                        crawler = self._new_crawler()
+                        await crawler.start()
+                        break
+                    except Exception as e:
+                        print(f"Browser launch attempt {attempt + 1}/{self.launch_retries} failed: {str(e)}")
+                        if attempt == self.launch_retries - 1:
+                            raise
+                        await asyncio.sleep(2 ** attempt)
+                crawler.crawler_strategy.set_hook("before_goto", self._before_goto)
+                self._crawler = crawler
+                self.launches += 1
+                if self.attached:
+                    print(f"Browser pool attached to daemon at {self.attached} (pool size: {self.pool_size})")
+                else:
+                    print(f"Browser pool started (pool size: {self.pool_size})")
+        return self
+
+    def _new_crawler(self) -> AsyncWebCrawler:
+        """Create a crawler on the warm daemon browser if one is running.
+
+        Otherwise launch Chromium on the persistent profile if one is set
+        and free, or a throwaway browser if not.
+        """
+        self.attached = daemon_endpoint() if self.use_daemon else None
+        if self.attached:
+            browser = DaemonBrowser(self.attached)
+        elif self.profile_dir and not profile_in_use(self.profile_dir):
+            browser = ProfileBrowser(self.profile_dir, self.browser_config.extra_args)
+        else:
+            if self.profile_dir:
+                print(f"Profile {self.profile_dir} is in use by another browser, launching without it")
+            return AsyncWebCrawler(config=self.browser_config)
+
+        # crawl4ai only connects over CDP for managed browsers
+        config = copy.copy(self.browser_config)
+        config.use_managed_browser = True
+        crawler = AsyncWebCrawler(config=config)
+        attach(crawler, browser)
+        return crawler
+
+    async def close(self) -> None:
+        """Shut down the shared browser."""
+        async with self._start_lock:
+            if self._crawler is not None:
+                try:
+                    await self._crawler.close()
+                finally:
+                    self._crawler = None
+                    self.tabs.clear()
+                print(f"Browser pool closed - {self.stats()}")
+                self.blocker.report()
+                if self.asset_cache:
+                    self.asset_cache.report()
+                self.readiness.report()
+                self.supervisor.report()
+                self.latency.report()
+                self.tabs.report()
+
+    async def __aenter__(self) -> "BrowserPool":
+        # The browser is launched on the first render, so a run whose pages
+        # are all served without rendering never starts Chromium
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow the shared crawler for one page slot.
+
+        Yields:
+            AsyncWebCrawler: The shared crawler instance
+        """
+        async with self._slots:
+            # Started inside the slot so a browser recycled while waiting is relaunched
+            await self.start()
+            self.pages_in_flight += 1
+            try:
+                yield self._crawler
+            finally:
+                self.pages_in_flight -= 1
+
+    async def recycle(self, reason: str) -> None:
+        """Replace the browser once the renders already in flight have finished.
+
+        Args:
+            reason: Why the browser is being recycled, for the health report
+        """
+        if self._recycling:
+            return
+        self._recycling = True
+        held = 0
+        try:
+            # Holding every slot drains in-flight renders and keeps new ones out
+            for _ in range(self.pool_size):
+                await self._slots.acquire()
+                held += 1
+            async with self._start_lock:
+                if self._crawler is not None:
+                    try:
+                        await self._crawler.close()
+                    except Exception as e:
+                        print(f"Error closing browser during recycle: {str(e)}")
+                    finally:
+                        self._crawler = None
+                        self.tabs.clear()
+            print(f"Recycling browser ({reason}) after {self.supervisor.pages} pages")
+            self.supervisor.reset(reason)
+        finally:
+            for _ in range(held):
+                self._slots.release()
+            self._recycling = False
+
+    async def _close_page(self, state: Dict[str, Any]) -> None:
+        """Close the page a hung or abandoned render was using so its renderer is freed."""
+        page = state.get("page")
+        if page is None:
+            return
+        try:
+            await page.close()
+            self.supervisor.pages_closed += 1
+        except Exception:
+            pass
+
+    async def _before_goto(self, page, context=None, url: str = None, **kwargs):
+        """crawl4ai hook: apply the render's resource policy before navigating."""
+        # The hook runs inside the render's task, so this is that render's own state
+        state = _render_state.get()
+        if state is not None:
+            state["page"] = page
+            if state["policy"] or self.asset_cache:
+                await self.blocker.attach(page, state["policy"])
+        return page
+
+    async def _render_once(self, url: str, config: Optional[CrawlerRunConfig],
+                           policy: Optional[ResourcePolicy], timeout: Optional[float],
+                           reuse_tab: bool = False, **kwargs) -> Tuple[Any, bool, float]:
+        """Render a page on one slot, in a warm same-site tab if ``reuse_tab`` is set.
+
+        Returns:
+            Tuple[Any, bool, float]: The result (None on timeout), whether it
+            timed out, and the seconds spent rendering
+        """
+        state = {"policy": policy, "page": None}
+        token = _render_state.set(state)
+        try:
+            async with self.acquire() as crawler:
+                tab = self.tabs.checkout(url) if reuse_tab and self.reuse_tabs else None
+                if tab:
+                    config = self.tabs.bind(config, tab)
+                start = time.perf_counter()
+                try:
+                    render = crawler.arun(url=url, config=config, **kwargs)
+                    if timeout:
+                        render = asyncio.wait_for(render, timeout=timeout)
+                    result = await render
+                except asyncio.TimeoutError:
+                    await self._close_page(state)
+                    if tab:
+                        await self.tabs.close(crawler, tab)
+                    return None, True, time.perf_counter() - start
+                except asyncio.CancelledError:
+                    await self._close_page(state)
+                    if tab:
+                        await self.tabs.close(crawler, tab)
+                    raise
+
+                elapsed = time.perf_counter() - start
+                # Only a tab that rendered cleanly goes back for the next page of its site
+                if tab and not (result is not None and result.success and self.tabs.checkin(tab, elapsed)):
+                    await self.tabs.close(crawler, tab)
+                return result, False, elapsed
+        finally:
+            _render_state.reset(token)
+
+    async def _render_hedged(self, url: str, config: Optional[CrawlerRunConfig],
+                             policy: Optional[ResourcePolicy], source: str,
+                             timeout: Optional[float], reuse_tab: bool = False, **kwargs) -> Tuple[Any, bool, float]:
+        """Render a page, starting a second attempt on a fresh page if the first runs long.
+
+        The second attempt starts once the first passes the source's p95
+        latency. Whichever succeeds first wins and the other is cancelled.
+        """
+        first = asyncio.create_task(self._render_once(url, config, policy, timeout, reuse_tab, **kwargs))
+        hedge_after = self.latency.hedge_after(source) if self.hedging else None
+        pending = {first}
+        try:
+            if hedge_after:
+                done, pending = await asyncio.wait(pending, timeout=hedge_after)
+                if done:
+                    return first.result()
+                self.hedges += 1
+                print(f"Hedging {url} after {hedge_after:.1f}s")
+                pending.add(asyncio.create_task(self._render_once(url, config, policy, timeout, reuse_tab, **kwargs)))
+
+            outcome = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        outcome = task.result()
+                    except Exception as e:
+                        if not pending and outcome is None:
+                            raise
+                        print(f"Hedged attempt for {url} failed: {str(e)}")
+                        continue
+                    result = outcome[0]
+                    if result is not None and result.success:
+                        if task is not first:
+                            self.hedges_won += 1
+                        return outcome
+            return outcome
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def arun(self, url: str, config: Optional[CrawlerRunConfig] = None,
+                   resource_policy: Optional[ResourcePolicy] = None,
+                   source: Optional[str] = None, timeout: Optional[float] = None,
+                   reuse_tab: bool = False, **kwargs) -> Any:
+        """Render a page on the shared browser, waiting for a free slot.
+
+        Args:
+            url: Page to render
+            config: crawl4ai run configuration
+            resource_policy: Request blocking for this render, overriding the pool default
+            source: Name latency and time-to-ready are tracked under; defaults to the URL's host
+            timeout: Seconds before the render counts as hung until the source's
+                latency is known, and the upper bound on the adaptive timeout after that
+            reuse_tab: Navigate a warm tab that already rendered this site instead of opening one
+        """
+        policy = resource_policy or self.resource_policy
+        source = source or urlparse(url).netloc
+        default_timeout = timeout or self.render_timeout
+        for attempt in range(self.max_requeues + 1):
+            # Recomputed per attempt, since the failed attempt may have changed the source's latency
+            render_timeout = self.latency.timeout(source, default_timeout) if self.adaptive_timeouts \
+                else default_timeout
+            recycles = sum(self.supervisor.recycles.values())
+            try:
+                result, timed_out, elapsed = await self._render_hedged(
+                    url, config, policy, source, render_timeout, reuse_tab, **kwargs
+                )
+            except asyncio.CancelledError:
+                # The caller's own timeout gave up on the render
+                self.supervisor.record(success=False, timed_out=True)
+                raise
+
+            crashed = bool(result) and not result.success and is_browser_crash(result.error_message)
+            self.supervisor.record(success=bool(result) and result.success, timed_out=timed_out)
+            if result is not None and result.success:
+                self.latency.record(source, elapsed)
+            reason = self.supervisor.recycle_reason() or ("crash" if crashed else None)
+            if reason:
+                await self.recycle(reason)
+            if not (timed_out or crashed) or attempt == self.max_requeues:
+                break
+            # Retrying on the browser that just failed would likely fail the same way
+            if sum(self.supervisor.recycles.values()) == recycles:
+                break
+            print(f"Requeueing {url} after {'timeout' if timed_out else 'browser crash'}")
+
+        if timed_out:
+            raise asyncio.TimeoutError(f"Render of {url} timed out after {render_timeout:.0f}s")
+        self.pages_rendered += 1
+        self.readiness.record(source, url, result)
+        return result
+
+    async def arun_many(self, urls: List[str], config: Optional[CrawlerRunConfig] = None,
+                        dispatcher: Optional[MemoryAdaptiveDispatcher] = None,
+                        config_for: Optional[Callable[[str], CrawlerRunConfig]] = None,
+                        **kwargs) -> AsyncIterator[Tuple[str, Any]]:
+        """Render a batch of pages, yielding ``(url, result)`` as each finishes.
+
+        Args:
+            urls: Pages to render
+            config: crawl4ai run configuration shared by the batch
+            dispatcher: Admission and rate-limit policy; defaults to one sized to the pool
+            config_for: Picks a configuration per URL instead of ``config``
+            **kwargs: Passed through to ``arun`` for every page
+        """
+        dispatcher = dispatcher or MemoryAdaptiveDispatcher(max_session_permit=self.pool_size)
+
+        async def render(url: str) -> Any:
+            return await self.arun(url=url, config=config_for(url) if config_for else config, **kwargs)
+
+        async for item in dispatcher.run(urls, render):
+            yield item
+
+    def stats(self) -> Dict[str, int]:
+        """Get pool statistics for the current run."""
+        return {
+            "launches": self.launches,
+            "recycles": sum(self.supervisor.recycles.values()),
+            "hedges": self.hedges,
+            "hedges_won": self.hedges_won,
+            "tabs_reused": sum(t.warm_renders for t in self.tabs.timings.values()),
+            "pool_size": self.pool_size,
+            "pages_rendered": self.pages_rendered,
+            "pages_in_flight": self.pages_in_flight
+        }
+
+
+@asynccontextmanager
+async def borrow_pool(pool: Optional[BrowserPool] = None,
+                      browser_config: Optional[BrowserConfig] = None,
+                      pool_size: int = 5, **pool_kwargs):
+    """Use a shared pool if one was given, otherwise open a private one.
+
+    A borrowed pool is left running for its owner to close; a private pool is
+    closed when the block exits.
+
+    Args:
+        pool: Shared pool owned by the caller, if any
+        browser_config: Browser settings for a private pool
+        pool_size: Page concurrency for a private pool
+        **pool_kwargs: Further ``BrowserPool`` settings for a private pool
+
+    Yields:
+        BrowserPool: The pool to render pages with
+    """
+    if pool is not None:
+        yield pool
+        return
+
+    async with BrowserPool(browser_config=browser_config, pool_size=pool_size,
+                           **pool_kwargs) as private_pool:
+        yield private_pool
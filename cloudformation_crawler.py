@@ -6,15 +6,20 @@ import asyncio
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Set
 from urllib.parse import urljoin, urlparse
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
+from crawl4ai import CrawlerRunConfig, BrowserConfig
 from base import BaseDocCrawler, SDKConfig
-from bs4 import BeautifulSoup
+from browser_pool import BrowserPool, borrow_pool
+from hybrid_fetch import HybridFetcher
+from page_extract import ExtractionSpec
+from readiness import ReadinessSpec
+from resource_policy import ResourcePolicy
+from stage_timer import StageTimer
 import traceback
 
 class CloudFormationNativeCrawler(BaseDocCrawler):
     """Crawler for AWS CloudFormation documentation using native Crawl4AI methods."""
     
-    def __init__(self, output_dir: str, config: Optional[SDKConfig] = None):
+    def __init__(self, output_dir: str, config: Optional[SDKConfig] = None, static_first: bool = True):
         if config is None:
             config = SDKConfig(
                 base_url="https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/aws-template-resource-type-ref.html",
@@ -23,25 +28,53 @@ class CloudFormationNativeCrawler(BaseDocCrawler):
             )
         super().__init__(output_dir, config)
         self._visited_urls = set()
+        self.static_first = static_first  # Try plain HTTP before rendering
+        self.timer = StageTimer("cloudformation")
+        
+        content_selectors = [
+            'div.awsdocs-content',
+            'div#main-content',
+            'div[role="main"]',
+            'div.awsui-context-content-header',
+            'main',
+            'article',
+            'div.table-contents'
+        ]
+        
+        # Content, links and title are extracted in the page and returned as JSON;
+        # without a selector match, the best-scoring content block with over 1000
+        # characters of text is used (see content_detect)
+        extraction = ExtractionSpec(
+            content_selectors=content_selectors,
+            link_selectors={"links": "a[href]"},
+            remove_selectors=[
+                '.awsdocs-navigation', '.awsdocs-breadcrumbs',
+                '.awsdocs-page-header', '.awsdocs-thumbs-feedback'
+            ],
+            fallback_min_text=1000
+        )
+        readiness = ReadinessSpec(selector="div.awsdocs-content", quiet_ms=300)
         
         # Define sources with extraction strategies
         self.sources = {
             "cloudformation": {
                 "url": "https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/aws-template-resource-type-ref.html",
                 "output_dir": "cloudformation",
+                "content_selectors": content_selectors,
+                "extraction": extraction,
+                # The AWS docs shell builds the page with JavaScript; media is never needed
+                "resource_policy": ResourcePolicy(name="cloudformation"),
                 "index_config": CrawlerRunConfig(
-                    wait_for="css:div.awsdocs-content",  # Wait for AWS docs content
-                    wait_until="networkidle",
+                    js_code=extraction.js_code(readiness),  # Extract once content rendered and DOM settled
+                    wait_until="domcontentloaded",
                     process_iframes=True,
-                    only_text=False,
-                    css_selector="div.awsdocs-content"  # Get AWS docs content
+                    only_text=False
                 ),
                 "page_config": CrawlerRunConfig(
-                    wait_for="css:div.awsdocs-content",  # Wait for AWS docs content
-                    wait_until="networkidle",
+                    js_code=extraction.js_code(readiness),  # Extract once content rendered and DOM settled
+                    wait_until="domcontentloaded",
                     process_iframes=True,
-                    only_text=False,
-                    css_selector="div.awsdocs-content"  # Get AWS docs content
+                    only_text=False
                 )
             }
         }
@@ -81,23 +114,6 @@ class CloudFormationNativeCrawler(BaseDocCrawler):
         
         return 'index'
     
-    def _clean_content(self, article):
-        """Clean up the HTML content."""
-        # Remove navigation elements
-        for selector in ['.awsdocs-navigation', '.awsdocs-breadcrumbs', '.awsdocs-page-header']:
-            for el in article.select(selector):
-                el.decompose()
-        
-        # Clean up code blocks
-        for code in article.select('pre code'):
-            code.string = f"\n{code.get_text()}\n"
-        
-        # Remove internal links and buttons
-        for el in article.select('.awsdocs-thumbs-feedback'):
-            el.decompose()
-        
-        return article
-    
     async def process_page(self, source_key: str, crawler, url: str = None):
         """Process a single page using Crawl4ai's native extraction."""
         source = self.sources[source_key]
@@ -127,33 +143,12 @@ class CloudFormationNativeCrawler(BaseDocCrawler):
                 
                 if config:
                     try:
-                        # First ensure page is loaded
-                        pre_config = CrawlerRunConfig(
-                            wait_for="css:body",
-                            wait_until="domcontentloaded",
-                            process_iframes=True,
-                            only_text=False,
-                            css_selector="body"
-                        )
-                        
-                        # Load the page initially
-                        pre_result = await asyncio.wait_for(
-                            crawler.arun(url=url, config=pre_config),
-                            timeout=30
-                        )
-                        
-                        if not pre_result or not pre_result.success:
-                            print(f"Failed initial page load for {url}")
-                            raise Exception("Initial page load failed")
-                        
-                        # Wait a bit for dynamic content
-                        await asyncio.sleep(2)
-                        
-                        # Now load with specific config
-                        result = await asyncio.wait_for(
-                            crawler.arun(url=url, config=config),
-                            timeout=30
-                        )
+                        # Render once; the config waits for the content selector,
+                        # so links and content both come from this single result
+                        with self.timer.stage("render"):
+                            result = await crawler.arun(url=url, config=config,
+                                                        resource_policy=source["resource_policy"],
+                                                        timeout=30)
                         
                         if not result or not result.success:
                             print(f"Failed to load page {url}")
@@ -164,79 +159,37 @@ class CloudFormationNativeCrawler(BaseDocCrawler):
                         print(f"Result error message: {result.error_message}")
                         print(f"Result HTML length: {len(result.html) if result.html else 0}")
                         
-                        # Parse the HTML
-                        soup = BeautifulSoup(result.html, 'html.parser')
+                        # Read the page extracted in the browser
+                        with self.timer.stage("parse"):
+                            page = source["extraction"].extract(result, url)
+                            if page is None:
+                                raise Exception("Nothing extracted")
                         
-                        # Debug: Print HTML structure
-                        print("\nDEBUG: HTML Structure")
-                        print("=" * 80)
-                        
-                        # Print all div classes
-                        print("\nAll div classes found:")
-                        for div in soup.find_all('div', class_=True):
-                            print(f"Found div with class: {' '.join(div['class'])}")
-                        
-                        # Print all links
-                        print("\nAll links found:")
-                        for link in soup.find_all('a', href=True):
-                            href = link.get('href', '')
-                            text = link.get_text().strip()
-                            if '/AWS_' in href and text:
-                                print(f"Link: {href} -> {text}")
-                        
-                        # Try to find content with broader selectors
-                        content_selectors = [
-                            'div.awsdocs-content',
-                            'div#main-content',
-                            'div[role="main"]',
-                            'div.awsui-context-content-header',
-                            'main',
-                            'article',
-                            'div.table-contents'
-                        ]
-                        
-                        article = None
-                        for selector in content_selectors:
-                            print(f"\nTrying selector: {selector}")
-                            article = soup.select_one(selector)
-                            if article:
-                                print(f"Found content with selector: {selector}")
-                                print(f"Content length: {len(article.get_text())}")
-                                break
-                        
-                        if not article:
-                            print("\nWARNING: No content found with standard selectors")
-                            # Try finding any div with substantial content
-                            for div in soup.find_all('div'):
-                                text = div.get_text().strip()
-                                if len(text) > 1000:  # Look for divs with significant content
-                                    print(f"Found large div with classes: {div.get('class', [])}")
-                                    article = div
-                                    break
-                        
-                        if article:
-                            # Clean up content
-                            article = self._clean_content(article)
-                            
-                            # Extract content
-                            content = article.get_text(strip=True)
-                            
-                            # Extract all AWS service links
-                            links = []
-                            for link in article.find_all('a', href=True):
-                                href = link.get('href', '')
-                                text = link.get_text().strip()
+                        links = []
+                        with self.timer.stage("extract"):
+                            if page.found:
+                                # Content arrives with navigation, breadcrumbs and feedback removed
+                                content = page.text
+                                print(f"Content length: {len(content)}")
                                 
-                                if '/AWS_' in href and text and not href.startswith('#'):
-                                    normalized_href = self._normalize_url(url, href)
-                                    if normalized_href:
-                                        links.append({
-                                            'href': normalized_href,
-                                            'text': text
-                                        })
-                            
-                            print(f"\nFound {len(links)} AWS service links")
-                            
+                                # Extract all AWS service links
+                                for link in page.links["links"]:
+                                    href = link['href']
+                                    text = link['text']
+                                    
+                                    if '/AWS_' in href and text and not href.startswith('#'):
+                                        normalized_href = self._normalize_url(url, href)
+                                        if normalized_href:
+                                            links.append({
+                                                'href': normalized_href,
+                                                'text': text
+                                            })
+                                
+                                print(f"\nFound {len(links)} AWS service links")
+                            else:
+                                print("\nWARNING: No content found with standard selectors")
+                        
+                        if page.found:
                             # Create data structure
                             data = {
                                 'content': content,
@@ -252,22 +205,23 @@ class CloudFormationNativeCrawler(BaseDocCrawler):
                             
                             # Save the content as markdown
                             if data.get('content'):
-                                markdown_content = f"# {resource_name}\n\n"
-                                markdown_content += f"URL: {url}\n\n"
-                                markdown_content += data['content']
-                                
-                                # Save markdown file
-                                self.save_markdown(source_key, resource_name, markdown_content)
-                                
-                                # Save JSON for LLM consumption
-                                doc_structure = {
-                                    "url": url,
-                                    "resource": resource_name,
-                                    "content": data['content'],
-                                    "navigation": data.get('links', []),
-                                    "timestamp": datetime.now().isoformat()
-                                }
-                                self.save_json(source_key, resource_name, doc_structure)
+                                with self.timer.stage("save"):
+                                    markdown_content = f"# {resource_name}\n\n"
+                                    markdown_content += f"URL: {url}\n\n"
+                                    markdown_content += data['content']
+                                    
+                                    # Save markdown file
+                                    self.save_markdown(source_key, resource_name, markdown_content)
+                                    
+                                    # Save JSON for LLM consumption
+                                    doc_structure = {
+                                        "url": url,
+                                        "resource": resource_name,
+                                        "content": data['content'],
+                                        "navigation": data.get('links', []),
+                                        "timestamp": datetime.now().isoformat()
+                                    }
+                                    self.save_json(source_key, resource_name, doc_structure)
                                 print(f"Saved content for {resource_name}")
                         
                         # Process navigation links for recursive crawling
@@ -275,6 +229,9 @@ class CloudFormationNativeCrawler(BaseDocCrawler):
                             href = link['href']
                             if href and not href.startswith('#'):
                                 await self.process_page(source_key, crawler, href)
+                        
+                        # Processed successfully, no further attempts needed
+                        break
                     
                     except asyncio.TimeoutError:
                         print(f"Timeout gathering URLs from {url}")
@@ -318,62 +275,70 @@ class CloudFormationNativeCrawler(BaseDocCrawler):
             json.dump(data, f, indent=2, ensure_ascii=False)
         print(f"Saved JSON to {filepath}")
     
-    async def crawl(self):
-        """Crawl the documentation."""
+    async def crawl(self, pool: Optional[BrowserPool] = None):
+        """Crawl the documentation.
+
+        Args:
+            pool: Shared browser pool; a private one is opened if omitted
+        """
         try:
             print("\nDEBUG: Starting crawl")
             print(f"Sources: {self.sources}")
             
-            for source_name, source in self.sources.items():
-                print(f"\nDEBUG: Processing source {source_name}")
-                print(f"URL: {source['url']}")
-                print(f"Output dir: {source['output_dir']}")
-                
-                # Create output directory
-                output_dir = os.path.join(self.output_dir, source["output_dir"])
-                os.makedirs(output_dir, exist_ok=True)
-                print(f"Created output directory: {output_dir}")
-                
-                # Create the crawler
-                browser_config = BrowserConfig(
-                    headless=True,
-                    ignore_https_errors=True
-                )
-                
-                async with AsyncWebCrawler(
-                    browser_config=browser_config,
-                    max_concurrent_pages=1  # Limit concurrent pages to avoid overload
-                ) as crawler:
-                    # Process the index page first
-                    print("\nDEBUG: Processing index page")
-                    await self.process_page(source_name, crawler, source["url"])
-                    
-                    # Get the list of service pages to crawl
-                    service_pages = []
-                    index_file = os.path.join(output_dir, "index.json")
-                    if os.path.exists(index_file):
-                        with open(index_file, 'r') as f:
-                            index_data = json.load(f)
-                            for link in index_data.get('navigation', []):
-                                if '/AWS_' in link['href']:
-                                    service_pages.append(link['href'])
+            # Create the browser config
+            browser_config = BrowserConfig(
+                headless=True,
+                ignore_https_errors=True
+            )
+            
+            # One browser for every source; limit concurrent pages to avoid overload
+            async with borrow_pool(pool, browser_config=browser_config, pool_size=1) as browser:
+                for source_name, source in self.sources.items():
+                    print(f"\nDEBUG: Processing source {source_name}")
+                    print(f"URL: {source['url']}")
+                    print(f"Output dir: {source['output_dir']}")
                     
-                    print(f"\nFound {len(service_pages)} service pages to crawl")
+                    # Create output directory
+                    output_dir = os.path.join(self.output_dir, source["output_dir"])
+                    os.makedirs(output_dir, exist_ok=True)
+                    print(f"Created output directory: {output_dir}")
                     
-                    # Process each service page
-                    for i, page_url in enumerate(service_pages, 1):
-                        print(f"\nProcessing service page {i}/{len(service_pages)}: {page_url}")
-                        try:
-                            await self.process_page(source_name, crawler, page_url)
-                        except Exception as e:
-                            print(f"Error processing {page_url}: {str(e)}")
-                            continue
+                    # The docs are served as complete HTML, so try plain HTTP first
+                    async with HybridFetcher(browser, source_name,
+                                             selectors=source["content_selectors"],
+                                             static_first=self.static_first) as crawler:
+                        # Process the index page first
+                        print("\nDEBUG: Processing index page")
+                        await self.process_page(source_name, crawler, source["url"])
+                        
+                        # Get the list of service pages to crawl
+                        service_pages = []
+                        index_file = os.path.join(output_dir, "index.json")
+                        if os.path.exists(index_file):
+                            with open(index_file, 'r') as f:
+                                index_data = json.load(f)
+                                for link in index_data.get('navigation', []):
+                                    if '/AWS_' in link['href']:
+                                        service_pages.append(link['href'])
+                        
+                        print(f"\nFound {len(service_pages)} service pages to crawl")
+                        
+                        # Process each service page
+                        for i, page_url in enumerate(service_pages, 1):
+                            print(f"\nProcessing service page {i}/{len(service_pages)}: {page_url}")
+                            try:
+                                await self.process_page(source_name, crawler, page_url)
+                            except Exception as e:
+                                print(f"Error processing {page_url}: {str(e)}")
+                                continue
                     
                     print("\nFinished crawling all pages")
             
         except Exception as e:
             print(f"Error in crawl: {str(e)}")
             traceback.print_exc()
+        finally:
+            self.timer.report()
     
 if __name__ == "__main__":
     crawler = CloudFormationNativeCrawler("output")
@@ -0,0 +1,233 @@
+"""One-pass main-content detection for pages no content selector matches.
+
+``find_main_content`` walks the tree once, bottom-up, totalling each element's
+text length, link text length and comma count from its children. No element's
+text is ever re-read. Every paragraph-like block with enough text scores
+points for its nearest container (full) and the container above that (half),
+as Readability does. A container's score is its points, plus a bonus for its
+tag and class, scaled down by the share of its text that is link text.
+Navigation and sidebars are mostly links, so they score low even when they
+hold a lot of text.
+
+``page_extract`` runs the same algorithm in the browser (``FIND_CONTENT_JS``),
+so in-browser and static extraction pick the same block.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from bs4 import Tag
+from bs4.element import PreformattedString
+
+# Elements that can be picked as the content block, with their tag bonus
+CANDIDATE_TAGS = {"article": 10, "main": 10, "section": 5, "div": 5}
+# Elements whose text counts as one paragraph for scoring
+BLOCK_TAGS = {"p", "pre", "li", "td", "th", "dd", "dt", "blockquote", "h1", "h2", "h3", "h4", "h5", "h6"}
+# Elements whose text is not content
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+
+MIN_BLOCK_TEXT = 25
+CLASS_WEIGHT = 25
+NEGATIVE_CLASSES = re.compile(r"nav|sidebar|footer|header|menu|breadcrumb|toc|banner|comment|related|cookie", re.I)
+POSITIVE_CLASSES = re.compile(r"content|article|main|body|document|docs?\b", re.I)
+
+
+def block_points(text_length: int, commas: int) -> float:
+    """Points a paragraph-like block gives its containers."""
+    if text_length < MIN_BLOCK_TEXT:
+        return 0.0
+    return 1 + commas + min(text_length // 100, 3)
+
+
+def class_weight(element: Tag) -> int:
+    """Score adjustment from an element's class and id."""
+    names = " ".join(element.get("class", [])) + " " + (element.get("id") or "")
+    weight = 0
+    if NEGATIVE_CLASSES.search(names):
+        weight -= CLASS_WEIGHT
+    if POSITIVE_CLASSES.search(names):
+        weight += CLASS_WEIGHT
+    return weight
+
+
+# Per-element totals, kept in lists for speed
+_ELEMENT, _TEXT, _LINKS, _COMMAS, _DIRECT_TEXT, _DIRECT_COMMAS, _POINTS = range(7)
+
+
+def score_blocks(root: Tag) -> List[Tuple[Tag, float, int]]:
+    """Score every candidate container under root in one bottom-up pass.
+
+    Returns:
+        (element, score, text length) for each container holding text, in document order
+    """
+    scored: List[list] = []
+    containers: List[list] = []  # open candidate containers, innermost last
+    blocks = 0  # open paragraph-like blocks
+    links = 0  # open <a> elements
+    stack = [([root, 0, 0, 0, 0, 0, 0.0], iter(root.contents))]
+    while stack:
+        frame, children = stack[-1]
+        for child in children:
+            if isinstance(child, Tag):
+                name = child.name
+                if name in SKIP_TAGS:
+                    continue
+                # Direct text and points only matter for containers, but every
+                # element carries them so frames share one shape
+                child_frame = [child, 0, 0, 0, 0, 0, 0.0]
+                if name in CANDIDATE_TAGS:
+                    containers.append(child_frame)
+                    scored.append(child_frame)
+                elif name in BLOCK_TAGS:
+                    blocks += 1
+                elif name == "a":
+                    links += 1
+                stack.append((child_frame, iter(child.contents)))
+                break
+            if isinstance(child, PreformattedString):
+                continue
+            length = len(child.strip())
+            if not length:
+                continue
+            commas = child.count(",")
+            frame[_TEXT] += length
+            frame[_COMMAS] += commas
+            if links:
+                frame[_LINKS] += length
+            if not blocks and containers:
+                container = containers[-1]
+                container[_DIRECT_TEXT] += length
+                container[_DIRECT_COMMAS] += commas
+        else:
+            stack.pop()
+            if not stack:
+                break
+            parent = stack[-1][0]
+            parent[_TEXT] += frame[_TEXT]
+            parent[_LINKS] += frame[_LINKS]
+            parent[_COMMAS] += frame[_COMMAS]
+            name = frame[_ELEMENT].name
+            if name in CANDIDATE_TAGS:
+                containers.pop()
+                # A container's own loose text scores as a block of its own
+                points = block_points(frame[_DIRECT_TEXT], frame[_DIRECT_COMMAS])
+                frame[_POINTS] += points
+                if containers:
+                    containers[-1][_POINTS] += points / 2
+            elif name in BLOCK_TAGS:
+                blocks -= 1
+                points = block_points(frame[_TEXT], frame[_COMMAS])
+                if containers:
+                    containers[-1][_POINTS] += points
+                    if len(containers) > 1:
+                        containers[-2][_POINTS] += points / 2
+            elif name == "a":
+                links -= 1
+
+    results = []
+    for frame in scored:
+        text = frame[_TEXT]
+        if not text:
+            continue
+        element = frame[_ELEMENT]
+        score = (frame[_POINTS] + CANDIDATE_TAGS[element.name] + class_weight(element)) \
+            * (1 - frame[_LINKS] / text)
+        results.append((element, score, text))
+    return results
+
+
+def find_main_content(root: Tag, min_text: int = 0) -> Optional[Tag]:
+    """Pick the element most likely to hold a page's main content.
+
+    Args:
+        root: Parsed page or element to search
+        min_text: Least text, in characters, the picked block must hold
+
+    Returns:
+        Optional[Tag]: The best-scoring container, or None if none has enough text
+    """
+    best = None
+    best_score = 0.0
+    for element, score, text_length in score_blocks(root):
+        if text_length > min_text and score > best_score:
+            best, best_score = element, score
+    return best
+
+
+# The same detector for the in-browser extraction script; returns an element or null
+FIND_CONTENT_JS = """
+function findMainContent(root, minText) {
+    const CANDIDATES = %(candidates)s;
+    const BLOCKS = new Set(%(blocks)s);
+    const SKIP = new Set(%(skip)s);
+    const NEGATIVE = /%(negative)s/i;
+    const POSITIVE = /%(positive)s/i;
+    const points = (length, commas) => length < %(min_block)d ? 0 : 1 + commas + Math.min(Math.floor(length / 100), 3);
+    const scored = [];
+    const containers = [];
+    let blocks = 0;
+    let links = 0;
+    const walk = (el) => {
+        const stats = {text: 0, links: 0, commas: 0, directText: 0, directCommas: 0, points: 0, el: el};
+        const name = el.localName;
+        const isCandidate = Object.prototype.hasOwnProperty.call(CANDIDATES, name);
+        if (isCandidate) { containers.push(stats); scored.push(stats); }
+        if (BLOCKS.has(name)) blocks++;
+        if (name === 'a') links++;
+        for (const child of el.childNodes) {
+            if (child.nodeType === Node.ELEMENT_NODE) {
+                if (SKIP.has(child.localName)) continue;
+                const sub = walk(child);
+                stats.text += sub.text; stats.links += sub.links; stats.commas += sub.commas;
+            } else if (child.nodeType === Node.TEXT_NODE) {
+                const value = child.nodeValue;
+                const length = value.trim().length;
+                if (!length) continue;
+                const commas = value.split(',').length - 1;
+                stats.text += length; stats.commas += commas;
+                if (links) stats.links += length;
+                if (!blocks && containers.length) {
+                    containers[containers.length - 1].directText += length;
+                    containers[containers.length - 1].directCommas += commas;
+                }
+            }
+        }
+        if (name === 'a') links--;
+        if (isCandidate) {
+            containers.pop();
+            const p = points(stats.directText, stats.directCommas);
+            stats.points += p;
+            if (containers.length) containers[containers.length - 1].points += p / 2;
+        } else if (BLOCKS.has(name)) {
+            blocks--;
+            const p = points(stats.text, stats.commas);
+            if (containers.length) {
+                containers[containers.length - 1].points += p;
+                if (containers.length > 1) containers[containers.length - 2].points += p / 2;
+            }
+        }
+        return stats;
+    };
+    for (const child of root.children) if (!SKIP.has(child.localName)) walk(child);
+    let best = null;
+    let bestScore = 0;
+    for (const s of scored) {
+        if (!s.text || s.text <= minText) continue;
+        const names = (s.el.getAttribute('class') || '').trim().split(/\\s+/).join(' ') + ' ' + (s.el.id || '');
+        let weight = 0;
+        if (NEGATIVE.test(names)) weight -= %(class_weight)d;
+        if (POSITIVE.test(names)) weight += %(class_weight)d;
+        const score = (s.points + CANDIDATES[s.el.localName] + weight) * (1 - s.links / s.text);
+        if (score > bestScore) { best = s.el; bestScore = score; }
+    }
+    return best;
+}
+""" % {
+    "candidates": "{" + ", ".join(f"{name}: {bonus}" for name, bonus in CANDIDATE_TAGS.items()) + "}",
+    "blocks": sorted(BLOCK_TAGS),
+    "skip": sorted(SKIP_TAGS),
+    "negative": NEGATIVE_CLASSES.pattern,
+    "positive": POSITIVE_CLASSES.pattern,
+    "min_block": MIN_BLOCK_TEXT,
+    "class_weight": CLASS_WEIGHT,
+}
@@ -1,7 +1,7 @@
 import asyncio
 from typing import List, Set
 import aiohttp
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from urllib.parse import urljoin, urlparse
 from pathlib import Path
 
@@ -33,7 +33,7 @@ class Crawl4AICrawler:
     
     async def extract_links(self, html: str, base_url: str) -> List[str]:
         """Extract all valid documentation links from a page."""
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         links = []
         
         # Find all links in the navigation and main content
@@ -61,7 +61,7 @@ class Crawl4AICrawler:
                 html = await response.text()
                 
                 # Extract content
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = make_soup(html)
                 main_content = soup.find('main') or soup.find('article')
                 
                 if main_content:
@@ -12,6 +12,8 @@ from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig, CacheMode
 from crawl4ai.extraction_strategy import JsonCssExtractionStrategy
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 from crawl4ai.content_filter_strategy import PruningContentFilter
+from html_cleanup import prune_tree
+from readiness import ReadinessSpec
 
 # Suppress Pydantic warning about fields
 warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
@@ -32,8 +34,8 @@ class BlogPost(BaseModel):
 
 class CustomExtractionStrategy(JsonCssExtractionStrategy):
     def preprocess_html(self, html_content):
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
+        from html_parser import make_soup
+        soup = make_soup(html_content)
         
         # First, try to find the main blog content container
         main_content = soup.find('div', {'id': 'aws-page-content'})
@@ -44,24 +46,11 @@ class CustomExtractionStrategy(JsonCssExtractionStrategy):
         
         if main_content:
             # Create a new soup with just the main content
-            new_soup = BeautifulSoup('<html><body></body></html>', 'html.parser')
+            new_soup = make_soup('<html><body></body></html>')
             new_soup.body.append(main_content)
             
-            # Remove unwanted elements
-            for element in new_soup.find_all(['script', 'style', 'noscript', 'iframe', 'nav', 'header', 'footer']):
-                element.decompose()
-            
-            # Remove elements by class or id
-            for element in new_soup.find_all(class_=lambda x: x and any(term in str(x).lower() for term in [
-                'cookie', 'navigation', 'header', 'footer', 'sidebar', 'menu', 'banner',
-                'popup', 'modal', 'overlay', 'social', 'share', 'comment'
-            ])):
-                element.decompose()
-            
-            # Remove empty elements
-            for element in new_soup.find_all():
-                if len(element.get_text(strip=True)) == 0:
-                    element.decompose()
+            # Remove unwanted, noise-class and empty elements in one pass
+            prune_tree(new_soup)
             
             return str(new_soup)
         return html_content
@@ -103,7 +92,7 @@ async def crawl_page(url: str, output_dir: str = "crawled_content") -> None:
             }
         ),
         markdown_generator=md_generator,
-        wait_until="networkidle",
+        wait_until="domcontentloaded",
         cache_mode=CacheMode.BYPASS
     )
 
@@ -132,9 +121,13 @@ async def crawl_page(url: str, output_dir: str = "crawled_content") -> None:
                 }
             ),
             markdown_generator=md_generator,
-            wait_until="networkidle",
+            wait_until="domcontentloaded",
             cache_mode=CacheMode.BYPASS,
-            wait_for="article, div.blog-post, div.blog-content, div.post-content"
+            # Arbitrary blogs may hydrate client-side, so also wait for the DOM to settle
+            wait_for=ReadinessSpec(
+                selector="article, div.blog-post, div.blog-content, div.post-content",
+                quiet_ms=500
+            ).wait_for()
         )
         
         crawler = AsyncWebCrawler(config=browser_config)
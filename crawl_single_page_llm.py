@@ -1,15 +1,22 @@
 import os
+import argparse
 import asyncio
 import json
+import re
+from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
+from llm_extract import ChunkCache, LLMExtractor
+from result_adapter import adapt_result, markdown_generator
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 URL = "https://aws.amazon.com/blogs/machine-learning/a-secure-approach-to-generative-ai-with-aws"
 
+INSTRUCTION = "Extract the blog post title, author, date, main content, key topics discussed, and AWS services mentioned. For services, include a brief description if available. Exclude any cookie notices, navigation menus, and other UI elements."
+
 
 class Product(BaseModel):
     name: str
@@ -23,7 +30,7 @@ async def main():
         api_token=os.getenv("OPENAI_API_KEY"),
         schema=Product.schema_json(),  # Or use model_json_schema()
         extraction_type="schema",
-        instruction="Extract the blog post title, author, date, main content, key topics discussed, and AWS services mentioned. For services, include a brief description if available. Exclude any cookie notices, navigation menus, and other UI elements.",
+        instruction=INSTRUCTION,
         chunk_token_threshold=1000,
         overlap_rate=0.0,
         apply_chunking=True,
@@ -54,5 +61,64 @@ async def main():
             print("Error:", result.error_message)
 
 
+async def batch_main(args: argparse.Namespace) -> None:
+    """Crawl many URLs and extract from their Markdown, reusing stored chunk results."""
+    urls = list(args.urls)
+    if args.urls_file:
+        urls += [line.strip() for line in Path(args.urls_file).read_text().splitlines() if line.strip()]
+
+    # Pages are re-crawled every run so edits are seen; the chunk cache saves the LLM calls
+    crawl_config = CrawlerRunConfig(markdown_generator=markdown_generator(), cache_mode=CacheMode.BYPASS)
+    pages = {}
+    async with AsyncWebCrawler(config=BrowserConfig(headless=True)) as crawler:
+        for result in await crawler.arun_many(urls=urls, config=crawl_config):
+            page = adapt_result(result)
+            if page is None:
+                print(f"Error crawling {getattr(result, 'url', '')}: {getattr(result, 'error_message', '')}")
+                continue
+            pages[page.url] = page.content
+
+    extractor = LLMExtractor(
+        instruction=INSTRUCTION,
+        schema=Product.model_json_schema(),
+        model=args.model,
+        base_url=args.base_url,
+        max_concurrency=args.concurrency,
+        chunk_tokens=args.chunk_tokens,
+        cache=None if args.no_cache else ChunkCache(args.cache_dir),
+        extra_args={"max_tokens": 800},
+    )
+    async with extractor:
+        results = await extractor.extract_pages(pages)
+
+    os.makedirs(args.output, exist_ok=True)
+    for url, items in results.items():
+        # Name files after host and path, since many pages end in index.html
+        filename = re.sub(r'[^A-Za-z0-9._-]+', '_', url.split('://', 1)[-1]).strip('_')
+        output_file = os.path.join(args.output, f"{filename}.json")
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({"url": url, "items": items}, f, indent=2)
+        print(f"Saved {len(items)} items to {output_file}")
+    extractor.stats.report()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Extract structured data from pages with an LLM.')
+    parser.add_argument('urls', nargs='*', help='URLs to extract in batch mode; without any, the single-URL example runs')
+    parser.add_argument('--urls-file', help='File with one URL per line, added to the batch')
+    parser.add_argument('--model', default='openai/gpt-4o-mini', help='Model name')
+    parser.add_argument('--base-url', help='OpenAI-compatible API base URL (default: OPENAI_BASE_URL or OpenAI)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Most LLM requests in flight at once')
+    parser.add_argument('--chunk-tokens', type=int, default=1000, help='Largest chunk size in estimated tokens')
+    parser.add_argument('--cache-dir', default=str(ChunkCache().root), help='Directory of stored chunk results')
+    parser.add_argument('--no-cache', action='store_true', help='Send every chunk to the model')
+    parser.add_argument('-o', '--output', default='llm_extracted', help='Output directory for batch results')
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.urls or args.urls_file:
+        asyncio.run(batch_main(args))
+    else:
+        asyncio.run(main())
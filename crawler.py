@@ -16,10 +16,19 @@ from bs4 import BeautifulSoup, Comment
 from html2text import HTML2Text
 from packaging import version
 from base import BaseDocCrawler, SDKConfig, RegistryConfig
+from html_parser import make_soup
+from markdown_convert import tree_to_markdown
+from markdown_docs import parse_markdown_doc
+from sections import Section, split_sections
+from stage_timer import StageTimer
+from streaming_extract import StreamingExtractor, iter_chunks
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CacheMode, CrawlerRunConfig
 from playwright.async_api import async_playwright
 import re
 
+# Pages over 2M characters are extracted with the streaming parser by default
+STREAM_THRESHOLD = 2 * 1024 * 1024
+
 class APIDocCrawler(BaseDocCrawler):
     def __init__(self):
         super().__init__("output")
@@ -31,6 +40,7 @@ class APIDocCrawler(BaseDocCrawler):
         self._max_retries = 3
         self._retry_delay = 1.0
         self._rate_limit = asyncio.Lock()
+        self.timer = StageTimer("api_docs")
         
         # Define sources first
         self.sources = {
@@ -145,17 +155,11 @@ class APIDocCrawler(BaseDocCrawler):
         }
         
         # Initialize html2text with configuration
-        self.h2t = HTML2Text()
-        self.h2t.ignore_links = False
-        self.h2t.ignore_images = False
-        self.h2t.ignore_tables = False
-        self.h2t.body_width = 0  # Don't wrap lines
-        self.h2t.ignore_emphasis = False
-        self.h2t.ul_item_mark = '-'  # Use - for unordered lists
-        self.h2t.protect_links = True  # Don't wrap links
-        self.h2t.unicode_snob = True  # Use Unicode characters
-        self.h2t.images_to_alt = True  # Use alt text for images
-        self.h2t.single_line_break = True  # Use single line breaks
+        self.h2t = self.new_html2text()
+        
+        # Pages larger than this (in characters) are extracted with the
+        # streaming parser instead of being parsed into a tree
+        self.stream_threshold = STREAM_THRESHOLD
         
         # Anti-bot settings
         self.user_agents = [
@@ -196,6 +200,21 @@ class APIDocCrawler(BaseDocCrawler):
         # Create json_reference directory
         os.makedirs(self.json_output_dir, exist_ok=True)
         
+    def new_html2text(self) -> HTML2Text:
+        """Create an html2text converter with the crawler's Markdown settings."""
+        h2t = HTML2Text()
+        h2t.ignore_links = False
+        h2t.ignore_images = False
+        h2t.ignore_tables = False
+        h2t.body_width = 0  # Don't wrap lines
+        h2t.ignore_emphasis = False
+        h2t.ul_item_mark = '-'  # Use - for unordered lists
+        h2t.protect_links = True  # Don't wrap links
+        h2t.unicode_snob = True  # Use Unicode characters
+        h2t.images_to_alt = True  # Use alt text for images
+        h2t.single_line_break = True  # Use single line breaks
+        return h2t
+
     async def crawl_all(self):
         """Crawl all specified sources."""
         async with aiohttp.ClientSession() as session:
@@ -206,6 +225,7 @@ class APIDocCrawler(BaseDocCrawler):
                     await self.crawl_go_sdk_docs(session)
                 else:
                     await self.process_page(session, source["url"], source_key)
+        self.timer.report()
 
     async def fetch_page(self, session: aiohttp.ClientSession, url: str) -> str:
         """Fetch a page with rate limiting and retries."""
@@ -236,13 +256,19 @@ class APIDocCrawler(BaseDocCrawler):
             print(f"Error fetching {url}: {str(e)}")
             return None
 
-    def clean_html_content(self, content: str) -> str:
-        """Clean HTML content before processing."""
+    def parse_document(self, content: str) -> Optional[BeautifulSoup]:
+        """Parse a page once and clean it in place for every extractor to share.
+
+        Args:
+            content: Raw page HTML
+
+        Returns:
+            Optional[BeautifulSoup]: The cleaned tree, or None if the page is empty or unparseable
+        """
         if not content:
-            return ""
+            return None
         try:
-            # Parse HTML
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = make_soup(content)
             
             # Remove script and style elements
             for element in soup(['script', 'style']):
@@ -252,96 +278,157 @@ class APIDocCrawler(BaseDocCrawler):
             for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
                 comment.extract()
             
-            # Get the cleaned HTML
-            cleaned_html = str(soup)
-            return cleaned_html
+            return soup
         except Exception as e:
             print(f"Error cleaning HTML content: {str(e)}")
-            return ""
+            return None
+
+    def clean_html_content(self, content: str) -> str:
+        """Clean HTML content before processing."""
+        soup = self.parse_document(content)
+        return str(soup) if soup is not None else ""
 
     async def process_page(self, session: aiohttp.ClientSession, url: str, source_key: str):
         """Process a single page."""
         try:
-            html_content = await self.fetch_page(session, url)
+            with self.timer.stage("fetch"):
+                html_content = await self.fetch_page(session, url)
             if not html_content:
                 print(f"No content received for {url}")
                 return
             
-            cleaned_content = self.clean_html_content(html_content)
-            if not cleaned_content:
-                print(f"Failed to clean content for {url}")
-                return
-            
             # Extract service name from URL
             service_name = url.rstrip('/').split('/')[-1]
             
-            # Create document structure
-            doc_structure = {
-                "url": url,
-                "service": service_name,
-                "overview": self.extract_overview(cleaned_content),
-                "api_reference": self.extract_api_reference(cleaned_content),
-                "examples": self.extract_examples(cleaned_content)
-            }
-            
-            # Save as markdown
-            markdown_content = self.format_for_markdown(doc_structure)
-            self.save_markdown(source_key, service_name, markdown_content)
+            if self.stream_threshold is not None and len(html_content) > self.stream_threshold:
+                # Too large to build a tree for; extract from the parser's events
+                with self.timer.stage("stream"):
+                    doc_structure = self.stream_document(html_content, url, service_name)
+            else:
+                # Parse once; every extractor walks this cleaned tree
+                with self.timer.stage("parse"):
+                    soup = self.parse_document(html_content)
+                if soup is None:
+                    print(f"Failed to clean content for {url}")
+                    return
+                
+                with self.timer.stage("extract"):
+                    doc_structure = self.extract_document(soup, url, service_name)
             
-            # Save as JSON
-            self.save_json(source_key, service_name, doc_structure)
+            with self.timer.stage("save"):
+                # Save as markdown
+                markdown_content = self.format_for_markdown(doc_structure)
+                self.save_markdown(source_key, service_name, markdown_content)
+                
+                # Save as JSON
+                self.save_json(source_key, service_name, doc_structure)
             
         except Exception as e:
             print(f"Error processing page {url}: {str(e)}")
 
-    def extract_overview(self, content: str) -> str:
-        """Extract overview section from the content."""
-        if not content:
+    def extract_document(self, soup: BeautifulSoup, url: str, service_name: str) -> Dict[str, Any]:
+        """Build the document structure from a parsed, cleaned page."""
+        sections = split_sections(soup)
+        return {
+            "url": url,
+            "service": service_name,
+            "overview": self.extract_overview(soup),
+            "api_reference": self.extract_api_reference(soup, sections),
+            "examples": self.extract_examples(soup, sections)
+        }
+
+    def stream_document(self, content: str, url: str, service_name: str) -> Dict[str, Any]:
+        """Build the document structure without holding the page's tree.
+
+        The page is fed to a ``StreamingExtractor`` in chunks, and each section
+        and code block is turned into its entry as the parser reaches its end.
+
+        Args:
+            content: Raw page HTML
+            url: Page URL
+            service_name: Service the page documents
+        """
+        extractor = StreamingExtractor(base_url=url, markdown=self.new_html2text())
+        api_refs = []
+        examples = []
+        for kind, item in extractor.extract(iter_chunks(content)):
+            if kind == "section" and item.level and self.is_api_heading(item.title):
+                api_refs.append(self.api_reference_entry(item.title, item.intro, item.parameters))
+            elif kind == "code":
+                examples.append(item)
+        return {
+            "url": url,
+            "service": service_name,
+            "overview": extractor.overview(),
+            "api_reference": api_refs,
+            "examples": examples
+        }
+
+    def extract_overview(self, soup: BeautifulSoup) -> str:
+        """Extract overview section from the parsed page."""
+        if soup is None:
             return ""
         try:
-            soup = BeautifulSoup(content, 'html.parser')
             # Try to find overview section
             overview_section = soup.select_one('main')
             if overview_section:
-                return self.html_to_markdown(str(overview_section))
+                # Convert the parsed element directly rather than re-tokenizing its HTML
+                return tree_to_markdown(overview_section).strip()
             return ""
         except Exception as e:
             print(f"Error extracting overview: {str(e)}")
             return ""
 
-    def extract_api_reference(self, content: str) -> List[Dict[str, str]]:
-        """Extract API reference documentation."""
-        soup = BeautifulSoup(content, 'html.parser')
+    def extract_api_reference(self, soup: BeautifulSoup,
+                              sections: Optional[List[Section]] = None) -> List[Dict[str, str]]:
+        """Extract API reference documentation from the parsed page.
+
+        Args:
+            soup: Parsed page
+            sections: The page split at h2/h3 headings, if already done
+        """
         api_refs = []
         
         # Look for method definitions
-        for method in soup.find_all(['h2', 'h3']):
-            if 'method' in method.text.lower() or 'function' in method.text.lower():
-                method_doc = {
-                    "name": method.text.strip(),
-                    "description": "",
-                    "syntax": "",
-                    "parameters": [],
-                    "returns": ""
-                }
-                
-                # Get description
-                next_elem = method.find_next(['p', 'pre', 'h2', 'h3'])
-                while next_elem and next_elem.name == 'p':
-                    method_doc["description"] += next_elem.text.strip() + "\n"
-                    next_elem = next_elem.find_next(['p', 'pre', 'h2', 'h3'])
-                
-                api_refs.append(method_doc)
+        for section in sections if sections is not None else split_sections(soup):
+            title = section.title
+            if section.heading is not None and self.is_api_heading(title):
+                api_refs.append(self.api_reference_entry(
+                    title, [p.text.strip() for p in section.intro], section.parameters()))
         
         return api_refs
 
-    def extract_examples(self, content: str) -> List[Dict[str, str]]:
-        """Extract code examples."""
-        soup = BeautifulSoup(content, 'html.parser')
+    @staticmethod
+    def is_api_heading(title: str) -> bool:
+        """Check whether a section heading names a method or function."""
+        return 'method' in title.lower() or 'function' in title.lower()
+
+    @staticmethod
+    def api_reference_entry(title: str, intro: List[str], parameters: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Build an API reference entry from a section's heading, intro paragraphs and tables."""
+        return {
+            "name": title,
+            # Paragraphs up to the first code block describe the method
+            "description": "".join(text + "\n" for text in intro),
+            "syntax": "",
+            "parameters": parameters,
+            "returns": ""
+        }
+
+    def extract_examples(self, soup: BeautifulSoup,
+                         sections: Optional[List[Section]] = None) -> List[Dict[str, str]]:
+        """Extract code examples from the parsed page.
+
+        Args:
+            soup: Parsed page
+            sections: The page split at h2/h3 headings, if already done
+        """
         examples = []
         
-        for example in soup.find_all(['pre', 'code']):
-            if example.text.strip():
+        for section in sections if sections is not None else split_sections(soup):
+            for example in section.code:
+                if not example.text.strip():
+                    continue
                 examples.append({
                     "code": example.text.strip(),
                     "language": example.get('class', [''])[0] if example.get('class') else ""
@@ -451,12 +538,9 @@ class APIDocCrawler(BaseDocCrawler):
                                     
                                     content = await response.text()
                                     
-                                    # Extract title from the markdown content
-                                    title = ''
-                                    for line in content.split('\n'):
-                                        if line.startswith('# '):
-                                            title = line[2:].strip()
-                                            break
+                                    # Split off the front matter and title; the body stays Markdown
+                                    parsed = parse_markdown_doc(content)
+                                    title = parsed.title
                                     
                                     if not title:
                                         # Remove both .html.markdown and .md extensions
@@ -477,7 +561,8 @@ class APIDocCrawler(BaseDocCrawler):
                                         "title": title,
                                         "path": f"{doc_type}/{path}",
                                         "type": doc_type,
-                                        "description": content,
+                                        "metadata": parsed.metadata,
+                                        "markdown": parsed.markdown,
                                         "url": f"https://registry.terraform.io/providers/hashicorp/aws/latest/docs/{doc_type}/{path}"
                                     })
                                     print(f"Processed {title} ({doc_type})")
@@ -505,33 +590,34 @@ class APIDocCrawler(BaseDocCrawler):
             if not title:
                 continue
                 
-            content = doc.get("description", "")
+            content = doc.get("markdown", "")
             if not content:
                 continue
                 
             # Determine doc type (resource or data source)
             doc_type = doc.get("type", "resources")
+            metadata = doc.get("metadata", {})
             
-            # Create subdirectories if they don't exist
-            os.makedirs(os.path.join(self.markdown_output_dir, "terraform", doc_type), exist_ok=True)
-            os.makedirs(os.path.join(self.json_output_dir, "terraform", doc_type), exist_ok=True)
-            
-            # Convert HTML to markdown
+            # The docs are Markdown already; only the header is added
             markdown_content = f"# {title}\n\n"
             markdown_content += f"Type: {doc_type}\n\n"
-            markdown_content += self.h2t.handle(content)  # Use html2text to convert HTML to markdown
+            if metadata.get("subcategory"):
+                markdown_content += f"Subcategory: {metadata['subcategory']}\n\n"
+            markdown_content += content
             
             # Save as markdown
             filename = f"{doc_type}/{title.lower()}.md"
             self.save_markdown("terraform", filename, markdown_content)
             
-            # Save as JSON
+            # Save as JSON, with the body stored once
             doc_structure = {
                 "title": title,
                 "path": doc.get("path", ""),
                 "type": doc_type,
-                "html_content": content,
-                "markdown_content": markdown_content,
+                "subcategory": metadata.get("subcategory", ""),
+                "page_title": metadata.get("page_title", ""),
+                "description": metadata.get("description", ""),
+                "markdown_content": content,
                 "url": doc.get("url", "")
             }
             self.save_json("terraform", f"{doc_type}/{title.lower()}", doc_structure)
@@ -566,7 +652,7 @@ class APIDocCrawler(BaseDocCrawler):
             print(f"Failed to fetch Go SDK index")
             return []
             
-        soup = BeautifulSoup(text, 'html.parser')
+        soup = make_soup(text)
         
         # Find all service package links
         service_links = []
@@ -592,7 +678,7 @@ class APIDocCrawler(BaseDocCrawler):
                     print(f"Failed to fetch {service['name']} docs")
                     continue
                     
-                service_soup = BeautifulSoup(service_text, 'html.parser')
+                service_soup = make_soup(service_text)
                 
                 # Get package documentation
                 doc_content = service_soup.find('div', {'class': 'Documentation-content'})
@@ -729,7 +815,7 @@ class APIDocCrawler(BaseDocCrawler):
                     return []
                 
                 content = await response.text()
-                soup = BeautifulSoup(content, 'html.parser')
+                soup = make_soup(content)
                 
                 # Find all resource links in the navigation
                 docs = []
@@ -753,7 +839,7 @@ class APIDocCrawler(BaseDocCrawler):
                                 continue
                                 
                             doc_content = await doc_response.text()
-                            doc_soup = BeautifulSoup(doc_content, 'html.parser')
+                            doc_soup = make_soup(doc_content)
                             
                             # Extract main content
                             main_content = doc_soup.select_one('main')
@@ -840,6 +926,9 @@ class APIDocCrawler(BaseDocCrawler):
     def html_to_markdown(self, html_content: str) -> str:
         """Convert HTML content to markdown format.
         
+        For HTML that has not been parsed. Parsed elements go through
+        ``markdown_convert.tree_to_markdown``, which gives the same output faster.
+        
         Args:
             html_content: HTML content to convert
             
@@ -858,9 +947,12 @@ def main():
     parser.add_argument('sources', nargs='*', help='Specific sources to crawl (e.g., pulumi_aws, boto3, terraform_aws, all). If none specified, crawls all sources.')
     parser.add_argument('--output-dir', '-o', help='Custom output directory for documentation')
     parser.add_argument('--central-repo', '-c', action='store_true', help='Structure output for a central documentation repository')
+    parser.add_argument('--stream-threshold', type=int, default=STREAM_THRESHOLD,
+                        help='Stream-extract pages larger than this many characters (0 streams every page)')
     args = parser.parse_args()
 
     crawler = APIDocCrawler()
+    crawler.stream_threshold = args.stream_threshold
     
     # Set custom output directory if provided
     if args.output_dir:
@@ -0,0 +1,174 @@
+"""Memory-adaptive batch rendering with per-domain rate limiting.
+
+Mirrors the ``MemoryAdaptiveDispatcher`` and ``RateLimiter`` crawl4ai added
+after 0.4.247, but drives our own ``arun`` so renders keep going through the
+browser pool's resource policies, health supervision and static-first fetching.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+import psutil
+
+
+@dataclass
+class DomainState:
+    """Pacing state for one domain."""
+    delay: float
+    next_allowed: float = 0.0
+    failures: int = 0
+
+
+class DomainRateLimiter:
+    """Space out requests per domain and back off when a site pushes back.
+
+    Each domain starts with a delay drawn from ``base_delay``. A response with
+    a status in ``rate_limit_codes`` doubles that domain's delay (capped at
+    ``max_delay``) and asks for a retry, up to ``max_retries`` times. Any other
+    response eases the delay back towards the base range.
+    """
+
+    def __init__(self, base_delay: Tuple[float, float] = (0.5, 1.5), max_delay: float = 30.0,
+                 max_retries: int = 2, rate_limit_codes: Tuple[int, ...] = (429, 503)):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.rate_limit_codes = rate_limit_codes
+        self.domains: Dict[str, DomainState] = {}
+        self.backoffs = 0
+
+    def _state(self, url: str) -> DomainState:
+        domain = urlparse(url).netloc
+        if domain not in self.domains:
+            self.domains[domain] = DomainState(delay=random.uniform(*self.base_delay))
+        return self.domains[domain]
+
+    async def wait(self, url: str) -> None:
+        """Wait for this URL's turn on its domain."""
+        state = self._state(url)
+        now = time.monotonic()
+        # Reserve the slot before sleeping so concurrent callers queue up behind it
+        start = max(now, state.next_allowed)
+        state.next_allowed = start + state.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def update(self, url: str, status_code: Optional[int]) -> bool:
+        """Adjust the domain's pacing after a response.
+
+        Returns:
+            bool: True if the request was rate limited and should be retried
+        """
+        state = self._state(url)
+        if status_code in self.rate_limit_codes:
+            state.failures += 1
+            state.delay = min(state.delay * 2 + random.uniform(0, 0.5), self.max_delay)
+            self.backoffs += 1
+            print(f"Rate limited on {urlparse(url).netloc} ({status_code}), "
+                  f"delay now {state.delay:.1f}s")
+            return state.failures <= self.max_retries
+        state.failures = 0
+        state.delay = max(random.uniform(*self.base_delay), state.delay * 0.75)
+        return False
+
+
+class MemoryAdaptiveDispatcher:
+    """Run renders concurrently, admitting new ones only while memory allows.
+
+    Up to ``max_session_permit`` renders run at once. No new render starts while
+    system memory use is at or above ``memory_threshold_percent``, except that
+    one is always allowed so a batch can't stall. Results are yielded as each
+    render finishes, not in input order.
+    """
+
+    def __init__(self, memory_threshold_percent: float = 85.0, max_session_permit: int = 5,
+                 check_interval: float = 0.5, rate_limiter: Optional[DomainRateLimiter] = None,
+                 timeout: Optional[float] = None):
+        """Initialize the dispatcher.
+
+        Args:
+            memory_threshold_percent: System memory use above which admission pauses
+            max_session_permit: Maximum renders in flight
+            check_interval: Seconds between memory checks while throttled
+            rate_limiter: Optional per-domain pacing and backoff
+            timeout: Seconds before a single render is abandoned
+        """
+        self.memory_threshold_percent = memory_threshold_percent
+        self.max_session_permit = max_session_permit
+        self.check_interval = check_interval
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+
+        # Run statistics
+        self.completed = 0
+        self.failed = 0
+        self.peak_concurrency = 0
+        self.throttled_checks = 0
+
+    def _memory_ok(self) -> bool:
+        if psutil.virtual_memory().percent < self.memory_threshold_percent:
+            return True
+        self.throttled_checks += 1
+        return False
+
+    async def _render(self, url: str, render: Callable[[str], Awaitable[Any]]) -> Tuple[str, Any]:
+        """Render one URL, retrying while the rate limiter asks for it."""
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.wait(url)
+            try:
+                if self.timeout:
+                    result = await asyncio.wait_for(render(url), timeout=self.timeout)
+                else:
+                    result = await render(url)
+            except asyncio.TimeoutError:
+                print(f"Timeout rendering {url}")
+                return url, None
+            except Exception as e:
+                print(f"Error rendering {url}: {str(e)}")
+                return url, None
+            if self.rate_limiter and result is not None and \
+                    self.rate_limiter.update(url, getattr(result, 'status_code', None)):
+                continue
+            return url, result
+
+    async def run(self, urls: Iterable[str],
+                  render: Callable[[str], Awaitable[Any]]) -> AsyncIterator[Tuple[str, Any]]:
+        """Render every URL, yielding ``(url, result)`` as each one finishes.
+
+        The result is None when the render raised or timed out.
+        """
+        todo = deque(urls)
+        active = set()
+        try:
+            while todo or active:
+                while todo and len(active) < self.max_session_permit and \
+                        (not active or self._memory_ok()):
+                    active.add(asyncio.create_task(self._render(todo.popleft(), render)))
+                self.peak_concurrency = max(self.peak_concurrency, len(active))
+
+                done, active = await asyncio.wait(active, timeout=self.check_interval,
+                                                  return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, result = task.result()
+                    if result is not None and getattr(result, 'success', False):
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    yield url, result
+        finally:
+            # The consumer stopped early; don't leave renders running
+            for task in active:
+                task.cancel()
+
+    def report(self) -> None:
+        """Print completion counts and how often memory pressure held back renders."""
+        print(f"Dispatcher: {self.completed} succeeded, {self.failed} failed, "
+              f"peak concurrency {self.peak_concurrency}, "
+              f"{self.throttled_checks} memory-throttled checks"
+              f"{f', {self.rate_limiter.backoffs} rate-limit backoffs' if self.rate_limiter else ''}")
@@ -1,16 +1,17 @@
 import os
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 from urllib.parse import urljoin
 
 from crawl4ai import (
-    AsyncWebCrawler, 
     BrowserConfig, 
     CrawlerRunConfig, 
     CacheMode,
     JsonCssExtractionStrategy
 )
+from browser_pool import BrowserPool, borrow_pool
+from readiness import ReadinessSpec
 
 class DoclingCrawler:
     """Crawler for Docling documentation"""
@@ -43,8 +44,13 @@ class DoclingCrawler:
             }
         }
 
-    async def crawl(self, source: str):
-        """Crawl documentation for a specific source"""
+    async def crawl(self, source: str, pool: Optional[BrowserPool] = None):
+        """Crawl documentation for a specific source
+
+        Args:
+            source: Key of the source to crawl
+            pool: Shared browser pool; a private one is opened if omitted
+        """
         if source not in self.sources:
             raise ValueError(f"Unknown source: {source}")
 
@@ -61,19 +67,19 @@ class DoclingCrawler:
         # Configure crawler with improved navigation handling
         crawler_config = CrawlerRunConfig(
             css_selector=source_config["selector"],
-            wait_for="css:nav.md-nav--primary",  # Wait for main navigation
+            # js_code runs first, so the page is ready once the link list it builds exists
+            wait_for=ReadinessSpec(selector="ul.crawl4ai-links").wait_for(),
+            wait_until="domcontentloaded",
             extraction_strategy=JsonCssExtractionStrategy(source_config["extraction_schema"]),
             cache_mode=CacheMode.BYPASS,
             word_count_threshold=10,
             excluded_tags=["footer", "header"],
             exclude_external_links=True,
             js_code="""
-                // Expand all navigation sections
+                // Expand all navigation sections; the toggles only change CSS
+                // state, so every link is already in the DOM without waiting
                 document.querySelectorAll('.md-nav__toggle').forEach(toggle => toggle.click());
                 
-                // Wait for navigation to expand
-                await new Promise(r => setTimeout(r, 1000));
-                
                 // Get all navigation links
                 const links = document.querySelectorAll('.md-nav__link');
                 const linkList = document.createElement('ul');
@@ -91,11 +97,10 @@ class DoclingCrawler:
                         linkList.appendChild(li);
                     }
                 });
-            """,
-            delay_before_return_html=1.5
+            """
         )
 
-        async with AsyncWebCrawler(config=browser_config) as crawler:
+        async with borrow_pool(pool, browser_config=browser_config, pool_size=1) as crawler:
             # Start with base URL to discover structure
             visited = set()
             to_visit = set([base_url])
@@ -106,7 +111,7 @@ class DoclingCrawler:
                     continue
 
                 print(f"\nCrawling: {url}")
-                result = await crawler.arun(url=url, config=crawler_config)
+                result = await crawler.arun(url=url, config=crawler_config, reuse_tab=True)
                 visited.add(url)
 
                 if not result.success:
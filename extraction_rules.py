@@ -0,0 +1,160 @@
+"""Per-source extraction rules, loaded from configuration and compiled once.
+
+``config/extraction_rules.json`` groups sources by crawler. Each source names
+its start URL, output directory, content selectors, cleanup selectors and the
+URL scope its links must fall in::
+
+    "doc_crawler": {
+        "cloudformation": {
+            "url": "https://docs.aws.amazon.com/...",
+            "output_dir": "cloudformation",
+            "content_selectors": ["div.awsdocs-content", "main"],
+            "remove_selectors": ["nav", ".breadcrumbs"],
+            "scope": {"include": ["/AWS_"], "exclude": ["^#"]}
+        }
+    }
+
+Selectors are compiled with soupsieve and the scope's regular expressions
+are joined into one pattern each when the rules load, so checking a page or
+a link does no parsing. Every field is optional; a crawler reads only the
+ones it uses.
+
+``SourceRules.select_content`` tries the compiled content selectors in their
+configured order and takes the first match, so the priority order decides
+which element is picked on every page.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+import soupsieve
+from bs4 import Tag
+
+RULES_PATH = Path(__file__).parent / "config" / "extraction_rules.json"
+
+
+def _compile_patterns(patterns: List[str], flags: int = 0) -> Optional[re.Pattern]:
+    """Join regular expressions into one compiled alternation, or None if there are none."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
+
+
+@dataclass
+class SourceRules:
+    """One source's extraction rules, with selectors and patterns compiled.
+
+    Attributes:
+        name: Source key
+        url: Start URL
+        output_dir: Output directory under the crawler's base directory
+        content_selectors: Candidate content containers, in priority order
+        remove_selectors: Elements stripped from the content before saving
+        link_selector: Links collected from the content
+        include: URL patterns a link must match one of (any link if empty)
+        exclude: URL patterns, matched case-insensitively, that rule a link out
+    """
+    name: str
+    url: str = ""
+    output_dir: str = ""
+    content_selectors: List[str] = field(default_factory=list)
+    remove_selectors: List[str] = field(default_factory=list)
+    link_selector: str = "a[href]"
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._content = [soupsieve.compile(selector) for selector in self.content_selectors]
+        self._remove = soupsieve.compile(", ".join(self.remove_selectors)) if self.remove_selectors else None
+        self._links = soupsieve.compile(self.link_selector)
+        self._include = _compile_patterns(self.include)
+        self._exclude = _compile_patterns(self.exclude, re.I)
+        # Index of the content selector that matched last
+        self._winner: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> "SourceRules":
+        scope = config.get("scope", {})
+        return cls(
+            name=name,
+            url=config.get("url", ""),
+            output_dir=config.get("output_dir", name),
+            content_selectors=config.get("content_selectors", []),
+            remove_selectors=config.get("remove_selectors", []),
+            link_selector=config.get("link_selector", "a[href]"),
+            include=scope.get("include", []),
+            exclude=scope.get("exclude", [])
+        )
+
+    def select_content(self, root: Tag) -> Optional[Tag]:
+        """Find the content element with the first content selector, in priority order, that matches.
+
+        Returns:
+            Optional[Tag]: The match, or None if no content selector matches
+        """
+        for index, selector in enumerate(self._content):
+            element = selector.select_one(root)
+            if element is not None:
+                self._winner = index
+                return element
+        return None
+
+    @property
+    def winning_selector(self) -> Optional[str]:
+        """The content selector that matched last, or None if none has matched."""
+        return self.content_selectors[self._winner] if self._winner is not None else None
+
+    def clean(self, element: Tag) -> Tag:
+        """Remove the source's cleanup selectors from an element, in place."""
+        if self._remove is not None:
+            for match in self._remove.select(element):
+                match.decompose()
+        return element
+
+    def in_scope(self, url: str) -> bool:
+        """Check whether a URL or href falls in the source's crawl scope."""
+        if self._include is not None and not self._include.search(url):
+            return False
+        return self._exclude is None or not self._exclude.search(url)
+
+    def links(self, element: Tag, page_url: str) -> List[Dict[str, str]]:
+        """Collect in-scope links with text from an element.
+
+        Scope is checked against each raw href, which is then resolved against
+        the page URL.
+
+        Returns:
+            List[Dict[str, str]]: Links as {'href', 'text'}, in page order
+        """
+        links = []
+        for link in self._links.select(element):
+            href = link.get('href', '')
+            text = link.get_text().strip()
+            if href and text and self.in_scope(href):
+                links.append({'href': urljoin(page_url, href), 'text': text})
+        return links
+
+
+def load_rules(crawler: str, path: Path = RULES_PATH) -> Dict[str, SourceRules]:
+    """Load and compile one crawler's sources from the rules file.
+
+    Args:
+        crawler: Crawler group in the rules file
+        path: JSON file mapping crawler groups to their sources' rules
+
+    Returns:
+        Dict[str, SourceRules]: Compiled rules by source key, in file order
+
+    Raises:
+        OSError: If the rules file cannot be read
+        json.JSONDecodeError: If the rules file is not valid JSON
+        soupsieve.SelectorSyntaxError: If a selector does not compile
+        re.error: If a scope pattern does not compile
+    """
+    with path.open('r') as f:
+        config = json.load(f).get(crawler, {})
+    return {name: SourceRules.from_config(name, source) for name, source in config.items()}
@@ -0,0 +1,82 @@
+"""One-pass removal of non-content and empty elements from a parsed page.
+
+``prune_tree`` walks the tree once, depth first. An element whose tag is in
+``remove_tags`` or whose class matches ``noise_classes`` is dropped without
+being entered. Every other element learns whether it holds text from its own
+strings and its children as the walk leaves it, so no element's text is read
+twice. Empty elements are removed as whole subtrees, outermost first, by the
+nearest ancestor that keeps text.
+
+The result matches removing the tags, then the noise classes, then every
+element whose ``get_text(strip=True)`` is empty, as
+``CustomExtractionStrategy.preprocess_html`` used to, without calling
+``get_text`` on every element and so re-reading each string once per ancestor.
+"""
+
+import re
+from typing import FrozenSet, Optional, Pattern
+
+from bs4 import Tag
+from bs4.element import CData, NavigableString
+
+# Elements never kept as content
+REMOVE_TAGS = frozenset({'script', 'style', 'noscript', 'iframe', 'nav', 'header', 'footer'})
+# Class names, matched case-insensitively anywhere in the class, of elements never kept as content
+NOISE_CLASSES = re.compile(
+    r"cookie|navigation|header|footer|sidebar|menu|banner|popup|modal|overlay|social|share|comment", re.I
+)
+# String types get_text counts as text; comments, scripts and templates are left out
+TEXT_TYPES = (NavigableString, CData)
+
+_ELEMENT, _HAS_TEXT, _DROPPED = range(3)
+
+
+def is_noise(element: Tag, noise_classes: Optional[Pattern] = NOISE_CLASSES) -> bool:
+    """Check whether an element's class marks it as non-content."""
+    classes = element.attrs.get('class')
+    if not classes or noise_classes is None:
+        return False
+    return noise_classes.search(classes if isinstance(classes, str) else " ".join(classes)) is not None
+
+
+def prune_tree(root: Tag, remove_tags: FrozenSet[str] = REMOVE_TAGS,
+               noise_classes: Optional[Pattern] = NOISE_CLASSES, drop_empty: bool = True) -> int:
+    """Remove unwanted and empty elements under root, in place, in one pass.
+
+    Args:
+        root: Tree or element to clean; root itself is never removed
+        remove_tags: Tag names to remove with their contents
+        noise_classes: Pattern of classes to remove with their contents, or None to keep all
+        drop_empty: Also remove elements with no text left
+
+    Returns:
+        int: Number of subtrees removed
+    """
+    removed = 0
+    stack = [([root, False, []], iter(root.contents))]
+    while stack:
+        frame, children = stack[-1]
+        for child in children:
+            if isinstance(child, Tag):
+                if child.name in remove_tags or is_noise(child, noise_classes):
+                    # Decomposing now would shift the contents being iterated
+                    frame[_DROPPED].append(child)
+                    continue
+                stack.append(([child, False, []], iter(child.contents)))
+                break
+            if not frame[_HAS_TEXT] and type(child) in TEXT_TYPES and child.strip():
+                frame[_HAS_TEXT] = True
+        else:
+            stack.pop()
+            element, has_text, dropped = frame
+            if stack and drop_empty and not has_text:
+                # Removed with the element by the nearest ancestor that keeps text
+                stack[-1][0][_DROPPED].append(element)
+                continue
+            for child in dropped:
+                child.decompose()
+            removed += len(dropped)
+            if stack:
+                stack[-1][0][_HAS_TEXT] = stack[-1][0][_HAS_TEXT] or has_text
+    return removed
+
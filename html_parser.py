@@ -0,0 +1,85 @@
+"""One place to choose the parser behind every BeautifulSoup tree.
+
+The crawlers build their trees with ``make_soup`` instead of naming a parser.
+lxml's C parser is used when it is installed, and the pure-Python
+``html.parser`` otherwise. A document lxml fails on is retried with
+``html.parser``. Set ``CRAWLER_HTML_PARSER`` to pin a parser for a run, or
+wrap code in ``use_parser`` to switch temporarily, as the parity benchmark does.
+
+``result_soup`` reuses the tree a static fetch already parsed (see
+``hybrid_fetch.StaticResult``) and parses the result's HTML otherwise.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+PARSER_ENV = "CRAWLER_HTML_PARSER"
+FALLBACK_PARSER = "html.parser"
+PREFERRED_PARSERS = ("lxml", FALLBACK_PARSER)
+
+_parser: Optional[str] = None
+
+
+def parser_available(name: str) -> bool:
+    """Check whether BeautifulSoup has a tree builder for a parser name."""
+    return builder_registry.lookup(name) is not None
+
+
+def _choose_parser() -> str:
+    requested = os.environ.get(PARSER_ENV)
+    if requested:
+        if parser_available(requested):
+            return requested
+        print(f"Parser {requested} from {PARSER_ENV} is not installed, using the default")
+    return next(name for name in PREFERRED_PARSERS if parser_available(name))
+
+
+def parser_name() -> str:
+    """Get the parser ``make_soup`` uses."""
+    global _parser
+    if _parser is None:
+        _parser = _choose_parser()
+    return _parser
+
+
+@contextmanager
+def use_parser(name: str) -> Iterator[None]:
+    """Make ``make_soup`` use a specific parser inside the block."""
+    global _parser
+    if not parser_available(name):
+        raise ValueError(f"Parser {name} is not installed")
+    previous = _parser
+    _parser = name
+    try:
+        yield
+    finally:
+        _parser = previous
+
+
+def make_soup(markup: str) -> BeautifulSoup:
+    """Parse HTML with the selected parser, falling back to ``html.parser`` if it fails."""
+    name = parser_name()
+    if name == FALLBACK_PARSER:
+        return BeautifulSoup(markup, FALLBACK_PARSER)
+    try:
+        return BeautifulSoup(markup, name)
+    except Exception as e:
+        print(f"Parser {name} failed ({str(e)}), retrying with {FALLBACK_PARSER}")
+        return BeautifulSoup(markup, FALLBACK_PARSER)
+
+
+def result_soup(result: Any) -> Optional[BeautifulSoup]:
+    """Get a crawl result's parsed page, reusing a tree the fetcher already built.
+
+    Returns:
+        Optional[BeautifulSoup]: The tree, or None if the result has no HTML
+    """
+    soup = getattr(result, 'soup', None)
+    if soup is not None:
+        return soup
+    html = getattr(result, 'html', None)
+    return make_soup(html) if html else None
@@ -0,0 +1,179 @@
+"""Static-first page fetching with headless-browser fallback."""
+
+import random
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+from bs4 import BeautifulSoup
+from crawl4ai import CrawlerRunConfig
+
+from browser_pool import BrowserPool
+from dispatcher import MemoryAdaptiveDispatcher
+from html_parser import make_soup
+
+
+@dataclass
+class StaticResult:
+    """Minimal stand-in for a crawl4ai result built from a plain HTTP fetch.
+
+    ``soup`` is the tree parsed while checking the page for content, so
+    extraction reads it through ``html_parser.result_soup`` instead of parsing
+    ``html`` again. Whoever reads it may modify it.
+    """
+    url: str
+    html: str
+    status_code: int = 200
+    success: bool = True
+    error_message: str = ""
+    links: Dict[str, List[Dict[str, str]]] = field(default_factory=dict)
+    soup: Optional[BeautifulSoup] = field(default=None, repr=False, compare=False)
+
+    @property
+    def cleaned_html(self) -> str:
+        """Static pages are not cleaned by crawl4ai, so this is the raw HTML."""
+        return self.html
+
+
+@dataclass
+class FetchStats:
+    """Per-source counts of static fetches versus browser escalations."""
+    static: int = 0
+    escalated: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.static + self.escalated
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalated / self.total if self.total else 0.0
+
+
+class HybridFetcher:
+    """Try a plain HTTP fetch first and only render in the browser when needed.
+
+    A static fetch is accepted when one of the source's content selectors
+    matches an element with text in the returned HTML. Otherwise the page is
+    rendered on the browser pool with the caller's ``CrawlerRunConfig``. Like
+    ``BrowserPool`` it exposes ``arun(url=..., config=...)`` so existing
+    ``process_page`` code can use it unchanged.
+    """
+
+    user_agents = [
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    ]
+
+    def __init__(self, pool: BrowserPool, source: str, selectors: Optional[List[str]] = None,
+                 static_first: bool = True, timeout: int = 30):
+        """Initialize the fetcher.
+
+        Args:
+            pool: Browser pool used when a page needs rendering
+            source: Source name the escalation stats are recorded under
+            selectors: Content selectors; defaults to each config's css_selector
+            static_first: Set to False to always render in the browser
+            timeout: Timeout in seconds for the plain HTTP fetch
+        """
+        self.pool = pool
+        self.source = source
+        self.selectors = selectors
+        self.static_first = static_first
+        self.timeout = timeout
+        self.stats = FetchStats()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "HybridFetcher":
+        if self.static_first:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+        self.report()
+
+    async def _fetch_static(self, url: str) -> Optional[StaticResult]:
+        """Fetch a page over plain HTTP, returning None on any failure."""
+        headers = {
+            'User-Agent': random.choice(self.user_agents),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        }
+        try:
+            async with self._session.get(url, headers=headers) as response:
+                if response.status != 200:
+                    return None
+                if 'html' not in response.headers.get('Content-Type', ''):
+                    return None
+                html = await response.text()
+                return StaticResult(url=str(response.url), html=html, status_code=response.status)
+        except Exception as e:
+            print(f"Static fetch failed for {url}: {str(e)}")
+            return None
+
+    def _parse_content(self, html: str, selectors: List[str]) -> Optional[BeautifulSoup]:
+        """Parse a page, returning the tree if any content selector matches a non-empty element."""
+        soup = make_soup(html)
+        for selector in selectors:
+            element = soup.select_one(selector)
+            if element and element.get_text(strip=True):
+                return soup
+        return None
+
+    def _record(self, escalated: bool) -> None:
+        if escalated:
+            self.stats.escalated += 1
+        else:
+            self.stats.static += 1
+
+    async def arun(self, url: str, config: Optional[CrawlerRunConfig] = None,
+                   selectors: Optional[List[str]] = None, **kwargs) -> Any:
+        """Fetch a page statically if possible, otherwise render it."""
+        selectors = selectors or self.selectors
+        if not selectors and config is not None and config.css_selector:
+            selectors = [config.css_selector]
+
+        if self.static_first and self._session and selectors:
+            result = await self._fetch_static(url)
+            # Keep the tree so extraction does not parse the page a second time
+            soup = self._parse_content(result.html, selectors) if result else None
+            if soup is not None:
+                result.soup = soup
+                print(f"Static fetch succeeded for {url}")
+                self._record(escalated=False)
+                return result
+            print(f"Escalating {url} to browser")
+
+        self._record(escalated=True)
+        return await self.pool.arun(url=url, config=config, source=self.source, **kwargs)
+
+    async def arun_many(self, urls: List[str], config: Optional[CrawlerRunConfig] = None,
+                        dispatcher: Optional[MemoryAdaptiveDispatcher] = None,
+                        config_for: Optional[Callable[[str], CrawlerRunConfig]] = None,
+                        **kwargs) -> AsyncIterator[Tuple[str, Any]]:
+        """Fetch a batch of pages, yielding ``(url, result)`` as each finishes.
+
+        Args:
+            urls: Pages to render
+            config: crawl4ai run configuration shared by the batch
+            dispatcher: Admission and rate-limit policy; defaults to one sized to the browser pool
+            config_for: Picks a configuration per URL instead of ``config``
+            **kwargs: Passed through to ``arun`` for every page
+        """
+        dispatcher = dispatcher or MemoryAdaptiveDispatcher(max_session_permit=self.pool.pool_size)
+
+        async def render(url: str) -> Any:
+            return await self.arun(url=url, config=config_for(url) if config_for else config, **kwargs)
+
+        async for item in dispatcher.run(urls, render):
+            yield item
+
+    def report(self) -> None:
+        """Print the static versus browser split for this source."""
+        stats = self.stats
+        print(f"Fetch stats for {self.source}: {stats.total} pages, {stats.static} static, "
+              f"{stats.escalated} browser ({stats.escalation_rate:.0%} escalation rate)")
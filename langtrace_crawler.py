@@ -1,7 +1,13 @@
+import asyncio
 from datetime import datetime
+from typing import Optional
 from urllib.parse import urljoin, urlparse
 
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+from crawl4ai import BrowserConfig, CrawlerRunConfig
+from boilerplate import BoilerplateStore
+from browser_pool import BrowserPool, borrow_pool
+from readiness import ReadinessSpec
+from result_adapter import adapt_result, markdown_generator
 
 DEBUG = False
 
@@ -12,24 +18,29 @@ class LangtraceDocCrawler:
         # Track visited URLs to prevent infinite loops
         self._visited_urls = set()
         
+        # Learns the page furniture each source repeats and strips it
+        self.boilerplate = BoilerplateStore()
+        
         # Define sources with extraction strategies
         self.sources = {
             "langtrace": {
                 "url": "https://docs.langtrace.ai/",
                 "output_dir": "langtrace",
                 "index_config": CrawlerRunConfig(
-                    wait_for="css:main",  # Wait for main content
-                    wait_until="load",    # Wait until load event fires
+                    wait_for=ReadinessSpec(selector="main", quiet_ms=300).wait_for(),  # Main content hydrated
+                    wait_until="domcontentloaded",
                     process_iframes=False,
                     only_text=False,
                     css_selector="main",  # Get main content
+                    markdown_generator=markdown_generator(),  # Also produce fit_markdown
                 ),
                 "page_config": CrawlerRunConfig(
-                    wait_for="css:main",  # Wait for main content
-                    wait_until="load",    # Wait until load event fires
+                    wait_for=ReadinessSpec(selector="main", quiet_ms=300).wait_for(),  # Main content hydrated
+                    wait_until="domcontentloaded",
                     process_iframes=False,
                     only_text=False,
                     css_selector="main",  # Get main content
+                    markdown_generator=markdown_generator(),  # Also produce fit_markdown
                 )
             }
         }
@@ -97,10 +108,8 @@ class LangtraceDocCrawler:
             
             try:
                 # Load the page and wait for content
-                result = await asyncio.wait_for(
-                    crawler.arun(url=base_url, config=config),
-                    timeout=60
-                )
+                result = await crawler.arun(url=base_url, config=config,
+                                            timeout=60)
                 
                 if not result or not result.success:
                     print(f"Failed to load page {base_url}")
@@ -109,69 +118,42 @@ class LangtraceDocCrawler:
                 print(f"Result success: {result.success}")
                 print(f"Result status code: {result.status_code}")
                 
-                # Extract links using crawl4ai's native link extraction
-                links = []
-                if result.links and 'internal' in result.links:
-                    for link in result.links['internal']:
-                        href = link.get('href', '')
-                        text = link.get('text', '').strip()
-                        
-                        if (href and 'docs.langtrace.ai' in href and 
-                            text and not text.lower() in ['next', 'previous']):
-                            clean_href = href.split('#')[0].rstrip('/')
-                            if clean_href and clean_href not in self._visited_urls:
-                                links.append({
-                                    'href': clean_href,
-                                    'text': text
-                                })
+                # Take links and Markdown straight from crawl4ai's result
+                page = adapt_result(result, base_url, config)
+                links = [link for link in page.internal_links(domain="docs.langtrace.ai")
+                         if link['href'] not in self._visited_urls]
                 
                 print(f"Found {len(links)} new internal links")
                 
-                # Get content using crawl4ai's content extraction
-                if result.html:
-                    # Use BeautifulSoup to parse and clean the HTML
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(result.html, 'html.parser')
+                # Drop the sidebar, header and footer blocks every page repeats
+                content = self.boilerplate.strip_markdown(source_key, page.content)
+                if content:
+                    # Extract page name from URL
+                    parsed_url = urlparse(base_url)
+                    page_name = parsed_url.path.strip('/')
+                    if not page_name:
+                        page_name = 'index'
+                    
+                    print(f"Saving content for {page_name}")
                     
-                    # Remove unwanted elements
-                    for element in soup.select('nav, footer, header, script, style, .sidebar-content'):
-                        element.decompose()
+                    # Save as markdown
+                    markdown_content = f"# {page_name}\n\n"
+                    markdown_content += f"URL: {base_url}\n\n"
+                    markdown_content += content
                     
-                    # Get the main content
-                    main_content = soup.select_one(config.css_selector)
-                    if main_content:
-                        # Create data structure
-                        data = {
-                            'content': main_content.get_text(strip=True, separator='\n'),
-                            'links': links
-                        }
-                        
-                        # Extract page name from URL
-                        parsed_url = urlparse(base_url)
-                        page_name = parsed_url.path.strip('/')
-                        if not page_name:
-                            page_name = 'index'
-                        
-                        print(f"Saving content for {page_name}")
-                        
-                        # Save as markdown
-                        if data.get('content'):
-                            markdown_content = f"# {page_name}\n\n"
-                            markdown_content += f"URL: {base_url}\n\n"
-                            markdown_content += data['content']
-                            
-                            self.save_markdown(source_key, page_name, markdown_content)
-                            
-                            # Save JSON for LLM consumption
-                            doc_structure = {
-                                "url": base_url,
-                                "page": page_name,
-                                "content": data['content'],
-                                "navigation": data.get('links', []),
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            self.save_json(source_key, page_name, doc_structure)
-                            print(f"Saved content for {page_name}")
+                    self.save_markdown(source_key, page_name, markdown_content)
+                    
+                    # Save JSON for LLM consumption
+                    doc_structure = {
+                        "url": base_url,
+                        "page": page_name,
+                        "title": page.title,
+                        "content": content,
+                        "navigation": links,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    self.save_json(source_key, page_name, doc_structure)
+                    print(f"Saved content for {page_name}")
                 
                 # Process navigation links recursively
                 for link in links:
@@ -191,8 +173,13 @@ class LangtraceDocCrawler:
             import traceback
             traceback.print_exc()
 
-    async def crawl(self, source_key: str):
-        """Crawl documentation for a specific source."""
+    async def crawl(self, source_key: str, pool: Optional[BrowserPool] = None):
+        """Crawl documentation for a specific source.
+
+        Args:
+            source_key: Key of the source to crawl
+            pool: Shared browser pool; a private one is opened if omitted
+        """
         if source_key not in self.sources:
             print(f"Source {source_key} not found")
             return
@@ -205,11 +192,8 @@ class LangtraceDocCrawler:
             ignore_https_errors=True
         )
         
-        # Create crawler instance with reduced concurrency
-        async with AsyncWebCrawler(
-            browser_config=browser_config,
-            max_concurrent_pages=2  # Reduce concurrent pages to avoid overload
-        ) as crawler:
+        # Borrow the browser with reduced concurrency to avoid overload
+        async with borrow_pool(pool, browser_config=browser_config, pool_size=2) as crawler:
             try:
                 # Start with the main URL
                 await self.process_page(source_key, crawler)
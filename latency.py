@@ -0,0 +1,69 @@
+"""Per-source render latency tracking for adaptive timeouts and hedging."""
+
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """Keep recent render times per source and derive timeouts from them.
+
+    Until a source has ``min_samples`` successful renders its timeout is the
+    caller's default. After that the timeout is the p99 latency times ``k``,
+    kept between ``floor`` and the caller's default, and a hedged second
+    attempt is worth starting once a render runs past the p95.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20, k: float = 3.0,
+                 floor: float = 5.0):
+        """Initialize the tracker.
+
+        Args:
+            window: Recent renders kept per source
+            min_samples: Renders needed before percentiles are trusted
+            k: Multiplier applied to the p99 latency to get the timeout
+            floor: Shortest timeout ever set, in seconds
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self.k = k
+        self.floor = floor
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, source: str, seconds: float) -> None:
+        """Record how long a successful render took."""
+        self._samples.setdefault(source, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, source: str, pct: float) -> Optional[float]:
+        """Get a latency percentile for a source, or None while samples are too few."""
+        samples = self._samples.get(source)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def timeout(self, source: str, default: Optional[float] = None) -> Optional[float]:
+        """Get the render timeout for a source.
+
+        Args:
+            source: Source name
+            default: Timeout used until enough samples exist, and the upper bound after
+        """
+        p99 = self.percentile(source, 99)
+        if p99 is None:
+            return default
+        timeout = max(self.floor, p99 * self.k)
+        return min(timeout, default) if default else timeout
+
+    def hedge_after(self, source: str) -> Optional[float]:
+        """Get how long to wait before starting a hedged attempt, or None to not hedge."""
+        return self.percentile(source, 95)
+
+    def report(self) -> None:
+        """Print latency percentiles and the derived timeout for each source."""
+        for source in self._samples:
+            p50 = self.percentile(source, 50)
+            if p50 is None:
+                continue
+            print(f"Render latency for {source}: p50 {p50:.1f}s, "
+                  f"p95 {self.percentile(source, 95):.1f}s, p99 {self.percentile(source, 99):.1f}s, "
+                  f"timeout {self.timeout(source):.1f}s")
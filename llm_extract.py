@@ -0,0 +1,328 @@
+"""Batch LLM extraction over many pages, with chunk results memoized on disk.
+
+``LLMExtractor`` splits each page's Markdown into chunks and sends every chunk
+to an OpenAI-compatible ``/chat/completions`` endpoint, with at most
+``max_concurrency`` requests in flight across all pages. Each chunk's result
+is stored under the SHA-256 of the chunk, the schema, the instruction and the
+model. The prompt holds no page URL, so a re-run only sends the chunks that
+changed, and a chunk repeated on other pages, such as shared boilerplate, is
+sent once. Each extracted object gets its page's URL as ``source_url`` after
+extraction.
+
+Chunks start at headings once they hold a quarter of ``chunk_tokens``, and are
+cut before a block that would take them past it. Boundaries depend only on the
+text since the previous one, so an edit changes its own chunk and the chunks
+after it only until a boundary falls on the same heading again.
+
+Point ``base_url`` (or ``OPENAI_BASE_URL``) at any OpenAI-compatible server,
+such as a local model or the stand-in server in ``benchmark_llm_cache.py``.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+CACHE_DIR = Path.home() / ".cache" / "crawl4ai-doc-crawler" / "llm"
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# Tokens per word, the estimate crawl4ai's chunking uses
+WORD_TOKEN_RATE = 1.3
+# Responses worth retrying after a pause
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+HEADING = re.compile(r"^#{1,6}\s")
+FENCE = re.compile(r"^\s{0,3}(```|~~~)")
+JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+# Field naming the page an extracted object came from
+URL_FIELD = "source_url"
+
+PROMPT = """Here is the content of a web page:
+<content>
+{content}
+</content>
+
+{instruction}
+
+Return the extracted data as a JSON array of objects matching this JSON schema, and nothing else:
+<schema>
+{schema}
+</schema>
+If the content holds nothing to extract, return []."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens in a text from its word count."""
+    return int(len(text.split()) * WORD_TOKEN_RATE)
+
+
+def _blocks(markdown: str) -> List[str]:
+    """Split Markdown into blank-line separated blocks, keeping code fences whole."""
+    blocks, lines, fence = [], [], ""
+    for line in markdown.splitlines():
+        match = FENCE.match(line)
+        if match:
+            fence = "" if fence and match.group(1) == fence else fence or match.group(1)
+        if not line.strip() and not fence:
+            if lines:
+                blocks.append("\n".join(lines))
+                lines = []
+            continue
+        lines.append(line)
+    if lines:
+        blocks.append("\n".join(lines))
+    return blocks
+
+
+def chunk_markdown(markdown: str, chunk_tokens: int = 1000) -> List[str]:
+    """Split Markdown into chunks of about ``chunk_tokens``, preferring heading boundaries.
+
+    Args:
+        markdown: Page Markdown
+        chunk_tokens: Largest chunk size in estimated tokens; a single larger block is its own chunk
+
+    Returns:
+        List[str]: Chunks in page order
+    """
+    chunks, current, size = [], [], 0
+    min_tokens = chunk_tokens // 4
+    for block in _blocks(markdown):
+        tokens = estimate_tokens(block)
+        if current and (size + tokens > chunk_tokens or (HEADING.match(block) and size >= min_tokens)):
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(block)
+        size += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _parse_items(text: str) -> List[Any]:
+    """Read the JSON array a model returned, allowing a Markdown code fence around it."""
+    data = json.loads(JSON_FENCE.sub("", text.strip()))
+    if isinstance(data, dict):
+        # Some models wrap the array in an object
+        lists = [value for value in data.values() if isinstance(value, list)]
+        return lists[0] if len(lists) == 1 else [data]
+    return data if isinstance(data, list) else [data]
+
+
+class ChunkCache:
+    """Extraction results stored on disk by chunk, schema, instruction and model."""
+
+    def __init__(self, root: Path = CACHE_DIR):
+        self.root = Path(root)
+
+    @staticmethod
+    def key(chunk: str, schema: str, instruction: str, model: str) -> str:
+        """Hash everything that decides a chunk's result.
+
+        Args:
+            chunk: Markdown chunk
+            schema: Serialized JSON schema of one item
+            instruction: What to extract
+            model: Model the chunk is sent to
+        """
+        digest = hashlib.sha256()
+        for part in (hashlib.sha256(chunk.encode()).hexdigest(), schema, instruction, model):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a stored result, or None if there is none or it can't be read."""
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result, renaming it into place so concurrent runs never read half a file."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(value), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+@dataclass
+class LLMStats:
+    """Chunk, token and latency totals for an extraction run."""
+    chunks: int = 0
+    cached: int = 0
+    requests: int = 0
+    failed: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    saved_tokens: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Get a request latency percentile, or None before any request."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def report(self) -> None:
+        """Print chunk counts, token usage and request latency."""
+        print(f"\nLLM extraction: {self.chunks} chunks, {self.cached} from cache, "
+              f"{self.requests} requests, {self.failed} failed")
+        print(f"Tokens: {self.prompt_tokens} prompt, {self.completion_tokens} completion, "
+              f"{self.saved_tokens} saved by the cache")
+        if self.latencies:
+            print(f"Request latency: p50 {self.percentile(50):.2f}s, p95 {self.percentile(95):.2f}s, "
+                  f"max {max(self.latencies):.2f}s")
+
+
+class LLMExtractor:
+    """Extract structured data from many pages' Markdown with memoized, concurrent LLM calls.
+
+    Usage::
+
+        async with LLMExtractor(instruction="...", schema=Model.model_json_schema()) as extractor:
+            results = await extractor.extract_pages({url: markdown, ...})
+        extractor.stats.report()
+    """
+
+    def __init__(self, instruction: str, schema: Optional[Dict[str, Any]] = None,
+                 model: str = "openai/gpt-4o-mini", api_token: Optional[str] = None,
+                 base_url: Optional[str] = None, max_concurrency: int = 8, chunk_tokens: int = 1000,
+                 cache: Optional[ChunkCache] = None, extra_args: Optional[Dict[str, Any]] = None,
+                 retries: int = 3, timeout: int = 120):
+        """Initialize the extractor.
+
+        Args:
+            instruction: What to extract
+            schema: JSON schema of one extracted item
+            model: Model name; an ``openai/`` provider prefix is dropped from requests
+            api_token: API key; defaults to ``OPENAI_API_KEY``
+            base_url: API base URL; defaults to ``OPENAI_BASE_URL``, then OpenAI's
+            max_concurrency: Most chunk requests in flight at once, across all pages
+            chunk_tokens: Largest chunk size in estimated tokens
+            cache: Chunk result store; None to always call the model
+            extra_args: Extra request fields, such as temperature and max_tokens
+            retries: Attempts per chunk on rate limits, server errors and timeouts
+            timeout: Timeout in seconds for one request
+        """
+        self.instruction = instruction
+        self.schema = json.dumps(schema or {}, sort_keys=True)
+        self.model = model
+        self.api_token = api_token or os.getenv("OPENAI_API_KEY", "")
+        self.base_url = (base_url or os.getenv("OPENAI_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.chunk_tokens = chunk_tokens
+        self.cache = cache
+        self.extra_args = {"temperature": 0.0, **(extra_args or {})}
+        self.retries = retries
+        self.timeout = timeout
+        self.stats = LLMStats()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Requests in flight by cache key, so a chunk repeated across pages is sent once
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    async def __aenter__(self) -> "LLMExtractor":
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def _complete(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """Send one chat completion request, retrying with backoff.
+
+        Returns:
+            Optional[Dict[str, Any]]: The response body, or None if every attempt failed
+        """
+        model = self.model[len("openai/"):] if self.model.startswith("openai/") else self.model
+        payload = {"model": model, "messages": [{"role": "user", "content": prompt}], **self.extra_args}
+        headers = {"Authorization": f"Bearer {self.api_token}"} if self.api_token else {}
+        for attempt in range(self.retries):
+            start = time.perf_counter()
+            try:
+                async with self._session.post(f"{self.base_url}/chat/completions",
+                                              json=payload, headers=headers) as response:
+                    if response.status in RETRY_STATUSES and attempt + 1 < self.retries:
+                        print(f"LLM request got {response.status}, retrying")
+                    elif response.status != 200:
+                        print(f"LLM request failed with {response.status}: {(await response.text())[:200]}")
+                        return None
+                    else:
+                        body = await response.json()
+                        self.stats.latencies.append(time.perf_counter() - start)
+                        return body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"LLM request error: {str(e) or type(e).__name__}")
+            await asyncio.sleep(2 ** attempt)
+        return None
+
+    async def _extract_chunk(self, url: str, chunk: str) -> List[Any]:
+        """Extract one chunk, from the cache when its result is stored or already requested."""
+        self.stats.chunks += 1
+        if self.cache is None:
+            return await self._request(url, chunk, None)
+        key = ChunkCache.key(chunk, self.schema, self.instruction, self.model)
+        stored = self.cache.get(key)
+        if stored is not None:
+            self.stats.cached += 1
+            self.stats.saved_tokens += sum(stored.get("usage", {}).values())
+            return stored["items"]
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.stats.cached += 1
+            return await pending
+        self._pending[key] = asyncio.ensure_future(self._request(url, chunk, key))
+        try:
+            return await self._pending[key]
+        finally:
+            self._pending.pop(key, None)
+
+    async def _request(self, url: str, chunk: str, key: Optional[str]) -> List[Any]:
+        """Send one chunk to the model, storing the result under key if given."""
+        prompt = PROMPT.format(content=chunk, instruction=self.instruction, schema=self.schema)
+        async with self._semaphore:
+            self.stats.requests += 1
+            body = await self._complete(prompt)
+        if body is None:
+            self.stats.failed += 1
+            return []
+        try:
+            items = _parse_items(body["choices"][0]["message"]["content"])
+        except Exception as e:
+            print(f"Error reading LLM response for a chunk of {url}: {str(e)}")
+            self.stats.failed += 1
+            return []
+
+        usage = body.get("usage") or {}
+        usage = {name: usage.get(name, 0) or 0 for name in ("prompt_tokens", "completion_tokens")}
+        self.stats.prompt_tokens += usage["prompt_tokens"]
+        self.stats.completion_tokens += usage["completion_tokens"]
+        if key is not None:
+            self.cache.put(key, {"items": items, "usage": usage, "model": self.model})
+        return items
+
+    async def extract_markdown(self, url: str, markdown: str) -> List[Any]:
+        """Extract items from one page's Markdown, in page order, each object tagged with the page URL."""
+        chunks = chunk_markdown(markdown, self.chunk_tokens)
+        results = await asyncio.gather(*(self._extract_chunk(url, chunk) for chunk in chunks))
+        # Copies, so results shared with the cache or other pages keep no URL
+        return [{**item, URL_FIELD: url} if isinstance(item, dict) else item
+                for items in results for item in items]
+
+    async def extract_pages(self, pages: Dict[str, str]) -> Dict[str, List[Any]]:
+        """Extract items from many pages' Markdown, keyed by URL."""
+        results = await asyncio.gather(*(self.extract_markdown(url, markdown) for url, markdown in pages.items()))
+        return dict(zip(pages, results))
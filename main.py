@@ -10,122 +10,49 @@ import argparse
 import traceback
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+from asset_cache import AssetCache
+from browser_daemon import PROFILE_DIR
+from boilerplate import BoilerplateStore
+from browser_pool import BrowserPool, borrow_pool
+from content_detect import find_main_content
+from extraction_rules import SourceRules, load_rules
+from html_parser import result_soup
+from hybrid_fetch import HybridFetcher
+from sharding import ShardedRenderer
 
 class DocCrawler:
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", pool_size: int = 5, static_first: bool = True,
+                 browser_cache: bool = True, learn_boilerplate: bool = True):
         """Initialize the documentation crawler.
         
         Args:
             output_dir: Base directory for output files
+            pool_size: Maximum number of pages rendering at once across all sources
+            static_first: Try a plain HTTP fetch before rendering in the browser
+            browser_cache: Keep the browser profile and static assets cached between runs
+            learn_boilerplate: Learn each source's repeated page furniture and strip it from later pages
         """
         self.base_output_dir = output_dir
+        self.pool_size = pool_size
+        self.static_first = static_first
+        self.browser_cache = browser_cache
+        self.boilerplate = BoilerplateStore() if learn_boilerplate else None
         
-        # Define available crawlers and their configurations
-        self.sources = {
-            "cloudformation": {
-                "url": "https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/aws-template-resource-type-ref.html",
-                "output_dir": "cloudformation",
-                "content_selectors": [
-                    'div.awsdocs-content',
-                    'div#main-content',
-                    'div[role="main"]',
-                    'div.awsui-context-content-header',
-                    'main',
-                    'article',
-                    'div.table-contents'
-                ],
-                "link_pattern": "/AWS_"
-            },
-            "boto3": {
-                "url": "https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/index.html",
-                "output_dir": "boto3",
-                "content_selectors": [
-                    'div.section',
-                    'div.body',
-                    'div[role="main"]'
-                ],
-                "link_pattern": "services/"
-            },
-            "pulumi": {
-                "url": "https://www.pulumi.com/registry/packages/aws/api-docs/",
-                "output_dir": "pulumi",
-                "content_selectors": [
-                    'main',
-                    'article',
-                    'div.content'
-                ],
-                "link_pattern": "/api-docs/"
-            },
-            "terraform": {
-                "url": "https://registry.terraform.io/providers/hashicorp/aws/latest/docs",
-                "output_dir": "terraform",
-                "content_selectors": [
-                    'div[role="main"]',
-                    'article',
-                    'div.content'
-                ],
-                "link_pattern": "/docs/providers/aws/"
-            },
-            "gosdk": {
-                "url": "https://pkg.go.dev/github.com/aws/aws-sdk-go-v2",
-                "output_dir": "gosdk",
-                "content_selectors": [
-                    'main',
-                    'div.Documentation-content',
-                    'article'
-                ],
-                "link_pattern": "/service/"
-            },
-            "cdkpython": {
-                "url": "https://docs.aws.amazon.com/cdk/api/v2/python/modules.html",
-                "output_dir": "cdkpython",
-                "content_selectors": [
-                    'div#main-content',
-                    'main',
-                    'article',
-                    'div.content'
-                ],
-                "link_pattern": "aws_cdk."
-            }
-        }
+        # Available sources and their extraction rules, compiled once
+        self.sources: Dict[str, SourceRules] = load_rules("doc_crawler")
         
         # Create output directories
         for source in self.sources.values():
-            os.makedirs(os.path.join(self.base_output_dir, source["output_dir"]), exist_ok=True)
+            os.makedirs(os.path.join(self.base_output_dir, source.output_dir), exist_ok=True)
 
-    def _normalize_url(self, base_url: str, href: str) -> Optional[str]:
-        """Normalize URL and check if it should be crawled."""
-        try:
-            if href.startswith('/'):
-                base_parts = urlparse(base_url)
-                return f"{base_parts.scheme}://{base_parts.netloc}{href}"
-            elif href.startswith('http'):
-                return href
-            else:
-                return urljoin(base_url, href)
-        except Exception as e:
-            print(f"Error normalizing URL {href}: {str(e)}")
-            return None
-
-    def _clean_content(self, article: BeautifulSoup) -> BeautifulSoup:
-        """Clean the content by removing unnecessary elements."""
-        # Remove navigation elements
-        for selector in ['nav', '.feedback-section', '.breadcrumbs']:
-            for element in article.select(selector):
-                element.decompose()
-        return article
-
-    async def process_page(self, source_name: str, crawler: AsyncWebCrawler, url: str) -> None:
+    async def process_page(self, source_name: str, crawler: HybridFetcher, url: str) -> None:
         """Process a single documentation page."""
         try:
             print(f"\nProcessing page: {url}")
             
             # Get source configuration
             source = self.sources[source_name]
-            output_dir = os.path.join(self.base_output_dir, source["output_dir"])
+            output_dir = os.path.join(self.base_output_dir, source.output_dir)
             
             # Run the crawler
             result = await crawler.arun(url)
@@ -135,48 +62,31 @@ class DocCrawler:
                 return
                 
             # Parse the HTML
-            soup = BeautifulSoup(result.html, 'html.parser')
+            soup = result_soup(result)
             
-            # Try to find content with selectors
-            article = None
-            for selector in source["content_selectors"]:
-                print(f"\nTrying selector: {selector}")
-                article = soup.select_one(selector)
-                if article:
-                    print(f"Found content with selector: {selector}")
-                    print(f"Content length: {len(article.get_text())}")
-                    break
+            # Drop the sidebar, header and footer this source repeats on every page
+            if self.boilerplate is not None:
+                self.boilerplate.strip(source_name, soup)
+            
+            # Try the source's content selectors in priority order
+            article = source.select_content(soup)
             
             if not article:
                 print("\nWARNING: No content found with standard selectors")
-                # Try finding any div with substantial content
-                for div in soup.find_all('div'):
-                    text = div.get_text().strip()
-                    if len(text) > 1000:  # Look for divs with significant content
-                        print(f"Found large div with classes: {div.get('class', [])}")
-                        article = div
-                        break
+                # Fall back to the densest block with substantial content
+                article = find_main_content(soup, min_text=1000)
+                if article:
+                    print(f"Found content block <{article.name}> with classes: {article.get('class', [])}")
             
             if article:
                 # Clean up content
-                article = self._clean_content(article)
+                article = source.clean(article)
                 
                 # Extract content
                 content = article.get_text(strip=True)
                 
-                # Extract all service links
-                links = []
-                for link in article.find_all('a', href=True):
-                    href = link.get('href', '')
-                    text = link.get_text().strip()
-                    
-                    if source["link_pattern"] in href and text and not href.startswith('#'):
-                        normalized_href = self._normalize_url(url, href)
-                        if normalized_href:
-                            links.append({
-                                'href': normalized_href,
-                                'text': text
-                            })
+                # Extract all in-scope service links
+                links = source.links(article, url)
                 
                 print(f"\nFound {len(links)} service links")
                 
@@ -212,8 +122,20 @@ class DocCrawler:
             print(f"Error processing {url}: {str(e)}")
             return []
 
-    async def crawl(self, sources: List[str] = None, service: str = None):
-        """Crawl the documentation."""
+    def cache_kwargs(self) -> Dict:
+        """Get the browser profile and asset store settings for the pool or shards."""
+        if not self.browser_cache:
+            return {}
+        return {"profile_dir": PROFILE_DIR, "asset_cache": AssetCache()}
+
+    async def crawl(self, sources: List[str] = None, service: str = None, pool: Optional[BrowserPool] = None):
+        """Crawl the documentation.
+
+        Args:
+            sources: Source names to crawl, or ['all']
+            service: Optional service filter for service pages
+            pool: Shared browser pool; a private one is opened if omitted
+        """
         try:
             print("\nStarting crawl")
             
@@ -223,39 +145,35 @@ class DocCrawler:
             
             print(f"Processing sources: {', '.join(self.sources.keys())}")
             
-            for source_name, source in self.sources.items():
-                print(f"\nProcessing source {source_name}")
-                print(f"URL: {source['url']}")
-                print(f"Output dir: {source['output_dir']}")
-                
-                # Create the crawler
-                browser_config = BrowserConfig(
-                    headless=True,
-                    ignore_https_errors=True
-                )
-                
-                async with AsyncWebCrawler(
-                    browser_config=browser_config,
-                    max_concurrent_pages=1  # Limit concurrent pages to avoid overload
-                ) as crawler:
-                    # Process the index page first
-                    print("\nProcessing index page")
-                    links = await self.process_page(source_name, crawler, source["url"])
+            # One browser for every source in this run, reusing cached assets from earlier runs
+            async with borrow_pool(pool, pool_size=self.pool_size, **self.cache_kwargs()) as browser:
+                for source_name, source in self.sources.items():
+                    print(f"\nProcessing source {source_name}")
+                    print(f"URL: {source.url}")
+                    print(f"Output dir: {source.output_dir}")
                     
-                    if links:
-                        # Filter links by service if specified
-                        if service:
-                            links = [link for link in links if service.lower() in link['href'].lower() or service.lower() in link['text'].lower()]
-                            print(f"\nFiltered to {len(links)} links for service: {service}")
+                    # Only render pages whose content selectors miss in the plain HTML
+                    async with HybridFetcher(browser, source_name,
+                                             selectors=source.content_selectors,
+                                             static_first=self.static_first) as crawler:
+                        # Process the index page first
+                        print("\nProcessing index page")
+                        links = await self.process_page(source_name, crawler, source.url)
                         
-                        # Process each service page
-                        for i, link in enumerate(links, 1):
-                            print(f"\nProcessing service page {i}/{len(links)}: {link['href']}")
-                            try:
-                                await self.process_page(source_name, crawler, link['href'])
-                            except Exception as e:
-                                print(f"Error processing {link['href']}: {str(e)}")
-                                continue
+                        if links:
+                            # Filter links by service if specified
+                            if service:
+                                links = [link for link in links if service.lower() in link['href'].lower() or service.lower() in link['text'].lower()]
+                                print(f"\nFiltered to {len(links)} links for service: {service}")
+                            
+                            # Process each service page
+                            for i, link in enumerate(links, 1):
+                                print(f"\nProcessing service page {i}/{len(links)}: {link['href']}")
+                                try:
+                                    await self.process_page(source_name, crawler, link['href'])
+                                except Exception as e:
+                                    print(f"Error processing {link['href']}: {str(e)}")
+                                    continue
                     
                     print("\nFinished crawling all pages")
             
@@ -263,6 +181,15 @@ class DocCrawler:
             print(f"Error in crawl: {str(e)}")
             traceback.print_exc()
 
+async def run_crawl(crawler: DocCrawler, sources: List[str], service: Optional[str],
+                    shards: int = 0, pool_size: int = 5):
+    """Run a crawl, spreading renders across browser processes when sharded."""
+    if not shards:
+        await crawler.crawl(sources, service)
+        return
+    async with ShardedRenderer(num_shards=shards, pool_size=pool_size, **crawler.cache_kwargs()) as renderer:
+        await crawler.crawl(sources, service, pool=renderer)
+
 def main():
     """Main entry point for the crawler."""
     parser = argparse.ArgumentParser(description='Crawl AWS documentation from multiple sources.')
@@ -283,12 +210,18 @@ def main():
     # Other options
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     parser.add_argument('--output-dir', help='Custom output directory for documentation')
+    parser.add_argument('--pool-size', type=int, default=5, help='Maximum pages rendering at once in the shared browser')
+    parser.add_argument('--browser-only', action='store_true', help='Render every page in the browser instead of trying plain HTTP first')
+    parser.add_argument('--shards', type=int, default=0, help='Render in this many browser processes (pool size applies per shard)')
+    parser.add_argument('--no-browser-cache', action='store_true', help='Start from an empty browser cache and skip the static asset store')
+    parser.add_argument('--no-boilerplate', action='store_true', help="Keep each site's repeated sidebars, headers and footers")
     
     args = parser.parse_args()
     
     # Initialize crawler with custom output directory if provided
     output_dir = args.output_dir if args.output_dir else "output"
-    crawler = DocCrawler(output_dir)
+    crawler = DocCrawler(output_dir, pool_size=args.pool_size, static_first=not args.browser_only,
+                         browser_cache=not args.no_browser_cache, learn_boilerplate=not args.no_boilerplate)
     
     # Determine which sources to crawl
     sources = []
@@ -312,7 +245,7 @@ def main():
             parser.error("Please specify at least one documentation source or use --all")
     
     print(f"Starting crawler for sources: {', '.join(sources)}")
-    asyncio.run(crawler.crawl(sources, args.service))
+    asyncio.run(run_crawl(crawler, sources, args.service, args.shards, args.pool_size))
 
 if __name__ == "__main__":
     main()
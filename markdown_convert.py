@@ -0,0 +1,555 @@
+"""Markdown conversion straight from a parsed tree.
+
+``html2text`` takes a string, so converting an element the crawler has
+already parsed means serializing it and tokenizing it again with the
+pure-Python ``html.parser``. ``MarkdownConverter`` walks the BeautifulSoup
+tree instead and applies html2text's rules to each element and text node.
+
+Only the settings the crawler uses are supported (see
+``APIDocCrawler.new_html2text``): no wrapping, ``-`` bullets, tables as
+``|``-separated rows, ``<...>``-protected inline links, images as their alt
+text, single line breaks and Unicode output. For those settings the output
+matches ``HTML2Text.handle(str(element))`` of the pinned html2text 2024.2.26
+character for character; ``tests/test_markdown_convert.py`` checks this against
+saved html2text output, and ``benchmark_markdown.py`` also over random pages.
+"""
+
+import re
+import string
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, Tag
+from bs4.element import PreformattedString
+
+# html2text's escaping rules (html2text.config)
+_WHITESPACE = re.compile(r"\s+")
+_ENTITY_CHARS = re.compile(r"([&<>])")
+_MD_CHARS = re.compile(r"([\\\[\]\(\)])")
+_MD_BACKSLASH = re.compile(r"(\\)(?=[%s])" % re.escape(r"\`*_{}[]()#+-.!"))
+_MD_DOT = re.compile(r"^(\s*\d+)(\.)(?=\s)", re.MULTILINE)
+_MD_PLUS = re.compile(r"^(\s*)(\+)(?=\s)", re.MULTILINE)
+_MD_DASH = re.compile(r"^(\s*)(-)(?=\s|\-)", re.MULTILINE)
+_STRESS_SPACING = re.compile(r"[^][(){}\s.!?]")
+_ABSOLUTE_URL = re.compile(r"^[a-zA-Z+]+://")
+
+# Tags inside a link that do not open its "[" (html2text.HTML2Text.handle_tag)
+_NO_LINK_OPEN = {"p", "div", "style", "dl", "dt", "img"}
+_LIST_TAGS = {"ol", "ul"}
+_HEADINGS = {f"h{n}": n for n in range(1, 10)}
+
+UL_ITEM_MARK = "-"
+EMPHASIS_MARK = "_"
+STRONG_MARK = "**"
+NBSP_PLACEHOLDER = "&nbsp_place_holder;"
+
+
+def escape_md(text: str) -> str:
+    """Escape Markdown characters inside a link or image."""
+    return _MD_CHARS.sub(r"\\\1", text)
+
+
+def escape_md_section(text: str) -> str:
+    """Escape Markdown characters in running text."""
+    if "\\" in text:
+        text = _MD_BACKSLASH.sub(r"\\\1", text)
+    if "." in text:
+        text = _MD_DOT.sub(r"\1\\\2", text)
+    if "+" in text:
+        text = _MD_PLUS.sub(r"\1\\\2", text)
+    if "-" in text:
+        text = _MD_DASH.sub(r"\1\\\2", text)
+    return text
+
+
+class MarkdownConverter:
+    """Convert one BeautifulSoup tree or element to Markdown.
+
+    A converter holds the state of a single conversion; create one per
+    document, or use ``tree_to_markdown``.
+    """
+
+    def __init__(self, baseurl: str = ""):
+        """Initialize the converter.
+
+        Args:
+            baseurl: URL that link targets are resolved against
+        """
+        self.baseurl = baseurl
+        self.outtextlist: List[str] = []
+        self.quiet = 0
+        self.p_p = 0  # newlines to write before the next output
+        self.outcount = 0
+        self.start = True
+        self.space = False
+        self.astack: List[Optional[Dict[str, Any]]] = []
+        self.maybe_automatic_link: Optional[str] = None
+        self.empty_link = False
+        self.list: List[List[Any]] = []  # [name, number of the last item]
+        self.blockquote = 0
+        self.pre = False
+        self.startpre = False
+        self.code = False
+        self.quote = False
+        self.br_toggle = ""
+        self.last_was_nl = False
+        self.last_was_list = False
+        self.stressed = False
+        self.preceding_stressed = False
+        self.preceding_data = ""
+        self.current_tag = ""
+        self.split_next_td = False
+        self.td_count = 0
+        self.table_start = False
+        self.abbr_title: Optional[str] = None
+        self.abbr_data: Optional[str] = None
+        self.abbr_list: Dict[str, str] = {}
+        self._handlers: Dict[str, Callable[[Tag, bool], bool]] = {
+            "p": self._block, "div": self._block,
+            "br": self._br, "hr": self._hr,
+            "head": self._quiet, "script": self._quiet, "style": self._quiet,
+            "body": self._body, "blockquote": self._blockquote,
+            "em": self._em, "i": self._em, "u": self._em,
+            "strong": self._strong, "b": self._strong,
+            "del": self._strike, "strike": self._strike, "s": self._strike,
+            "kbd": self._code, "code": self._code, "tt": self._code,
+            "abbr": self._abbr, "q": self._q, "a": self._a, "img": self._img,
+            "dl": self._dl, "dt": self._dt, "dd": self._dd,
+            "ol": self._list, "ul": self._list, "li": self._li,
+            "table": self._table, "tr": self._tr, "td": self._cell, "th": self._cell,
+            "pre": self._pre,
+        }
+        for heading in _HEADINGS:
+            self._handlers[heading] = self._heading
+
+    # Conversion
+
+    def convert(self, node: Union[BeautifulSoup, Tag]) -> str:
+        """Convert a tree or element, as ``HTML2Text.handle(str(node))`` would."""
+        self.walk(node)
+        return self.finish()
+
+    def walk(self, node: Union[BeautifulSoup, Tag]) -> None:
+        """Feed a tree's tags and text through the converter, in document order."""
+        # The BeautifulSoup object itself is not a tag in the serialized page
+        is_document = isinstance(node, BeautifulSoup)
+        if not is_document:
+            self.tag(node, True)
+        stack = [(node, iter(node.contents))]
+        while stack:
+            parent, children = stack[-1]
+            for child in children:
+                if isinstance(child, Tag):
+                    self.tag(child, True)
+                    stack.append((child, iter(child.contents)))
+                    break
+                if not isinstance(child, PreformattedString):
+                    self.text(child)
+            else:
+                stack.pop()
+                if stack or not is_document:
+                    self.tag(parent, False)
+
+    def finish(self) -> str:
+        """Close the output and return the Markdown."""
+        self.pbr()
+        self.o("", force="end")
+        outtext = "".join(self.outtextlist).replace(NBSP_PLACEHOLDER, "\xa0")
+        self.outtextlist = []
+        return outtext
+
+    def text(self, text: str) -> None:
+        """Handle a text node.
+
+        Serialized, the node's ``&``, ``<`` and ``>`` are entities, which
+        html2text receives as separate unescaped pieces; the same split is made
+        here so escaping and spacing come out the same.
+        """
+        if "&" in text or "<" in text or ">" in text:
+            for piece in _ENTITY_CHARS.split(text):
+                if piece in ("&", "<", ">"):
+                    self.handle_data(piece, True)
+                elif piece:
+                    self.handle_data(piece)
+        else:
+            self.handle_data(str(text))
+
+    def tag(self, element: Tag, start: bool) -> None:
+        """Handle an element's start or end."""
+        tag = element.name
+        self.current_tag = tag
+        if start and self.maybe_automatic_link is not None and tag not in _NO_LINK_OPEN:
+            self.o("[")
+            self.maybe_automatic_link = None
+            self.empty_link = False
+
+        handler = self._handlers.get(tag)
+        if handler is not None and handler(element, start):
+            # Headings and linked images stop here, as in html2text
+            return
+        if tag not in _LIST_TAGS:
+            self.last_was_list = False
+
+    # Element handlers; True means skip the rest of the tag handling
+
+    def _heading(self, element: Tag, start: bool) -> bool:
+        level = _HEADINGS[element.name]
+        if self.astack:
+            if start:
+                # Inside a link's text, so '#' can only go before the '['
+                if self.outtextlist and self.outtextlist[-1] == "[":
+                    self.outtextlist.pop()
+                    self.space = False
+                    self.o(level * "#" + " ")
+                    self.o("[")
+                return False
+            self.p_p = 0
+            return True
+        self.p()
+        if start:
+            self.o(level * "#" + " ")
+            return False
+        return True
+
+    def _block(self, element: Tag, start: bool) -> bool:
+        if not self.astack and not self.split_next_td:
+            self.p()
+        return False
+
+    def _br(self, element: Tag, start: bool) -> bool:
+        if start:
+            self.o("  \n> " if self.blockquote > 0 else "  \n")
+        return False
+
+    def _hr(self, element: Tag, start: bool) -> bool:
+        if start:
+            self.p()
+            self.o("* * *")
+            self.p()
+        return False
+
+    def _quiet(self, element: Tag, start: bool) -> bool:
+        self.quiet += 1 if start else -1
+        return False
+
+    def _body(self, element: Tag, start: bool) -> bool:
+        self.quiet = 0
+        return False
+
+    def _blockquote(self, element: Tag, start: bool) -> bool:
+        if start:
+            self.p()
+            self.o("> ", force=True)
+            self.start = True
+            self.blockquote += 1
+        else:
+            self.blockquote -= 1
+            self.p()
+        return False
+
+    def _em(self, element: Tag, start: bool) -> bool:
+        # A space keeps the mark from running into a preceding word
+        if start and self.preceding_data and self.preceding_data[-1] not in string.whitespace \
+                and self.preceding_data[-1] not in string.punctuation:
+            emphasis = " " + EMPHASIS_MARK
+            self.preceding_data += " "
+        else:
+            emphasis = EMPHASIS_MARK
+        self.o(emphasis)
+        if start:
+            self.stressed = True
+        return False
+
+    def _strong(self, element: Tag, start: bool) -> bool:
+        if start and self.preceding_data and self.preceding_data[-1] == STRONG_MARK[0]:
+            strong = " " + STRONG_MARK
+            self.preceding_data += " "
+        else:
+            strong = STRONG_MARK
+        self.o(strong)
+        if start:
+            self.stressed = True
+        return False
+
+    def _strike(self, element: Tag, start: bool) -> bool:
+        if start and self.preceding_data and self.preceding_data[-1] == "~":
+            strike = " ~~"
+            self.preceding_data += " "
+        else:
+            strike = "~~"
+        self.o(strike)
+        if start:
+            self.stressed = True
+        return False
+
+    def _code(self, element: Tag, start: bool) -> bool:
+        if not self.pre:
+            self.o("`")
+            self.code = not self.code
+        return False
+
+    def _abbr(self, element: Tag, start: bool) -> bool:
+        if start:
+            self.abbr_title = _attr(element, "title")
+            self.abbr_data = ""
+        else:
+            if self.abbr_title is not None:
+                self.abbr_list[self.abbr_data] = self.abbr_title
+                self.abbr_title = None
+            self.abbr_data = None
+        return False
+
+    def _q(self, element: Tag, start: bool) -> bool:
+        self.o('"')
+        self.quote = not self.quote
+        return False
+
+    def _a(self, element: Tag, start: bool) -> bool:
+        if start:
+            href = _attr(element, "href")
+            # Internal "#" links are written as plain text
+            if href is not None and not href.startswith("#"):
+                self.astack.append({"href": "<" + href + ">", "title": _attr(element, "title")})
+                self.maybe_automatic_link = href
+                self.empty_link = True
+            else:
+                self.astack.append(None)
+        elif self.astack:
+            a = self.astack.pop()
+            if self.maybe_automatic_link and not self.empty_link:
+                self.maybe_automatic_link = None
+            elif a:
+                if self.empty_link:
+                    self.o("[")
+                    self.empty_link = False
+                    self.maybe_automatic_link = None
+                self.p_p = 0
+                title = escape_md(a["title"] or "")
+                title = ' "{}"'.format(title) if title.strip() else ""
+                self.o("]({url}{title})".format(url=escape_md(urljoin(self.baseurl, a["href"])), title=title))
+        return False
+
+    def _img(self, element: Tag, start: bool) -> bool:
+        if not start or _attr(element, "src") is None:
+            return False
+        alt = _attr(element, "alt") or ""
+        if self.maybe_automatic_link is not None:
+            href = self.maybe_automatic_link
+            if escape_md(alt) == href and _ABSOLUTE_URL.match(href):
+                self.o("<" + escape_md(alt) + ">")
+                self.empty_link = False
+                return True
+            self.o("[")
+            self.maybe_automatic_link = None
+            self.empty_link = False
+        self.o(escape_md(alt))
+        return False
+
+    def _dl(self, element: Tag, start: bool) -> bool:
+        if start:
+            self.p()
+        return False
+
+    def _dt(self, element: Tag, start: bool) -> bool:
+        if not start:
+            self.pbr()
+        return False
+
+    def _dd(self, element: Tag, start: bool) -> bool:
+        if start:
+            self.o("    ")
+        else:
+            self.pbr()
+        return False
+
+    def _list(self, element: Tag, start: bool) -> bool:
+        if not self.list and not self.last_was_list:
+            self.p()
+        if start:
+            self.list.append([element.name, _numbering_start(element)])
+        elif self.list:
+            self.list.pop()
+            if not self.list:
+                self.o("\n")
+        self.last_was_list = True
+        return False
+
+    def _li(self, element: Tag, start: bool) -> bool:
+        self.pbr()
+        if start:
+            li = self.list[-1] if self.list else ["ul", 0]
+            # Two spaces per enclosing list, three for an unordered list inside an ordered list
+            parent_list = None
+            for enclosing in self.list:
+                self.o("   " if parent_list == "ol" and enclosing[0] == "ul" else "  ")
+                parent_list = enclosing[0]
+            if li[0] == "ul":
+                self.o(UL_ITEM_MARK + " ")
+            elif li[0] == "ol":
+                li[1] += 1
+                self.o(str(li[1]) + ". ")
+            self.start = True
+        return False
+
+    def _table(self, element: Tag, start: bool) -> bool:
+        if start:
+            self.table_start = True
+        return False
+
+    def _tr(self, element: Tag, start: bool) -> bool:
+        if start:
+            self.td_count = 0
+            return False
+        self.split_next_td = False
+        self.soft_br()
+        if self.table_start:
+            # Underline the header row
+            self.o("|".join(["---"] * self.td_count))
+            self.soft_br()
+            self.table_start = False
+        return False
+
+    def _cell(self, element: Tag, start: bool) -> bool:
+        if start:
+            if self.split_next_td:
+                self.o("| ")
+            self.split_next_td = True
+            self.td_count += 1
+        return False
+
+    def _pre(self, element: Tag, start: bool) -> bool:
+        if start:
+            self.startpre = True
+            self.pre = True
+        else:
+            self.pre = False
+        self.p()
+        return False
+
+    # Output, as in html2text.HTML2Text
+
+    def pbr(self) -> None:
+        if self.p_p == 0:
+            self.p_p = 1
+
+    def p(self) -> None:
+        self.p_p = 1
+
+    def soft_br(self) -> None:
+        self.pbr()
+        self.br_toggle = "  "
+
+    def out(self, s: str) -> None:
+        self.outtextlist.append(s)
+        if s:
+            self.last_was_nl = s[-1] == "\n"
+
+    def o(self, data: str, puredata: bool = False, force: Union[bool, str] = False) -> None:
+        """Write output, applying pending line breaks, spacing and indentation."""
+        if self.abbr_data is not None:
+            self.abbr_data += data
+        if self.quiet:
+            return
+
+        if puredata and not self.pre:
+            data = _WHITESPACE.sub(" ", data)
+            if data and data[0] == " ":
+                self.space = True
+                data = data[1:]
+        if not data and not force:
+            return
+
+        if self.startpre and not data.startswith("\n") and not data.startswith("\r\n"):
+            data = "\n" + data
+
+        bq = ">" * self.blockquote
+        if not (force and data and data[0] == ">") and self.blockquote:
+            bq += " "
+
+        if self.pre:
+            # Inside a list the item's own indentation is already written
+            bq += "    " * (len(self.list) or 1)
+            data = data.replace("\n", "\n" + bq)
+
+        if self.startpre:
+            self.startpre = False
+            if self.list:
+                data = data.lstrip("\n")
+
+        if self.start:
+            self.space = False
+            self.p_p = 0
+            self.start = False
+
+        if force == "end":
+            self.p_p = 0
+            self.out("\n")
+            self.space = False
+
+        if self.p_p:
+            self.out((self.br_toggle + "\n" + bq) * self.p_p)
+            self.space = False
+            self.br_toggle = ""
+
+        if self.space:
+            if not self.last_was_nl:
+                self.out(" ")
+            self.space = False
+
+        if self.abbr_list and force == "end":
+            for abbr, definition in self.abbr_list.items():
+                self.out("  *[" + abbr + "]: " + definition + "\n")
+
+        self.p_p = 0
+        self.out(data)
+        self.outcount += 1
+
+    def handle_data(self, data: str, entity_char: bool = False) -> None:
+        """Write a run of text."""
+        if not data:
+            return
+
+        if self.stressed:
+            data = data.strip()
+            self.stressed = False
+            self.preceding_stressed = True
+        elif self.preceding_stressed:
+            if _STRESS_SPACING.match(data[0]) and self.current_tag not in _HEADINGS \
+                    and self.current_tag not in ("a", "code", "pre"):
+                data = " " + data
+            self.preceding_stressed = False
+
+        if self.maybe_automatic_link is not None:
+            href = self.maybe_automatic_link
+            if href == data and _ABSOLUTE_URL.match(href):
+                self.o("<" + data + ">")
+                self.empty_link = False
+                return
+            self.o("[")
+            self.maybe_automatic_link = None
+            self.empty_link = False
+
+        if not self.code and not self.pre and not entity_char:
+            data = escape_md_section(data)
+        self.preceding_data = data
+        self.o(data, puredata=True)
+
+
+def _attr(element: Tag, name: str) -> Optional[str]:
+    """Read an attribute as html2text sees it, with multi-valued attributes joined."""
+    value = element.attrs.get(name)
+    if isinstance(value, list):
+        return " ".join(value)
+    return value
+
+
+def _numbering_start(element: Tag) -> int:
+    try:
+        return int(_attr(element, "start")) - 1
+    except (TypeError, ValueError):
+        return 0
+
+
+def tree_to_markdown(node: Union[BeautifulSoup, Tag], baseurl: str = "") -> str:
+    """Convert a parsed tree or element to Markdown with the crawler's html2text settings."""
+    return MarkdownConverter(baseurl).convert(node)
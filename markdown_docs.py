@@ -0,0 +1,162 @@
+"""Read documentation that is already Markdown, such as the Terraform provider docs.
+
+Terraform provider docs are Markdown files with YAML front matter::
+
+    ---
+    subcategory: "S3 (Simple Storage)"
+    page_title: "AWS: aws_s3_bucket"
+    description: |-
+      Provides a S3 bucket resource.
+    ---
+
+    # Resource: aws_s3_bucket
+
+``parse_markdown_doc`` splits off the front matter and normalizes the body in
+one pass over its lines, with no HTML conversion:
+
+- ATX headings get one space after the ``#`` marks and lose closing ``#`` marks
+- Setext headings (text underlined with ``===`` or ``---``) become ATX headings
+- Code fences use backticks, with a lowercase language and Terraform's
+  ``hcl``/``tf`` aliases written as ``terraform``; a fence left open is closed.
+  A ``~~~`` fence becomes wider than any bare backtick line in its body, so
+  that line cannot close it
+- Trailing whitespace outside code blocks is dropped
+
+The first level-1 heading becomes the document title and is taken out of the body.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+FENCE = re.compile(r"^( {0,3})(`{3,}|~{3,})\s*([^`\s]*)(.*)$")
+ATX_HEADING = re.compile(r"^ {0,3}(#{1,6})(?!#)(.*)$")
+CLOSING_HASHES = re.compile(r"(?:^|[ \t]+)#+$")
+SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+# Lines that cannot be the text of a setext heading
+NOT_HEADING_TEXT = re.compile(r"^ {0,3}([-*+>|#]|\d+[.)]\s|```|~~~)|^ {4}")
+
+# First characters of the lines that may need rewriting
+MARKER_STARTS = frozenset(" `~#=-")
+
+LANGUAGE_ALIASES = {"hcl": "terraform", "tf": "terraform"}
+
+# libyaml's loader is several times faster when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@dataclass
+class MarkdownDoc:
+    """A Markdown document split into front matter, title and body."""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    title: str = ""
+    markdown: str = ""
+
+
+def split_front_matter(text: str) -> Tuple[Dict[str, Any], str]:
+    """Split YAML front matter from a Markdown document.
+
+    Returns:
+        Tuple[Dict[str, Any], str]: The front matter as a dict (empty if absent or invalid) and the body
+    """
+    if not text.startswith("---"):
+        return {}, text
+    first_break = text.find("\n")
+    if first_break == -1 or text[:first_break].strip() != "---":
+        return {}, text
+    end = re.search(r"^---[ \t]*$", text[first_break + 1:], re.M)
+    if end is None:
+        return {}, text
+    front = text[first_break + 1:first_break + 1 + end.start()]
+    body = text[first_break + 1 + end.end():].lstrip("\n")
+    try:
+        metadata = yaml.load(front, Loader=YAML_LOADER) or {}
+    except yaml.YAMLError as e:
+        print(f"Error parsing front matter: {str(e)}")
+        return {}, body
+    if not isinstance(metadata, dict):
+        return {}, body
+    return {str(key): value.strip() if isinstance(value, str) else value
+            for key, value in metadata.items()}, body
+
+
+def close_fence(lines: List[str], opening: int, width: int) -> None:
+    """Write a code block's fences as backticks of the given width.
+
+    Args:
+        lines: Output lines; ``lines[opening]`` holds the block's language
+        opening: Index of the opening fence line
+        width: Number of backticks
+    """
+    lines[opening] = "`" * width + lines[opening]
+    lines.append("`" * width)
+
+
+def parse_markdown_doc(text: str) -> MarkdownDoc:
+    """Parse a Markdown document's front matter and normalize its body.
+
+    Args:
+        text: Markdown source, with or without front matter
+
+    Returns:
+        MarkdownDoc: Front matter, title and normalized body
+    """
+    metadata, body = split_front_matter(text)
+    lines: List[str] = []
+    title = ""
+    fence = ""  # closing marker of the open code fence, if any
+    opening = 0  # index in lines of the open fence's opening line
+    width = 0  # backticks the open fence needs
+    for line in body.splitlines():
+        if fence:
+            stripped = line.strip()
+            if stripped and set(stripped) == {fence[0]} and len(stripped) >= len(fence):
+                close_fence(lines, opening, width)
+                fence = ""
+            else:
+                if stripped and set(stripped) == {"`"}:
+                    # A bare backtick line would close a narrower backtick fence
+                    width = max(width, len(stripped) + 1)
+                lines.append(line)
+            continue
+
+        line = line.rstrip()
+        if not line or line[0] not in MARKER_STARTS:
+            # Most lines are prose; only these characters can start a fence or heading
+            lines.append(line)
+            continue
+        match = FENCE.match(line)
+        if match and not (match.group(2)[0] == "`" and "`" in match.group(4)):
+            fence = match.group(2)
+            language = match.group(3).lower()
+            # Keep the fence width so a longer fence can still hold ``` lines
+            opening, width = len(lines), len(fence)
+            lines.append(LANGUAGE_ALIASES.get(language, language))
+            continue
+
+        match = ATX_HEADING.match(line)
+        if match:
+            level, heading = len(match.group(1)), CLOSING_HASHES.sub("", match.group(2).strip())
+            if level == 1 and not title:
+                title = heading
+                continue
+            lines.append(f"{'#' * level} {heading}")
+            continue
+
+        match = SETEXT_UNDERLINE.match(line)
+        if match and lines and lines[-1] and not NOT_HEADING_TEXT.match(lines[-1]):
+            level = 1 if match.group(1)[0] == "=" else 2
+            heading = lines.pop().strip()
+            if level == 1 and not title:
+                title = heading
+                continue
+            lines.append(f"{'#' * level} {heading}")
+            continue
+
+        lines.append(line)
+
+    if fence:
+        close_fence(lines, opening, width)
+    return MarkdownDoc(metadata=metadata, title=title, markdown="\n".join(lines).strip() + "\n")
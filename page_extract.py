@@ -0,0 +1,241 @@
+"""In-browser extraction of a page's content, links and title as compact JSON.
+
+An ``ExtractionSpec`` compiles to crawl4ai ``js_code``. The script waits for
+the page's readiness signal, picks the content node, collects links, and
+then replaces the document with a single JSON ``<script>`` element. What
+crosses back to Python is that payload instead of the full page, and the
+crawlers read it with ``json.loads`` instead of building a DOM.
+
+Pages fetched statically (see ``hybrid_fetch``) never ran the script, so
+``ExtractionSpec.extract`` applies the same spec with BeautifulSoup for them.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from content_detect import FIND_CONTENT_JS, find_main_content
+from html_parser import make_soup, result_soup
+from readiness import ReadinessSpec
+
+PAYLOAD_ID = "c4a-extract"
+_PAYLOAD_START = f'<script type="application/json" id="{PAYLOAD_ID}">'
+
+
+@dataclass
+class ExtractedPage:
+    """What the crawlers need from a page, without its DOM.
+
+    Links are grouped by the names given in ``ExtractionSpec.link_selectors``.
+    Each link has the raw ``href`` attribute, the absolute ``url`` and the
+    ``text``.
+    """
+    url: str
+    title: str = ""
+    h1: str = ""
+    page_type: str = ""
+    found: bool = False
+    content_html: str = ""
+    text: str = ""
+    links: Dict[str, List[Dict[str, str]]] = field(default_factory=dict)
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "ExtractedPage":
+        return cls(
+            url=payload.get("url", ""),
+            title=payload.get("title", ""),
+            h1=payload.get("h1", ""),
+            page_type=payload.get("pageType", ""),
+            found=payload.get("found", False),
+            content_html=payload.get("contentHtml", ""),
+            text=payload.get("text", ""),
+            links=payload.get("links", {})
+        )
+
+
+def read_payload(html: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Pull the extraction payload out of a page rendered with the extraction script."""
+    if not html:
+        return None
+    start = html.find(_PAYLOAD_START)
+    if start == -1:
+        return None
+    start += len(_PAYLOAD_START)
+    end = html.find("</script>", start)
+    if end == -1:
+        return None
+    try:
+        return json.loads(html[start:end])
+    except json.JSONDecodeError as e:
+        print(f"Error decoding extraction payload: {str(e)}")
+        return None
+
+
+@dataclass
+class ExtractionSpec:
+    """Which parts of a page a source keeps.
+
+    Attributes:
+        content_selectors: Candidate content containers; the first match wins
+        link_selectors: Named link groups to collect, e.g. {"links": "a[href]"}
+        link_scope: Collect links from the "content" node or the whole "document"
+        remove_selectors: Elements stripped from the content before taking its HTML and text
+        text_separator: String joining the content's stripped text nodes
+        fallback_min_text: With no selector match, use the best-scoring content block
+            (see ``content_detect``) if it has more text than this
+        ready_timeout_ms: Longest the script waits for the readiness signal
+    """
+    content_selectors: List[str]
+    link_selectors: Dict[str, str] = field(default_factory=lambda: {"links": "a[href]"})
+    link_scope: str = "content"
+    remove_selectors: List[str] = field(default_factory=list)
+    text_separator: str = ""
+    fallback_min_text: int = 0
+    ready_timeout_ms: int = 20000
+
+    def js_code(self, readiness: Optional[ReadinessSpec] = None) -> str:
+        """Build the crawl4ai ``js_code`` that extracts the page in the browser.
+
+        crawl4ai runs ``js_code`` before ``wait_for``, so a config using this
+        script should leave ``wait_for`` unset and pass its readiness signal here.
+        """
+        spec = json.dumps({
+            "content": self.content_selectors,
+            "links": self.link_selectors,
+            "linkScope": self.link_scope,
+            "remove": self.remove_selectors,
+            "separator": self.text_separator,
+            "fallbackMinText": self.fallback_min_text,
+        })
+        ready = readiness.predicate() if readiness else "null"
+        detector = FIND_CONTENT_JS if self.fallback_min_text else ""
+        return f"""{detector}
+const spec = {spec};
+const isReady = {ready};
+if (isReady) {{
+    const deadline = Date.now() + {int(self.ready_timeout_ms)};
+    while (!isReady() && Date.now() < deadline) {{
+        await new Promise(r => setTimeout(r, 100));
+    }}
+}}
+
+let content = null;
+for (const selector of spec.content) {{
+    content = document.querySelector(selector);
+    if (content) break;
+}}
+if (!content && spec.fallbackMinText) {{
+    content = findMainContent(document.body, spec.fallbackMinText);
+}}
+
+const linkRoot = spec.linkScope === 'document' ? document : content;
+const links = {{}};
+for (const [name, selector] of Object.entries(spec.links)) {{
+    links[name] = linkRoot ? Array.from(linkRoot.querySelectorAll(selector)).map(a => ({{
+        href: a.getAttribute('href') || '',
+        url: a.href || '',
+        text: a.textContent.trim()
+    }})) : [];
+}}
+
+let contentHtml = '';
+let text = '';
+if (content) {{
+    const clone = content.cloneNode(true);
+    spec.remove.forEach(selector => clone.querySelectorAll(selector).forEach(el => el.remove()));
+    contentHtml = clone.outerHTML;
+    const parts = [];
+    const walker = document.createTreeWalker(clone, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {{
+        if (node.parentElement && node.parentElement.closest('script, style, template')) continue;
+        const value = node.nodeValue.trim();
+        if (value) parts.push(value);
+    }}
+    text = parts.join(spec.separator);
+}}
+
+const h1 = document.querySelector('h1');
+const pageType = document.querySelector('meta[name="page-type"]');
+const payload = {{
+    url: location.href,
+    title: document.title,
+    h1: h1 ? h1.textContent.trim() : '',
+    pageType: pageType ? pageType.content : '',
+    found: !!content,
+    contentHtml: contentHtml,
+    text: text,
+    links: links
+}};
+
+// Escaping '<' keeps the JSON inert inside the script element
+const json = JSON.stringify(payload).replace(/</g, '\\\\u003c');
+document.documentElement.innerHTML =
+    '<head></head><body><script type="application/json" id="{PAYLOAD_ID}">' + json + '</script></body>';
+"""
+
+    def extract(self, result: Any, url: Optional[str] = None) -> Optional[ExtractedPage]:
+        """Get the extracted page from a crawl result.
+
+        Uses the in-browser payload when the page was rendered with this
+        spec's script, otherwise applies the spec to the result's HTML.
+
+        Args:
+            result: crawl4ai, static or shard result
+            url: Page URL used to resolve relative links for static results
+        """
+        html = getattr(result, 'html', None)
+        payload = read_payload(html)
+        if payload is not None:
+            return ExtractedPage.from_payload(payload)
+        if not html:
+            return None
+        return self.extract_tree(result_soup(result), url or getattr(result, 'url', '') or '')
+
+    def extract_html(self, html: str, url: str) -> ExtractedPage:
+        """Apply the spec to raw HTML, matching what the in-browser script returns."""
+        return self.extract_tree(make_soup(html), url)
+
+    def extract_tree(self, soup: BeautifulSoup, url: str) -> ExtractedPage:
+        """Apply the spec to a parsed page; the content's remove selectors are dropped in place."""
+
+        content = None
+        for selector in self.content_selectors:
+            content = soup.select_one(selector)
+            if content:
+                break
+        if not content and self.fallback_min_text:
+            content = find_main_content(soup, self.fallback_min_text)
+
+        link_root = soup if self.link_scope == "document" else content
+        links = {}
+        for name, selector in self.link_selectors.items():
+            links[name] = [{
+                'href': a.get('href', ''),
+                'url': urljoin(url, a.get('href', '')),
+                'text': a.get_text().strip()
+            } for a in link_root.select(selector)] if link_root else []
+
+        content_html = ""
+        text = ""
+        if content:
+            for selector in self.remove_selectors:
+                for el in content.select(selector):
+                    el.decompose()
+            content_html = str(content)
+            text = content.get_text(separator=self.text_separator, strip=True)
+
+        h1 = soup.find('h1')
+        page_type = soup.find('meta', {'name': 'page-type'})
+        return ExtractedPage(
+            url=url,
+            title=soup.title.get_text() if soup.title else "",
+            h1=h1.get_text().strip() if h1 else "",
+            page_type=page_type.get('content', '') if page_type else "",
+            found=content is not None,
+            content_html=content_html,
+            text=text,
+            links=links
+        )
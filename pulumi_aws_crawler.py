@@ -6,9 +6,15 @@ import asyncio
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Set
 from urllib.parse import urljoin, urlparse
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
+from crawl4ai import CrawlerRunConfig, BrowserConfig
 from base import BaseDocCrawler, SDKConfig
-from bs4 import BeautifulSoup
+from boilerplate import BoilerplateStore
+from browser_pool import BrowserPool, borrow_pool
+from extraction_rules import load_rules
+from readiness import ReadinessSpec
+from resource_policy import ResourcePolicy
+from result_adapter import adapt_result
+from stage_timer import StageTimer
 
 class PulumiNativeCrawler(BaseDocCrawler):
     """Crawler for Pulumi AWS Provider documentation using native Crawl4AI methods."""
@@ -22,25 +28,36 @@ class PulumiNativeCrawler(BaseDocCrawler):
             )
         super().__init__(output_dir, config)
         self._visited_urls = set()
+        self.timer = StageTimer("pulumi_aws")
+        
+        # Learns the page furniture each source repeats and strips it
+        self.boilerplate = BoilerplateStore()
+        
+        # Link scope for each source, from config/extraction_rules.json
+        self.rules = load_rules("pulumi_aws")
         
         # Define sources with extraction strategies
         self.sources = {
             "pulumi_aws": {  
                 "url": "https://www.pulumi.com/registry/packages/aws/api-docs",
                 "output_dir": "pulumi_aws",  
+                # Scripts and stylesheets stay allowed for the registry's client-side navigation
+                "resource_policy": ResourcePolicy(name="pulumi_aws"),
                 "index_config": CrawlerRunConfig(
-                    wait_for="css:main",  
-                    wait_until="networkidle",
+                    wait_for=ReadinessSpec(selector="main", quiet_ms=250).wait_for(),  # Module list hydrated
+                    wait_until="domcontentloaded",
                     process_iframes=True,
                     only_text=False,
-                    css_selector="main"  
+                    css_selector="main",  # Get the module list
+                    excluded_selector=".headerlink, .highlight-default"
                 ),
                 "page_config": CrawlerRunConfig(
-                    wait_for="css:article",  
-                    wait_until="networkidle",
+                    wait_for=ReadinessSpec(selector="article", quiet_ms=250).wait_for(),  # Article hydrated
+                    wait_until="domcontentloaded",
                     process_iframes=True,
                     only_text=False,
-                    css_selector="article"  
+                    css_selector="article",  # Get the resource docs
+                    excluded_selector=".headerlink, .highlight-default"
                 )
             }
         }
@@ -58,13 +75,7 @@ class PulumiNativeCrawler(BaseDocCrawler):
         href = href.split('#')[0]
         
         # Check if this is a Pulumi AWS API docs URL
-        if not any(
-            pattern in href 
-            for pattern in [
-                '/registry/packages/aws/api-docs',
-                '/docs/reference/pkg/aws'
-            ]
-        ):
+        if not self.rules["pulumi_aws"].in_scope(href):
             return None
             
         return href
@@ -122,33 +133,12 @@ class PulumiNativeCrawler(BaseDocCrawler):
                 
                 if config:
                     try:
-                        # First ensure page is loaded
-                        pre_config = CrawlerRunConfig(
-                            wait_for="css:body",
-                            wait_until="domcontentloaded",
-                            process_iframes=True,
-                            only_text=False,
-                            css_selector="body"
-                        )
-                        
-                        # Load the page initially
-                        pre_result = await asyncio.wait_for(
-                            crawler.arun(url=url, config=pre_config),
-                            timeout=30
-                        )
-                        
-                        if not pre_result or not pre_result.success:
-                            print(f"Failed initial page load for {url}")
-                            raise Exception("Initial page load failed")
-                        
-                        # Wait a bit for dynamic content
-                        await asyncio.sleep(2)
-                        
-                        # Now load with specific config
-                        result = await asyncio.wait_for(
-                            crawler.arun(url=url, config=config),
-                            timeout=30
-                        )
+                        # Render once; the config waits for the content selector,
+                        # so links and content both come from this single result
+                        with self.timer.stage("render"):
+                            result = await crawler.arun(url=url, config=config,
+                                                        resource_policy=source["resource_policy"],
+                                                        timeout=30)
                         
                         if not result or not result.success:
                             print(f"Failed to load page {url}")
@@ -159,65 +149,40 @@ class PulumiNativeCrawler(BaseDocCrawler):
                         print(f"Result error message: {result.error_message}")
                         print(f"Result HTML length: {len(result.html) if result.html else 0}")
                         
-                        # Parse the HTML
-                        soup = BeautifulSoup(result.html, 'html.parser')
+                        # Take links and Markdown straight from crawl4ai's result
+                        with self.timer.stage("parse"):
+                            page = adapt_result(result, url, config)
+                            if page is None:
+                                raise Exception("Nothing extracted")
                         
-                        # Extract links based on page type
-                        links = []
-                        if is_index:
-                            # For index pages, look for module links
-                            for link in soup.find_all('a'):
-                                href = link.get('href', '')
-                                text = link.get_text().strip()
-                                
-                                # Normalize URL
-                                normalized_href = self._normalize_url(url, href)
+                        with self.timer.stage("extract"):
+                            # Keep the module links of the index, or the resource and
+                            # function links of a content page, that are in scope
+                            links = []
+                            for link in page.links.get('internal', []):
+                                normalized_href = self._normalize_url(url, link['href'])
                                 if normalized_href:
                                     links.append({
                                         'href': normalized_href,
-                                        'text': text
+                                        'text': link['text']
                                     })
-                        else:
-                            # For content pages, look for resource and function links
-                            for link in soup.find_all('a'):
-                                href = link.get('href', '')
-                                text = link.get_text().strip()
-                                
-                                # Normalize URL
-                                normalized_href = self._normalize_url(url, href)
-                                if normalized_href:
-                                    links.append({
-                                        'href': normalized_href,
-                                        'text': text
-                                    })
-                        
-                        print(f"Found {len(links)} {'module' if is_index else 'resource'} links")
-                        
-                        # Get article content
-                        article = soup.find('article') or soup.find('main')
-                        if article:
-                            # Clean up content
-                            for el in article.select('.headerlink, .highlight-default'):
-                                el.decompose()
-                            
-                            # Extract content
-                            content = article.get_text(strip=True)
                             
-                            # Create data structure
-                            data = {
-                                'content': content,
-                                'links': links
-                            }
+                            print(f"Found {len(links)} {'module' if is_index else 'resource'} links")
                             
+                            # Get the article's Markdown, already without header links and
+                            # highlights, less the blocks every page repeats
+                            content = self.boilerplate.strip_markdown(source_key, page.content)
+                        
+                        if content:
                             # Get resource name
                             resource_name = self._get_resource_name(url)
                             print(f"Saving content for {resource_name}")
                             
                             # Save the content as markdown
-                            if data.get('content'):
+                            with self.timer.stage("save"):
                                 markdown_content = f"# {resource_name}\n\n"
                                 markdown_content += f"URL: {url}\n\n"
-                                markdown_content += data['content']
+                                markdown_content += content
                                 
                                 # Save markdown file
                                 self.save_markdown(source_key, resource_name, markdown_content)
@@ -226,18 +191,21 @@ class PulumiNativeCrawler(BaseDocCrawler):
                                 doc_structure = {
                                     "url": url,
                                     "resource": resource_name,
-                                    "content": data['content'],
-                                    "navigation": data.get('links', []),
+                                    "content": content,
+                                    "navigation": links,
                                     "timestamp": datetime.now().isoformat()
                                 }
                                 self.save_json(source_key, resource_name, doc_structure)
-                                print(f"Saved content for {resource_name}")
+                            print(f"Saved content for {resource_name}")
                         
                         # Process navigation links for recursive crawling
                         for link in links:
                             href = link['href']
                             if href and not href.startswith('#'):
                                 await self.process_page(source_key, crawler, href)
+                        
+                        # Processed successfully, no further attempts needed
+                        break
                     
                     except asyncio.TimeoutError:
                         print(f"Timeout gathering URLs from {url}")
@@ -285,31 +253,26 @@ class PulumiNativeCrawler(BaseDocCrawler):
             json.dump(data, f, indent=2, ensure_ascii=False)
         print(f"Saved JSON to {filepath}")
     
-    async def crawl(self, source_key: str = "pulumi_aws"):  
-        """Crawl the documentation."""
+    async def crawl(self, source_key: str = "pulumi_aws", pool: Optional[BrowserPool] = None):
+        """Crawl the documentation.
+
+        Args:
+            source_key: Key of the source to crawl
+            pool: Shared browser pool; a private one is opened if omitted
+        """
         browser_config = BrowserConfig(
             headless=True,
             ignore_https_errors=True
         )
         
-        retries = 3  # Number of retries for browser initialization
-        for attempt in range(retries):
-            try:
-                async with AsyncWebCrawler(
-                    browser_config=browser_config,
-                    max_concurrent_pages=1  # Limit concurrent pages to avoid overload
-                ) as crawler:
-                    # Configure longer timeout in the run config instead
-                    config = self.sources[source_key]["index_config"]
-                    config.timeout = 60000  # 60 seconds timeout
-                    await self.process_page(source_key, crawler)
-                break  # If successful, break the retry loop
-            except Exception as e:
-                print(f"Attempt {attempt + 1}/{retries} failed: {str(e)}")
-                if attempt == retries - 1:  # Last attempt
-                    print("All retry attempts failed")
-                    raise
-                await asyncio.sleep(5)  # Wait before retrying
+        # Launch retries, hung-page cleanup and browser recycling are handled by the pool
+        async with borrow_pool(pool, browser_config=browser_config, pool_size=1) as crawler:
+            # Configure longer timeout in the run config instead
+            config = self.sources[source_key]["index_config"]
+            config.timeout = 60000  # 60 seconds timeout
+            await self.process_page(source_key, crawler)
+        
+        self.timer.report()
 
 if __name__ == "__main__":
     crawler = PulumiNativeCrawler("output")
@@ -6,7 +6,7 @@ import asyncio
 import aiohttp
 from typing import Dict, List, Any, Optional
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from base import BaseDocCrawler, RegistryConfig
 
 class PulumiCrawler(BaseDocCrawler):
@@ -67,7 +67,7 @@ class PulumiCrawler(BaseDocCrawler):
                     return None
                 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = make_soup(html)
                 
                 # Extract resources
                 resources = []
@@ -0,0 +1,98 @@
+"""Page readiness signals and time-to-ready instrumentation.
+
+Instead of guessing with fixed sleeps or ``wait_until="networkidle"``, each
+source declares what "ready" means for its pages. A ``ReadinessSpec`` compiles
+to a crawl4ai ``wait_for="js:..."`` condition that is polled right after
+``domcontentloaded`` and lets capture start the moment content is ready.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Attribute the readiness condition stamps on <html> when it first passes
+READY_ATTRIBUTE = "data-c4a-ready-ms"
+_READY_RE = re.compile(READY_ATTRIBUTE + r'="(\d+)"')
+
+
+@dataclass
+class ReadinessSpec:
+    """What a page must show before its HTML is captured.
+
+    All configured signals must hold at the same time.
+
+    Attributes:
+        selector: CSS selector that must match an element
+        quiet_ms: Milliseconds without DOM mutations, for client-rendered pages
+        xhr: Substring of an XHR/fetch URL whose response must have completed
+    """
+    selector: Optional[str] = None
+    quiet_ms: int = 0
+    xhr: Optional[str] = None
+
+    def _conditions(self) -> List[str]:
+        conditions = []
+        if self.selector:
+            conditions.append(f"!!document.querySelector({json.dumps(self.selector)})")
+        if self.quiet_ms:
+            conditions.append(f"performance.now() - state.lastMutation >= {int(self.quiet_ms)}")
+        if self.xhr:
+            conditions.append(
+                "performance.getEntriesByType('resource').some(e => "
+                "(e.initiatorType === 'xmlhttprequest' || e.initiatorType === 'fetch') && "
+                f"e.name.includes({json.dumps(self.xhr)}) && e.responseEnd > 0)"
+            )
+        return conditions or ["document.readyState !== 'loading'"]
+
+    def wait_for(self) -> str:
+        """Build the crawl4ai ``wait_for`` condition for this spec."""
+        return "js:" + self.predicate()
+
+    def predicate(self) -> str:
+        """Build the JavaScript function that returns true once the page is ready."""
+        return f"""() => {{
+    const state = window.__c4aReadiness || (window.__c4aReadiness = (() => {{
+        const s = {{ lastMutation: performance.now() }};
+        new MutationObserver(() => {{ s.lastMutation = performance.now(); }})
+            .observe(document, {{ subtree: true, childList: true, attributes: true, characterData: true }});
+        return s;
+    }})());
+    const ready = {' && '.join(self._conditions())};
+    if (ready) {{
+        document.documentElement.setAttribute('{READY_ATTRIBUTE}', Math.round(performance.now()));
+    }}
+    return ready;
+}}"""
+
+
+def time_to_ready(html: Optional[str]) -> Optional[int]:
+    """Read the time-to-ready stamp (ms since navigation start) from captured HTML."""
+    if not html:
+        return None
+    # The stamp sits on the <html> tag, so only the start of the document is searched
+    match = _READY_RE.search(html, 0, 4096)
+    return int(match.group(1)) if match else None
+
+
+class ReadinessRecorder:
+    """Collect time-to-ready per page, grouped by source."""
+
+    def __init__(self):
+        self.pages: Dict[str, List[Dict[str, Any]]] = {}
+
+    def record(self, source: str, url: str, result: Any) -> Optional[int]:
+        """Record a rendered page's time-to-ready if its readiness stamp is present."""
+        ready_ms = time_to_ready(getattr(result, 'html', None))
+        if ready_ms is not None:
+            self.pages.setdefault(source, []).append({"url": url, "ready_ms": ready_ms})
+        return ready_ms
+
+    def report(self) -> None:
+        """Print time-to-ready percentiles for each source."""
+        for source, pages in self.pages.items():
+            times = sorted(page["ready_ms"] for page in pages)
+            p50 = times[len(times) // 2]
+            p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+            print(f"Time to ready for {source}: {len(times)} pages, "
+                  f"p50 {p50} ms, p95 {p95} ms, max {times[-1]} ms")
@@ -0,0 +1,138 @@
+"""Per-source request interception rules applied while pages render."""
+
+import fnmatch
+import re
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Pattern, Set
+
+from asset_cache import AssetCache
+
+# Third-party analytics, tag managers and session recorders seen on the doc sites
+ANALYTICS_PATTERNS = [
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*doubleclick.net/*",
+    "*googlesyndication.com/*",
+    "*segment.com/*",
+    "*segment.io/*",
+    "*hotjar.com/*",
+    "*fullstory.com/*",
+    "*heapanalytics.com/*",
+    "*mixpanel.com/*",
+    "*nr-data.net/*",
+    "*clarity.ms/*",
+    "*connect.facebook.net/*",
+    "*px.ads.linkedin.com/*",
+    "*amazon-adsystem.com/*",
+]
+
+
+def _compile(patterns: List[str]) -> Optional[Pattern]:
+    """Compile glob-style URL patterns into a single regex."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+@dataclass
+class ResourcePolicy:
+    """Which requests a page may make while it renders.
+
+    Rules are checked in order: ``allow_urls``, ``deny_urls``, ``allow_types``,
+    ``deny_types``. The first match decides; anything unmatched is allowed.
+    Resource types are Playwright's (document, stylesheet, image, media, font,
+    script, xhr, fetch, ...) and URL patterns are globs such as
+    ``*googletagmanager.com/*``.
+    """
+    name: str = "default"
+    deny_types: Set[str] = field(default_factory=lambda: {"image", "font", "media"})
+    allow_types: Set[str] = field(default_factory=set)
+    deny_urls: List[str] = field(default_factory=lambda: list(ANALYTICS_PATTERNS))
+    allow_urls: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._allow_re = _compile(self.allow_urls)
+        self._deny_re = _compile(self.deny_urls)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """Check whether a request should be aborted."""
+        if self._allow_re and self._allow_re.match(url):
+            return False
+        if self._deny_re and self._deny_re.match(url):
+            return True
+        if resource_type in self.allow_types:
+            return False
+        return resource_type in self.deny_types
+
+
+@dataclass
+class ResourceStats:
+    """Allowed and blocked request counts for one policy."""
+    allowed_requests: int = 0
+    allowed_bytes: int = 0
+    blocked_requests: int = 0
+    blocked_by_type: Dict[str, int] = field(default_factory=dict)
+
+
+class ResourceBlocker:
+    """Install request interception on browser pages and keep statistics.
+
+    Each page gets a single route handler the first time it is seen. The
+    handler looks up the page's current policy, so pages reused across
+    navigations pick up whichever policy the latest render asked for.
+    Requests that aren't blocked are answered from the ``AssetCache`` when
+    one is given and the request is for a static asset.
+    """
+
+    def __init__(self, asset_cache: Optional[AssetCache] = None):
+        self.stats: Dict[str, ResourceStats] = {}
+        self.asset_cache = asset_cache
+        self._page_policies = weakref.WeakKeyDictionary()
+
+    def _stats_for(self, policy: ResourcePolicy) -> ResourceStats:
+        return self.stats.setdefault(policy.name, ResourceStats())
+
+    async def attach(self, page, policy: Optional[ResourcePolicy]) -> None:
+        """Apply a policy to a page before it navigates."""
+        first_use = page not in self._page_policies
+        self._page_policies[page] = policy
+        if not first_use:
+            return
+
+        async def handle_route(route, request):
+            current = self._page_policies.get(page)
+            if current and current.should_block(request.resource_type, request.url):
+                stats = self._stats_for(current)
+                stats.blocked_requests += 1
+                stats.blocked_by_type[request.resource_type] = \
+                    stats.blocked_by_type.get(request.resource_type, 0) + 1
+                await route.abort()
+            elif self.asset_cache and self.asset_cache.cacheable(request):
+                await self.asset_cache.handle(route, request)
+            else:
+                await route.continue_()
+
+        async def on_request_finished(request):
+            current = self._page_policies.get(page)
+            if not current:
+                return
+            stats = self._stats_for(current)
+            stats.allowed_requests += 1
+            try:
+                sizes = await request.sizes()
+                stats.allowed_bytes += sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+            except Exception:
+                pass
+
+        await page.route("**/*", handle_route)
+        page.on("requestfinished", on_request_finished)
+
+    def report(self) -> None:
+        """Print blocked versus allowed traffic for each policy."""
+        for name, stats in self.stats.items():
+            blocked = ", ".join(f"{t}: {n}" for t, n in sorted(stats.blocked_by_type.items()))
+            print(f"Resource stats for {name}: {stats.allowed_requests} requests allowed "
+                  f"({stats.allowed_bytes / 1024:.0f} KiB downloaded), "
+                  f"{stats.blocked_requests} blocked and never downloaded"
+                  f"{f' ({blocked})' if blocked else ''}")
@@ -0,0 +1,182 @@
+"""Read a page's Markdown, links and title straight from a crawl4ai result.
+
+crawl4ai already turns every rendered page into Markdown and a list of
+internal and external links. ``adapt_result`` takes those from the result
+instead of building a BeautifulSoup tree from ``result.html`` again.
+
+A source whose config uses ``markdown_generator()`` also gets crawl4ai's
+``fit_markdown``: the Markdown after ``PruningContentFilter`` has dropped
+low-density blocks such as menus and footers. ``CrawledPage.content`` prefers
+it when present.
+
+Results that never went through crawl4ai (see ``hybrid_fetch.StaticResult``)
+have no Markdown or links. Given the ``CrawlerRunConfig`` the page would have
+been rendered with, ``adapt_result`` applies its ``css_selector``,
+``excluded_tags`` and ``excluded_selector`` to the parsed page, converts what
+is left with ``markdown_convert`` and collects its links, as crawl4ai would.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from crawl4ai.content_filter_strategy import PruningContentFilter
+from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+
+from bs4 import BeautifulSoup, Tag
+
+from html_parser import result_soup
+from markdown_convert import tree_to_markdown
+
+# Default PruningContentFilter score below which a block is dropped
+FIT_THRESHOLD = 0.48
+
+
+def markdown_generator(threshold: float = FIT_THRESHOLD) -> DefaultMarkdownGenerator:
+    """Build a Markdown generator that also produces filtered ``fit_markdown``.
+
+    Args:
+        threshold: Pruning score below which a block is left out of fit_markdown
+    """
+    return DefaultMarkdownGenerator(
+        content_filter=PruningContentFilter(threshold=threshold, threshold_type="fixed"),
+        options={"body_width": 0}  # Don't wrap lines
+    )
+
+
+def read_markdown(result: Any) -> Tuple[str, str]:
+    """Get the raw and filtered Markdown of a crawl result.
+
+    crawl4ai 0.4 keeps the generation result in ``markdown_v2`` and the raw
+    Markdown string in ``markdown``; later versions return the generation
+    result from ``markdown`` itself.
+
+    Returns:
+        Tuple[str, str]: Raw Markdown, and fit Markdown or "" if no content filter ran
+    """
+    for name in ('markdown_v2', 'markdown'):
+        try:
+            value = getattr(result, name, None)
+        except Exception:
+            # Versions that dropped markdown_v2 raise on access
+            value = None
+        if value is not None and hasattr(value, 'raw_markdown'):
+            return value.raw_markdown or "", value.fit_markdown or ""
+    markdown = getattr(result, 'markdown', None) or ""
+    return str(markdown), getattr(result, 'fit_markdown', None) or ""
+
+
+@dataclass
+class CrawledPage:
+    """What the browser crawlers keep from a crawl result."""
+    url: str
+    title: str = ""
+    markdown: str = ""
+    fit_markdown: str = ""
+    links: Dict[str, List[Dict[str, str]]] = field(default_factory=dict)
+
+    @property
+    def content(self) -> str:
+        """The filtered Markdown if a content filter ran, otherwise the raw Markdown."""
+        return (self.fit_markdown or self.markdown).strip()
+
+    def internal_links(self, domain: Optional[str] = None, prefix: Optional[str] = None,
+                       skip_text: Iterable[str] = ('next', 'previous')) -> List[Dict[str, str]]:
+        """Internal links with text, without fragments and duplicates.
+
+        Args:
+            domain: Only keep links to this host
+            prefix: Only keep links starting with this URL
+            skip_text: Link texts, lowercased, to leave out
+
+        Returns:
+            List[Dict[str, str]]: Links as {'href', 'text'}, in page order
+        """
+        skip = set(skip_text)
+        seen = set()
+        links = []
+        for link in self.links.get('internal', []):
+            text = (link.get('text') or '').strip()
+            href = urljoin(self.url, link.get('href') or '').split('#')[0].rstrip('/')
+            if not href or not text or text.lower() in skip or href in seen:
+                continue
+            if domain and urlparse(href).netloc != domain:
+                continue
+            if prefix and not href.startswith(prefix):
+                continue
+            seen.add(href)
+            links.append({'href': href, 'text': text})
+        return links
+
+
+def select_content(soup: BeautifulSoup, config: Any = None) -> Optional[Tag]:
+    """Narrow a parsed page the way crawl4ai would for a run configuration.
+
+    Args:
+        soup: Parsed page, cleaned in place
+        config: CrawlerRunConfig the page would have been rendered with
+
+    Returns:
+        Optional[Tag]: The element matching ``css_selector`` (the whole page
+        without one), or None if the selector matches nothing
+    """
+    selector = getattr(config, 'css_selector', None)
+    root = soup.select_one(selector) if selector else soup
+    if root is None:
+        return None
+    excluded = list(getattr(config, 'excluded_tags', None) or [])
+    if getattr(config, 'excluded_selector', None):
+        excluded.append(config.excluded_selector)
+    if excluded:
+        for element in root.select(", ".join(excluded)):
+            element.decompose()
+    return root
+
+
+def collect_links(root: Tag, url: str) -> Dict[str, List[Dict[str, str]]]:
+    """Collect an element's links as crawl4ai does, split by whether they stay on the page's host."""
+    host = urlparse(url).netloc
+    links = {'internal': [], 'external': []}
+    for a in root.find_all('a', href=True):
+        href = urljoin(url, a['href'])
+        if not href.startswith(('http://', 'https://')):
+            continue
+        kind = 'internal' if urlparse(href).netloc == host else 'external'
+        links[kind].append({'href': href, 'text': a.get_text().strip()})
+    return links
+
+
+def adapt_result(result: Any, url: Optional[str] = None, config: Any = None) -> Optional[CrawledPage]:
+    """Build a CrawledPage from a crawl4ai, shard or static result.
+
+    Args:
+        result: Successful crawl result
+        url: Page URL, if the result does not carry one
+        config: CrawlerRunConfig the page was requested with, applied to static results
+
+    Returns:
+        Optional[CrawledPage]: The page, or None if the result failed
+    """
+    if not result or not getattr(result, 'success', False):
+        return None
+    url = getattr(result, 'url', None) or url or ""
+    markdown, fit_markdown = read_markdown(result)
+    metadata = getattr(result, 'metadata', None) or {}
+    title = metadata.get('title') or ""
+    links = getattr(result, 'links', None) or {}
+    if not markdown and getattr(result, 'html', None):
+        # Not rendered by crawl4ai, so there is no Markdown or link list to reuse
+        soup = result_soup(result)
+        if not title and soup.title:
+            title = soup.title.get_text().strip()
+        root = select_content(soup, config)
+        if root is not None:
+            markdown = tree_to_markdown(root)
+            links = links or collect_links(root, url)
+    return CrawledPage(
+        url=url,
+        title=title,
+        markdown=markdown,
+        fit_markdown=fit_markdown,
+        links=links
+    )
@@ -0,0 +1,90 @@
+"""Single-pass splitting of a parsed page into heading-delimited sections.
+
+``split_sections`` walks the document once, in document order, and assigns
+each paragraph, code block and table to the section of the heading before it.
+Extractors then read the sections instead of searching forward from each
+heading, which costs a scan of the rest of the page per heading.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from bs4 import Tag
+
+
+@dataclass
+class Section:
+    """Content between one heading and the next.
+
+    Attributes:
+        heading: The heading element, or None for content before the first heading
+        paragraphs: Every ``<p>`` in the section, in document order
+        intro: The paragraphs before the section's first ``<pre>``
+        code: Every ``<pre>`` and ``<code>``, in document order (a ``<code>``
+            inside a ``<pre>`` appears after it)
+        tables: Every ``<table>`` in the section
+    """
+    heading: Optional[Tag] = None
+    paragraphs: List[Tag] = field(default_factory=list)
+    intro: List[Tag] = field(default_factory=list)
+    code: List[Tag] = field(default_factory=list)
+    tables: List[Tag] = field(default_factory=list)
+
+    @property
+    def title(self) -> str:
+        return self.heading.text.strip() if self.heading is not None else ""
+
+    @property
+    def level(self) -> int:
+        return int(self.heading.name[1]) if self.heading is not None else 0
+
+    def parameters(self) -> List[Dict[str, str]]:
+        """Read the section's tables as rows keyed by their header cells."""
+        rows = []
+        for table in self.tables:
+            headers = None
+            for tr in table.find_all('tr'):
+                header_cells = tr.find_all('th', recursive=False)
+                if header_cells and headers is None:
+                    headers = [th.text.strip() for th in header_cells]
+                    continue
+                cells = tr.find_all('td', recursive=False)
+                if headers and cells:
+                    rows.append(dict(zip(headers, (td.text.strip() for td in cells))))
+        return rows
+
+
+def split_sections(root: Tag, levels: Sequence[str] = ("h2", "h3")) -> List[Section]:
+    """Split a tree into sections at headings of the given levels.
+
+    Headings of other levels stay inside the section they appear in. The
+    first section holds everything before the first heading and has no
+    heading.
+
+    Args:
+        root: Parsed document or element to split
+        levels: Heading tags that start a new section
+    """
+    current = Section()
+    sections = [current]
+    in_intro = True
+    for node in root.descendants:
+        if not isinstance(node, Tag):
+            continue
+        name = node.name
+        if name in levels:
+            current = Section(heading=node)
+            sections.append(current)
+            in_intro = True
+        elif name == 'p':
+            current.paragraphs.append(node)
+            if in_intro:
+                current.intro.append(node)
+        elif name == 'pre':
+            current.code.append(node)
+            in_intro = False
+        elif name == 'code':
+            current.code.append(node)
+        elif name == 'table':
+            current.tables.append(node)
+    return sections
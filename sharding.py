@@ -0,0 +1,238 @@
+"""Multi-process browser sharding for render-heavy crawls."""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crawl4ai import BrowserConfig, CrawlerRunConfig
+
+from asset_cache import AssetCache
+from browser_pool import BrowserPool
+from resource_policy import ResourcePolicy
+from result_adapter import read_markdown
+
+
+@dataclass
+class ShardResult:
+    """Picklable copy of the crawl4ai result fields the crawlers read."""
+    url: str
+    html: str = ""
+    cleaned_html: str = ""
+    markdown: str = ""
+    fit_markdown: str = ""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    links: Dict[str, List[Dict[str, str]]] = field(default_factory=dict)
+    success: bool = False
+    status_code: Optional[int] = None
+    error_message: str = ""
+    shard: int = -1
+
+    @classmethod
+    def from_result(cls, url: str, result: Any, shard: int) -> "ShardResult":
+        """Copy a crawl4ai result into a form that can cross a process boundary."""
+        markdown, fit_markdown = read_markdown(result)
+        return cls(
+            url=getattr(result, 'url', None) or url,
+            html=getattr(result, 'html', None) or "",
+            cleaned_html=getattr(result, 'cleaned_html', None) or "",
+            markdown=markdown,
+            fit_markdown=fit_markdown,
+            metadata=dict(getattr(result, 'metadata', None) or {}),
+            links=getattr(result, 'links', None) or {},
+            success=bool(getattr(result, 'success', False)),
+            status_code=getattr(result, 'status_code', None),
+            error_message=getattr(result, 'error_message', None) or "",
+            shard=shard
+        )
+
+
+def _shard_main(shard_id: int, jobs, results, browser_config: Optional[BrowserConfig], pool_size: int,
+                profile_dir: Optional[Path], asset_cache: Optional[AssetCache]) -> None:
+    """Entry point of a shard process: one event loop and one browser."""
+    try:
+        asyncio.run(_run_shard(shard_id, jobs, results, browser_config, pool_size, profile_dir, asset_cache))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _run_shard(shard_id: int, jobs, results, browser_config: Optional[BrowserConfig], pool_size: int,
+                     profile_dir: Optional[Path], asset_cache: Optional[AssetCache]) -> None:
+    """Render jobs from the shared queue until a stop sentinel arrives."""
+    loop = asyncio.get_running_loop()
+
+    # Each shard needs its own Chromium; sharing the daemon's would undo the split.
+    # Chromium locks its profile, so every shard keeps a profile of its own.
+    shard_profile = profile_dir.with_name(f"{profile_dir.name}-shard-{shard_id}") if profile_dir else None
+    async with BrowserPool(browser_config=browser_config, pool_size=pool_size, use_daemon=False,
+                           profile_dir=shard_profile, asset_cache=asset_cache) as pool:
+        async def consume():
+            while True:
+                job = await loop.run_in_executor(None, jobs.get)
+                if job is None:
+                    return
+                job_id, url, config, policy, source, kwargs = pickle.loads(job)
+                try:
+                    result = await pool.arun(url=url, config=config, resource_policy=policy,
+                                             source=source, **kwargs)
+                    payload = ShardResult.from_result(url, result, shard_id)
+                except Exception as e:
+                    payload = ShardResult(url=url, error_message=str(e), shard=shard_id)
+                results.put((job_id, payload))
+
+        await asyncio.gather(*(consume() for _ in range(pool_size)))
+
+
+class ShardedRenderer:
+    """Spread page renders over several browser processes.
+
+    Each shard is a separate process with its own event loop and
+    ``BrowserPool``, so crawl4ai's HTML cleaning and markdown generation run
+    on as many cores as there are shards. Renders are fed from one central
+    queue and results stream back as each page finishes. Like ``BrowserPool``
+    it exposes ``arun(url=..., config=...)`` and can be passed as the ``pool``
+    of any crawler; results are ``ShardResult`` copies of the crawl4ai result.
+
+    With a ``profile_dir`` each shard runs Chromium on its own profile next
+    to it (``<profile>-shard-N``), and an ``asset_cache`` store is shared by
+    all shards.
+    Each shard prints its own asset cache stats when it closes.
+    """
+
+    def __init__(self, num_shards: Optional[int] = None, browser_config: Optional[BrowserConfig] = None,
+                 pool_size: int = 2, profile_dir: Optional[Path] = None,
+                 asset_cache: Optional[AssetCache] = None):
+        """Initialize the renderer.
+
+        Args:
+            num_shards: Number of browser processes; defaults to the CPU count
+            browser_config: Browser settings used by every shard
+            pool_size: Maximum pages rendering concurrently within each shard
+            profile_dir: Persistent Chromium profile the shard profiles are named after
+            asset_cache: Store answering static asset requests in every shard
+        """
+        self.num_shards = num_shards or os.cpu_count() or 1
+        self.browser_config = browser_config
+        self.pool_size = pool_size
+        self.profile_dir = profile_dir
+        self.asset_cache = asset_cache
+        self._processes: List[multiprocessing.Process] = []
+        self._jobs = None
+        self._results = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._start_lock = asyncio.Lock()
+
+        # Run statistics
+        self.pages_rendered = 0
+        self.pages_by_shard: Dict[int, int] = {}
+
+    async def start(self) -> "ShardedRenderer":
+        """Launch the shard processes if they are not running yet."""
+        async with self._start_lock:
+            if self._processes:
+                return self
+            # Playwright is not fork-safe, so shards always start from a fresh interpreter
+            ctx = multiprocessing.get_context("spawn")
+            self._jobs = ctx.Queue()
+            self._results = ctx.Queue()
+            for shard_id in range(self.num_shards):
+                process = ctx.Process(
+                    target=_shard_main,
+                    args=(shard_id, self._jobs, self._results, self.browser_config, self.pool_size,
+                          self.profile_dir, self.asset_cache),
+                    daemon=True
+                )
+                process.start()
+                self._processes.append(process)
+            self._reader = asyncio.create_task(self._read_results())
+            print(f"Started {self.num_shards} browser shards ({self.pool_size} pages each)")
+        return self
+
+    async def close(self) -> None:
+        """Stop the shards once their queued renders have finished."""
+        async with self._start_lock:
+            if not self._processes:
+                return
+            for _ in range(self.num_shards * self.pool_size):
+                self._jobs.put(None)
+            loop = asyncio.get_running_loop()
+            for process in self._processes:
+                await loop.run_in_executor(None, process.join, 60)
+                if process.is_alive():
+                    process.terminate()
+            self._processes = []
+            if self._reader:
+                await self._reader
+                self._reader = None
+            self._fail_pending("Browser shards were closed before the render finished")
+            print(f"Browser shards closed - {self.stats()}")
+
+    async def __aenter__(self) -> "ShardedRenderer":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def _fail_pending(self, message: str) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(message))
+        self._pending.clear()
+
+    async def _read_results(self) -> None:
+        """Resolve render futures as results arrive from any shard."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                job_id, payload = await loop.run_in_executor(None, self._results.get, True, 1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self._processes):
+                    self._fail_pending("All browser shards exited")
+                    return
+                continue
+            self.pages_rendered += 1
+            self.pages_by_shard[payload.shard] = self.pages_by_shard.get(payload.shard, 0) + 1
+            future = self._pending.pop(job_id, None)
+            # The caller may have given up on the render (e.g. asyncio.wait_for timeout)
+            if future and not future.done():
+                future.set_result(payload)
+
+    async def arun(self, url: str, config: Optional[CrawlerRunConfig] = None,
+                   resource_policy: Optional[ResourcePolicy] = None,
+                   source: Optional[str] = None, **kwargs) -> ShardResult:
+        """Queue a page for rendering on the next free shard and wait for it.
+
+        Args:
+            url: Page to render
+            config: crawl4ai run configuration; must be picklable
+            resource_policy: Request blocking for this render
+            source: Name time-to-ready is recorded under in the shard
+        """
+        await self.start()
+        # Pickle here so an unpicklable config fails in the caller instead of
+        # in the queue's feeder thread, where the render would hang forever
+        job_id = next(self._ids)
+        job = pickle.dumps((job_id, url, config, resource_policy, source, kwargs))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[job_id] = future
+        self._jobs.put(job)
+        try:
+            return await future
+        finally:
+            self._pending.pop(job_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get shard statistics for the current run."""
+        return {
+            "shards": self.num_shards,
+            "pool_size": self.pool_size,
+            "pages_rendered": self.pages_rendered,
+            "pages_by_shard": dict(sorted(self.pages_by_shard.items()))
+        }
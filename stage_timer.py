@@ -0,0 +1,49 @@
+"""Per-stage wall-clock timing for crawler runs."""
+
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class StageTimer:
+    """Accumulate time spent in each named stage of page processing.
+
+    Usage::
+
+        timer = StageTimer("cloudformation")
+        with timer.stage("render"):
+            result = await crawler.arun(url=url, config=config)
+        ...
+        timer.report()
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Time one pass through a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Record time measured elsewhere against a stage."""
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def report(self) -> None:
+        """Print total, count and mean time for each stage."""
+        if not self.totals:
+            return
+        grand_total = sum(self.totals.values())
+        print(f"\nStage timings for {self.name} ({grand_total:.1f}s total):")
+        for stage, total in self.totals.items():
+            count = self.counts[stage]
+            share = total / grand_total if grand_total else 0.0
+            print(f"  {stage:<12} {total:8.2f}s  {count:5d} calls  "
+                  f"{total / count * 1000:8.1f} ms/call  {share:5.0%}")
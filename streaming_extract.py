@@ -0,0 +1,210 @@
+"""Event-driven extraction for pages too large to hold as a tree.
+
+``StreamingExtractor`` is an lxml parser target. libxml2 tokenizes the page
+and calls ``start``, ``data`` and ``end`` for each tag and run of text, and
+no tree is ever built. Text is buffered only for the elements currently open
+that an extractor reads (headings, paragraphs, code blocks, table cells and
+links), so memory follows the largest of those rather than the page.
+
+Sections, code blocks and links are emitted as they close, with the same
+content ``split_sections`` and ``APIDocCrawler``'s extractors read from a full
+tree. The ``<main>`` element's events are passed straight to an html2text
+instance, which builds the overview Markdown as the page streams past.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+from html2text import HTML2Text
+from lxml import etree
+
+CHUNK_SIZE = 64 * 1024
+
+# Elements whose content is dropped, as ``parse_document`` does
+_SKIP_TAGS = {"script", "style"}
+
+StreamEvent = Tuple[str, Any]
+
+
+@dataclass
+class StreamedSection:
+    """A section read from the event stream (see ``sections.Section``).
+
+    Attributes:
+        title: Heading text, or "" for content before the first heading
+        level: Heading level, or 0 for content before the first heading
+        intro: Text of the paragraphs before the section's first ``<pre>``
+        parameters: The section's table rows, keyed by their header cells
+    """
+    title: str = ""
+    level: int = 0
+    intro: List[str] = field(default_factory=list)
+    parameters: List[Dict[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class _Frame:
+    tag: str
+    parts: Optional[List[str]] = None
+    info: Any = None
+
+
+def iter_chunks(text: str, size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Slice text into chunks for ``StreamingExtractor.feed``."""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+class StreamingExtractor:
+    """Extract sections, code blocks and links from HTML fed in chunks."""
+
+    def __init__(self, levels: Sequence[str] = ("h2", "h3"), base_url: str = "",
+                 markdown: Optional[HTML2Text] = None):
+        """Initialize the extractor.
+
+        Args:
+            levels: Heading tags that start a new section
+            base_url: URL that link targets are resolved against
+            markdown: html2text instance to convert ``<main>`` into the overview
+        """
+        self.levels = set(levels)
+        self.base_url = base_url
+        self.markdown = markdown
+        self._parser = etree.HTMLParser(target=self, remove_comments=True)
+        self._events: List[StreamEvent] = []
+        self._frames: List[_Frame] = []
+        self._skip = 0
+        self._section = StreamedSection()
+        self._in_intro = True
+        self._code: List[Optional[Dict[str, str]]] = []
+        self._code_open = 0
+        self._main_depth = 0
+        self._main_seen = False
+
+    # Feeding
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        """Parse the next chunk of the page and return the events it completed."""
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def finish(self) -> List[StreamEvent]:
+        """Finish the page and return the remaining events, ending with the last section."""
+        self._parser.close()
+        return self._drain()
+
+    def extract(self, chunks: Iterable[str]) -> Iterator[StreamEvent]:
+        """Feed every chunk and yield ``("section" | "code" | "link", item)`` events as they complete."""
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.finish()
+
+    def overview(self) -> str:
+        """Get the Markdown for ``<main>`` once the page has been fed."""
+        if self.markdown is None or not self._main_seen:
+            return ""
+        return self.markdown.optwrap(self.markdown.finish()).strip()
+
+    def _drain(self) -> List[StreamEvent]:
+        events, self._events = self._events, []
+        return events
+
+    # lxml parser target interface
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+            return
+        if self._skip:
+            return
+        if self.markdown is not None and (self._main_depth or (tag == "main" and not self._main_seen)):
+            self._main_depth += tag == "main"
+            self.markdown.handle_starttag(tag, list(attrib.items()))
+
+        if tag in self.levels:
+            self._events.append(("section", self._section))
+            self._section = StreamedSection(level=int(tag[1]))
+            self._in_intro = True
+            self._frames.append(_Frame(tag, []))
+        elif tag == "p":
+            self._frames.append(_Frame(tag, [], self._in_intro))
+        elif tag in ("pre", "code"):
+            if tag == "pre":
+                self._in_intro = False
+            classes = attrib.get("class", "").split()
+            # Reserve the slot now so a <pre> is emitted before the <code> inside it
+            self._code.append(None)
+            self._code_open += 1
+            self._frames.append(_Frame(tag, [], (len(self._code) - 1, classes[0] if classes else "")))
+        elif tag == "table":
+            self._frames.append(_Frame(tag, info={"headers": None, "rows": []}))
+        elif tag == "tr":
+            self._frames.append(_Frame(tag, info={"th": [], "td": []}))
+        elif tag in ("th", "td"):
+            self._frames.append(_Frame(tag, []))
+        elif tag == "a" and attrib.get("href"):
+            self._frames.append(_Frame(tag, [], attrib["href"]))
+
+    def data(self, data: str) -> None:
+        if self._skip:
+            return
+        if self._main_depth:
+            self.markdown.handle_data(data)
+        for frame in self._frames:
+            if frame.parts is not None:
+                frame.parts.append(data)
+
+    def end(self, tag: str) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip -= 1
+            return
+        if self._skip:
+            return
+        if self._main_depth:
+            self.markdown.handle_endtag(tag)
+            if tag == "main":
+                self._main_depth -= 1
+                self._main_seen = not self._main_depth
+        if not self._frames or self._frames[-1].tag != tag:
+            return
+
+        frame = self._frames.pop()
+        text = "".join(frame.parts).strip() if frame.parts is not None else ""
+        if tag in self.levels:
+            self._section.title = text
+        elif tag == "p":
+            if frame.info:
+                self._section.intro.append(text)
+        elif tag in ("pre", "code"):
+            index, language = frame.info
+            self._code[index] = {"code": text, "language": language}
+            self._code_open -= 1
+            if not self._code_open:
+                self._events.extend(("code", block) for block in self._code if block["code"])
+                self._code = []
+        elif tag in ("th", "td"):
+            row = self._enclosing("tr")
+            if row is not None:
+                row.info[tag].append(text)
+        elif tag == "tr":
+            table = self._enclosing("table")
+            if table is not None:
+                headers = table.info["headers"]
+                if frame.info["th"] and headers is None:
+                    table.info["headers"] = frame.info["th"]
+                elif headers and frame.info["td"]:
+                    table.info["rows"].append(dict(zip(headers, frame.info["td"])))
+        elif tag == "table":
+            self._section.parameters.extend(frame.info["rows"])
+        elif tag == "a":
+            self._events.append(("link", {"url": urljoin(self.base_url, frame.info), "text": text}))
+
+    def close(self) -> None:
+        self._events.append(("section", self._section))
+
+    def _enclosing(self, tag: str) -> Optional[_Frame]:
+        for frame in reversed(self._frames):
+            if frame.tag == tag:
+                return frame
+        return None
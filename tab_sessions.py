@@ -0,0 +1,119 @@
+"""Warm browser tabs reused across same-site renders.
+
+Rendering every page in a new tab makes Chromium set up a fresh page and
+re-fetch and re-evaluate the site's shell (theme CSS, search index, JS
+bundles) each time. Documentation sites built with Sphinx or mkdocs share that
+shell across every page, so a tab that has already rendered one page of a site
+can navigate to the next in place and keep the shell in its memory cache.
+
+``TabSessions`` hands out crawl4ai session IDs, one per warm tab, kept per
+site. A session is checked out for exactly one render at a time, returned when
+the render succeeds, and dropped when the render fails or hangs. It also times
+renders in new and reused tabs so the per-page saving can be reported.
+"""
+
+import copy
+import itertools
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlparse
+
+from crawl4ai import CrawlerRunConfig
+
+
+@dataclass
+class TabTimings:
+    """Render counts and time for new versus reused tabs on one site."""
+    cold_renders: int = 0
+    cold_seconds: float = 0.0
+    warm_renders: int = 0
+    warm_seconds: float = 0.0
+
+    @property
+    def cold_average(self) -> float:
+        return self.cold_seconds / self.cold_renders if self.cold_renders else 0.0
+
+    @property
+    def warm_average(self) -> float:
+        return self.warm_seconds / self.warm_renders if self.warm_renders else 0.0
+
+
+@dataclass
+class TabSession:
+    """A crawl4ai session ID bound to one tab, and whether it has rendered before."""
+    session_id: str
+    site: str
+    warm: bool = False
+
+
+class TabSessions:
+    """Idle warm tabs per site, and timings of renders in them."""
+
+    def __init__(self, max_idle_per_site: int = 5):
+        """Initialize the tab pool.
+
+        Args:
+            max_idle_per_site: Idle tabs kept open per site; extra tabs are closed
+        """
+        self.max_idle_per_site = max_idle_per_site
+        self._idle: Dict[str, Deque[TabSession]] = {}
+        self._ids = itertools.count(1)
+        self.timings: Dict[str, TabTimings] = {}
+
+    def checkout(self, url: str) -> TabSession:
+        """Take an idle tab for the URL's site, or a new session if none is idle."""
+        site = urlparse(url).netloc
+        idle = self._idle.get(site)
+        if idle:
+            return idle.popleft()
+        return TabSession(session_id=f"tab-{site}-{next(self._ids)}", site=site)
+
+    @staticmethod
+    def bind(config: Optional[CrawlerRunConfig], session: TabSession) -> CrawlerRunConfig:
+        """Copy a run configuration so it renders in the session's tab."""
+        bound = copy.copy(config) if config is not None else CrawlerRunConfig()
+        bound.session_id = session.session_id
+        return bound
+
+    def checkin(self, session: TabSession, seconds: float) -> bool:
+        """Record a successful render and return the tab to the idle pool.
+
+        Returns:
+            bool: False if the site already has enough idle tabs and this one should be closed
+        """
+        timings = self.timings.setdefault(session.site, TabTimings())
+        if session.warm:
+            timings.warm_renders += 1
+            timings.warm_seconds += seconds
+        else:
+            timings.cold_renders += 1
+            timings.cold_seconds += seconds
+            session.warm = True
+
+        idle = self._idle.setdefault(session.site, deque())
+        if len(idle) >= self.max_idle_per_site:
+            return False
+        idle.append(session)
+        return True
+
+    def clear(self) -> None:
+        """Forget every idle tab, e.g. after the browser they lived in was closed."""
+        self._idle.clear()
+
+    async def close(self, crawler: Any, session: TabSession) -> None:
+        """Close a session's tab in the crawler that owns it."""
+        try:
+            await crawler.crawler_strategy.kill_session(session.session_id)
+        except Exception as e:
+            print(f"Error closing tab {session.session_id}: {str(e)}")
+
+    def report(self) -> None:
+        """Print average render time in new versus reused tabs per site."""
+        for site, timings in self.timings.items():
+            if not timings.warm_renders:
+                continue
+            saving = timings.cold_average - timings.warm_average
+            print(f"Tab reuse on {site}: {timings.warm_renders} reused-tab renders averaging "
+                  f"{timings.warm_average:.2f}s vs {timings.cold_average:.2f}s in a new tab "
+                  f"({saving:+.2f}s saved per page)")
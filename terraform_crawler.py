@@ -6,9 +6,14 @@ import asyncio
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Set
 from urllib.parse import urljoin, urlparse
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
+from crawl4ai import CrawlerRunConfig, BrowserConfig
 from base import BaseDocCrawler, SDKConfig
-from bs4 import BeautifulSoup
+from boilerplate import BoilerplateStore
+from browser_pool import BrowserPool, borrow_pool
+from extraction_rules import load_rules
+from readiness import ReadinessSpec
+from sharding import ShardedRenderer
+from result_adapter import adapt_result
 
 class TerraformNativeCrawler(BaseDocCrawler):
     """Crawler for HashiCorp Terraform AWS Provider documentation using native Crawl4AI methods."""
@@ -26,24 +31,31 @@ class TerraformNativeCrawler(BaseDocCrawler):
         self._active_workers = 0
         self._worker_lock = asyncio.Lock()
         
+        # Link scope for each source, from config/extraction_rules.json
+        self.rules = load_rules("terraform_native")
+        
+        # Learns the page furniture each source repeats and strips it
+        self.boilerplate = BoilerplateStore()
+        
         # Define sources with extraction strategies
         self.sources = {
             "terraform_aws": {
                 "url": "https://github.com/hashicorp/terraform-provider-aws/tree/main/website/docs",
                 "output_dir": "terraform_aws",
                 "index_config": CrawlerRunConfig(
-                    wait_for="css:div.react-directory-filename-column",  # Wait for file listing
-                    wait_until="networkidle",
+                    wait_for=ReadinessSpec(selector="div.react-directory-filename-column", quiet_ms=300).wait_for(),  # File listing rendered
+                    wait_until="domcontentloaded",
                     process_iframes=True,
                     only_text=False,
                     css_selector="div.Box-sc-g0xbh4-0"  # Get GitHub content
                 ),
                 "page_config": CrawlerRunConfig(
-                    wait_for="css:article.markdown-body",  # Wait for markdown content
-                    wait_until="networkidle",
+                    wait_for=ReadinessSpec(selector="article.markdown-body").wait_for(),  # Markdown content present
+                    wait_until="domcontentloaded",
                     process_iframes=True,
                     only_text=False,
-                    css_selector="article.markdown-body"  # Get markdown content
+                    css_selector="article.markdown-body",  # Get markdown content
+                    excluded_selector=".headerlink, .highlight-default"
                 )
             }
         }
@@ -61,13 +73,7 @@ class TerraformNativeCrawler(BaseDocCrawler):
         href = href.split('#')[0]
         
         # Check if this is a Terraform AWS provider GitHub docs URL
-        if not any(
-            pattern in href 
-            for pattern in [
-                '/hashicorp/terraform-provider-aws/tree/main/website/docs',
-                '/hashicorp/terraform-provider-aws/blob/main/website/docs'
-            ]
-        ):
+        if not self.rules["terraform_aws"].in_scope(href):
             return None
             
         return href
@@ -93,7 +99,7 @@ class TerraformNativeCrawler(BaseDocCrawler):
         
         return 'index'
     
-    async def process_page(self, source_key: str, crawler: AsyncWebCrawler, url: str = None) -> List[str]:
+    async def process_page(self, source_key: str, crawler: BrowserPool, url: str = None) -> List[str]:
         """Process a single page and return list of discovered URLs."""
         source = self.sources[source_key]
         if url is None:
@@ -117,49 +123,23 @@ class TerraformNativeCrawler(BaseDocCrawler):
         if config:
             try:
                 # Load the page with specific config
-                result = await asyncio.wait_for(
-                    crawler.arun(url=url, config=config),
-                    timeout=30
-                )
+                result = await crawler.arun(url=url, config=config, timeout=30)
                 
                 if not result or not result.success:
                     print(f"Failed to load page {url}")
                     return []
                 
-                # Parse the HTML
-                soup = BeautifulSoup(result.html, 'html.parser')
-                
-                # Extract links based on page type
-                links = []
-                seen_hrefs = set()
+                # Take links and Markdown straight from crawl4ai's result
+                page = adapt_result(result, url, config)
                 
                 if is_index:
-                    # For index pages, look for directory and file links
-                    for row in soup.select("div.react-directory-filename-column"):
-                        link = row.find('a')
-                        if link:
-                            href = link.get('href', '')
-                            text = link.get_text().strip()
-                            
-                            # Skip navigation and index links
-                            if (href and not href.startswith(('http', '#')) and 
-                                text and not text.lower() in ['index', 'search', 'next', 'previous']):
-                                
-                                # Convert relative URL to absolute
-                                if not href.startswith('http'):
-                                    href = urljoin(url, href)
-                                
-                                # Skip if we've seen this href before
-                                if href in seen_hrefs:
-                                    continue
-                                seen_hrefs.add(href)
-                                
-                                print(f"Found link: {text} -> {href}")
-                                links.append({
-                                    'href': href,
-                                    'text': text
-                                })
-                                discovered_urls.append(href)
+                    # For index pages, keep the directory and file links under the docs tree
+                    links = [link for link in page.internal_links(
+                                 domain="github.com", skip_text=('index', 'search', 'next', 'previous'))
+                             if '/website/docs/' in link['href'] and link['href'] != url.rstrip('/')]
+                    for link in links:
+                        print(f"Found link: {link['text']} -> {link['href']}")
+                        discovered_urls.append(link['href'])
                     
                     # Save directory listing
                     resource_name = self._get_resource_name(url)
@@ -173,39 +153,33 @@ class TerraformNativeCrawler(BaseDocCrawler):
                     print(f"Saved directory listing for {resource_name}")
                     
                 else:
-                    # For content pages, get the markdown content
-                    content = soup.select_one("article.markdown-body")
-                    if content:
-                        # Clean up content
-                        for el in content.select('.headerlink, .highlight-default'):
-                            el.decompose()
-                        
-                        # Extract content
-                        text_content = content.get_text(strip=True)
+                    # For content pages, crawl4ai's Markdown is the rendered article,
+                    # less the blocks GitHub repeats on every page
+                    text_content = self.boilerplate.strip_markdown(source_key, page.content)
+                    
+                    # Get resource name
+                    resource_name = self._get_resource_name(url)
+                    print(f"Saving content for {resource_name}")
+                    
+                    # Save the content as markdown
+                    if text_content:
+                        markdown_content = f"# {resource_name}\n\n"
+                        markdown_content += f"URL: {url}\n\n"
+                        markdown_content += text_content
                         
-                        # Get resource name
-                        resource_name = self._get_resource_name(url)
-                        print(f"Saving content for {resource_name}")
+                        # Save markdown file
+                        self.save_markdown(source_key, resource_name, markdown_content)
                         
-                        # Save the content as markdown
-                        if text_content:
-                            markdown_content = f"# {resource_name}\n\n"
-                            markdown_content += f"URL: {url}\n\n"
-                            markdown_content += text_content
-                            
-                            # Save markdown file
-                            self.save_markdown(source_key, resource_name, markdown_content)
-                            
-                            # Save JSON for LLM consumption
-                            doc_structure = {
-                                "url": url,
-                                "resource": resource_name,
-                                "content": text_content,
-                                "navigation": [],
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            self.save_json(source_key, resource_name, doc_structure)
-                            print(f"Saved content for {resource_name}")
+                        # Save JSON for LLM consumption
+                        doc_structure = {
+                            "url": url,
+                            "resource": resource_name,
+                            "content": text_content,
+                            "navigation": [],
+                            "timestamp": datetime.now().isoformat()
+                        }
+                        self.save_json(source_key, resource_name, doc_structure)
+                        print(f"Saved content for {resource_name}")
             
             except asyncio.TimeoutError:
                 print(f"Timeout processing {url}")
@@ -242,7 +216,7 @@ class TerraformNativeCrawler(BaseDocCrawler):
             json.dump(data, f, indent=2, ensure_ascii=False)
         print(f"Saved JSON to {filepath}")
     
-    async def worker(self, source_key: str, crawler: AsyncWebCrawler, worker_id: int):
+    async def worker(self, source_key: str, crawler: BrowserPool, worker_id: int):
         """Worker to process pages from the queue."""
         async with self._worker_lock:
             self._active_workers += 1
@@ -272,18 +246,22 @@ class TerraformNativeCrawler(BaseDocCrawler):
                     # Signal that all workers are done
                     self._pending_urls.task_done()
 
-    async def crawl(self, source_key: str = "terraform_aws", num_workers: int = 3):
-        """Crawl the documentation using parallel workers."""
+    async def crawl(self, source_key: str = "terraform_aws", num_workers: int = 3,
+                    pool: Optional[BrowserPool] = None):
+        """Crawl the documentation using parallel workers.
+
+        Args:
+            source_key: Key of the source to crawl
+            num_workers: Number of queue workers
+            pool: Shared browser pool; a private one is opened if omitted
+        """
         browser_config = BrowserConfig(
             headless=True,
             ignore_https_errors=True
         )
         
-        # Create a single crawler instance to be shared
-        async with AsyncWebCrawler(
-            browser_config=browser_config,
-            max_concurrent_pages=num_workers  # Allow concurrent page processing
-        ) as crawler:
+        # Borrow a single browser shared by all workers
+        async with borrow_pool(pool, browser_config=browser_config, pool_size=num_workers) as crawler:
             # Add initial URL to queue
             source = self.sources[source_key]
             await self._pending_urls.put(source["url"])
@@ -320,6 +298,18 @@ class TerraformNativeCrawler(BaseDocCrawler):
                         worker.cancel()
                 await asyncio.gather(*workers, return_exceptions=True)
 
-if __name__ == "__main__":
+async def _main(args):
     crawler = TerraformNativeCrawler("output")
-    asyncio.run(crawler.crawl()) 
\ No newline at end of file
+    if not args.shards:
+        await crawler.crawl(num_workers=args.workers)
+        return
+    # Keep every shard busy: one queue worker per render slot
+    async with ShardedRenderer(num_shards=args.shards, pool_size=args.workers) as renderer:
+        await crawler.crawl(num_workers=args.shards * args.workers, pool=renderer)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Crawl the Terraform AWS provider docs.')
+    parser.add_argument('--workers', type=int, default=3, help='Pages rendering at once (per shard when sharded)')
+    parser.add_argument('--shards', type=int, default=0, help='Render in this many browser processes')
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,22 @@
+"""Shared fixtures for the crawler tests."""
+
+from pathlib import Path
+
+import pytest
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+PAGES_DIR = FIXTURES_DIR / "pages"
+
+
+def fixture_pages():
+    """Saved documentation pages, one per source layout."""
+    return sorted(PAGES_DIR.glob("*.html"))
+
+
+@pytest.fixture
+def api_crawler(tmp_path, monkeypatch):
+    """An APIDocCrawler whose output directories are created under a temporary directory."""
+    from crawler import APIDocCrawler
+
+    monkeypatch.chdir(tmp_path)
+    return APIDocCrawler()
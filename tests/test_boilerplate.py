@@ -0,0 +1,145 @@
+"""BoilerplateLearner learns a site's repeated subtrees and strips them from later pages."""
+
+import json
+import time
+
+from boilerplate import FINGERPRINT_VERSION, BoilerplateLearner, BoilerplateStore, markdown_blocks
+from html_parser import make_soup
+
+SIDEBAR = "".join(f'<li><a href="/docs/{i}.html">Service page {i}</a></li>' for i in range(20))
+
+
+def site_page(n: int, current: int = None) -> str:
+    """A page of a site sharing a header, sidebar and footer; the sidebar marks the current page."""
+    sidebar = SIDEBAR.replace(f'<li><a href="/docs/{current}.html">', f'<li class="current"><a href="/docs/{current}.html">')
+    return (f'<html><body><header><div class="brand">Example Cloud Documentation</div></header>'
+            f'<nav class="sidebar"><ul>{sidebar}</ul></nav>'
+            f'<main><h1>Page {n}</h1><h2>Syntax</h2><div class="body"><p>Operation {n} creates resource {n} '
+            f'and returns its identifier.</p></div></main>'
+            f'<footer><div>Copyright Example Cloud, all rights reserved.</div></footer></body></html>')
+
+
+def site_markdown(n: int) -> str:
+    """The Markdown crawl4ai would give for a page of the same site."""
+    return ("Example Cloud Documentation home, guides and references\n\n"
+            "- [Service page 1](/docs/1.html)\n- [Service page 2](/docs/2.html)\n\n"
+            f"# Page {n}\n\n## Syntax\n\nOperation {n} creates resource {n} and returns its identifier.\n\n"
+            "```\nclient.create()\n\nclient.delete()\n```\n\n"
+            "Copyright Example Cloud, all rights reserved.\n")
+
+
+def learn(learner: BoilerplateLearner, pages: int = 5):
+    """Feed the learner pages until it has learned, returning the stripped count of each."""
+    return [learner.strip(make_soup(site_page(n, current=n))) for n in range(pages)]
+
+
+def test_learns_then_strips_template():
+    learner = BoilerplateLearner(learn_pages=5)
+    removed = learn(learner)
+    assert removed[:4] == [0, 0, 0, 0]
+    # The page that finishes learning is stripped too
+    assert removed[4] == 3
+    assert learner.learned
+
+    soup = make_soup(site_page(99, current=7))
+    assert learner.strip(soup) == 3
+    assert soup.find("nav") is None and soup.find("header") is None and soup.find("footer") is None
+    assert "Operation 99 creates resource 99" in soup.get_text()
+
+
+def test_keeps_repeated_headings_and_short_text():
+    learner = BoilerplateLearner(learn_pages=5)
+    learn(learner)
+    soup = make_soup(site_page(42))
+    learner.strip(soup)
+    assert [h.get_text() for h in soup.find_all("h2")] == ["Syntax"]
+    assert soup.find("main") is not None
+
+
+def test_content_differing_per_page_is_kept():
+    learner = BoilerplateLearner(learn_pages=5)
+    learn(learner)
+    soup = make_soup(site_page(5))
+    learner.strip(soup)
+    assert soup.select_one("div.body") is not None
+
+
+def test_saved_templates_strip_from_the_first_page(tmp_path):
+    path = tmp_path / "site.json"
+    learn(BoilerplateLearner(path, learn_pages=5))
+    saved = json.loads(path.read_text())
+    assert saved["version"] == FINGERPRINT_VERSION and saved["templates"]
+
+    learner = BoilerplateLearner(path, learn_pages=5)
+    assert learner.learned
+    assert learner.strip(make_soup(site_page(1))) == 3
+
+
+def test_other_settings_learn_again(tmp_path):
+    path = tmp_path / "site.json"
+    learn(BoilerplateLearner(path, learn_pages=5))
+    learner = BoilerplateLearner(path, learn_pages=5, min_text=10)
+    assert not learner.learned
+    assert learner.strip(make_soup(site_page(1))) == 0
+
+
+def test_expired_templates_learn_again(tmp_path):
+    path = tmp_path / "site.json"
+    learn(BoilerplateLearner(path, learn_pages=5))
+    learner = BoilerplateLearner(path, learn_pages=5, max_age=60)
+    learner.learned_at = time.time() - 120
+    assert learner.expired()
+    assert learner.strip(make_soup(site_page(1))) == 0
+    assert learner.pages_seen == 1 and not learner.learned
+
+
+def test_redesign_learns_again_after_pages_that_do_not_fit():
+    learner = BoilerplateLearner(learn_pages=5, relearn_after=3)
+    learn(learner)
+    redesigned = ('<html><body><div class="topbar">A completely new site header banner</div>'
+                  '<main><p>Content of the redesigned page, long enough to count.</p></main></body></html>')
+    learner.strip(make_soup(redesigned))
+    learner.strip(make_soup(redesigned))
+    assert learner.learned
+    # The third page in a row that doesn't fit starts learning over
+    learner.strip(make_soup(redesigned))
+    assert not learner.learned and learner.pages_seen == 1
+
+
+def test_store_keeps_one_learner_per_source(tmp_path):
+    store = BoilerplateStore(str(tmp_path), learn_pages=2)
+    assert store.learner("a") is store.learner("a")
+    assert store.learner("a") is not store.learner("b")
+    for n in range(2):
+        store.strip("a", make_soup(site_page(n)))
+    assert (tmp_path / "a.json").exists()
+    assert not (tmp_path / "b.json").exists()
+    assert store.strip("b", make_soup(site_page(3))) == 0
+
+
+def test_markdown_blocks_keep_fences_whole():
+    markdown = "Intro\n\n~~~\na\n\n```\nb\n~~~\n\n````\nc\n\n```\n````\nTail"
+    assert markdown_blocks(markdown) == ["Intro", "~~~\na\n\n```\nb\n~~~", "````\nc\n\n```\n````\nTail"]
+
+
+def test_strip_markdown_learns_then_strips_repeated_blocks():
+    learner = BoilerplateLearner(learn_pages=5)
+    stripped = [learner.strip_markdown(site_markdown(n)) for n in range(5)]
+    assert stripped[:4] == [site_markdown(n) for n in range(4)]
+    assert learner.learned
+
+    page = learner.strip_markdown(site_markdown(99))
+    assert "Example Cloud Documentation home" not in page
+    assert "Service page 1" not in page and "Copyright" not in page
+    # Headings and code blocks repeat on every page but are never template
+    assert page.startswith("# Page 99\n\n## Syntax\n\nOperation 99")
+    assert "```\nclient.create()\n\nclient.delete()\n```" in page
+
+
+def test_store_saves_markdown_templates_apart(tmp_path):
+    store = BoilerplateStore(str(tmp_path), learn_pages=2)
+    for n in range(2):
+        store.strip_markdown("a", site_markdown(n))
+    assert (tmp_path / "a.markdown.json").exists()
+    assert not (tmp_path / "a.json").exists()
+    assert "Copyright" not in store.strip_markdown("a", site_markdown(3))
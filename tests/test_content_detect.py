@@ -0,0 +1,67 @@
+"""find_main_content picks the content block, not navigation or page-wide wrappers."""
+
+import pytest
+
+from content_detect import find_main_content, score_blocks
+from html_parser import make_soup
+from tests.conftest import PAGES_DIR
+
+PARAGRAPH = "<p>This paragraph documents the operation, its parameters, and what it returns.</p>"
+
+# The content block of each fixture page, as (tag, selector it matches)
+EXPECTED = {
+    "boto3_s3": ("article", "#furo-main-content"),
+    "boto3_s3_put_object": ("section", "#s3-client-put-object"),
+    "cdk_python_modules": ("div", ".rst-content"),
+    "cloudformation_aws_s3_bucket": ("div", "#main-col-body"),
+    "crawl4ai_async_webcrawler": ("article", ".md-content__inner"),
+    "pulumi_lambda_function": ("article", ".docs-article"),
+}
+
+
+def page(nav_links: int = 40, paragraphs: int = 6) -> str:
+    nav = "".join(f'<li><a href="/service/{i}">Service number {i}, reference</a></li>' for i in range(nav_links))
+    body = PARAGRAPH * paragraphs
+    return (f'<html><body><div class="wrapper"><div class="sidebar"><ul>{nav}</ul></div>'
+            f'<div id="content">{body}</div><div class="footer"><p>Copyright, all rights reserved.</p></div>'
+            f'</div></body></html>')
+
+
+def test_prefers_content_over_link_heavy_navigation():
+    soup = make_soup(page())
+    found = find_main_content(soup)
+    assert found is not None and found.get("id") == "content"
+
+
+def test_navigation_loses_even_without_class_hints():
+    html = page().replace('class="sidebar"', '').replace('id="content"', 'id="x"')
+    found = find_main_content(make_soup(html))
+    assert found.get("id") == "x"
+
+
+def test_min_text_excludes_small_blocks():
+    soup = make_soup(f"<html><body><div>{PARAGRAPH}</div></body></html>")
+    assert find_main_content(soup, min_text=1000) is None
+    assert find_main_content(soup).name == "div"
+
+
+def test_scripts_and_styles_are_not_text():
+    script = "<script>" + "var x = 'a, b, c';" * 200 + "</script>"
+    soup = make_soup(f'<html><body><div id="code">{script}</div><div id="text">{PARAGRAPH * 3}</div></body></html>')
+    scores = {element.get("id"): text for element, _, text in score_blocks(soup)}
+    assert "code" not in scores
+    assert find_main_content(soup).get("id") == "text"
+
+
+def test_no_candidates():
+    assert find_main_content(make_soup("<p>Only a paragraph</p>")) is None
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_fixture_pages(name):
+    soup = make_soup((PAGES_DIR / f"{name}.html").read_text(encoding="utf-8"))
+    tag, selector = EXPECTED[name]
+    found = find_main_content(soup, min_text=1000)
+    assert found is not None
+    assert found is soup.select_one(selector)
+    assert found.name == tag
@@ -0,0 +1,80 @@
+"""DomainRateLimiter paces requests per domain, backs off on 429/503 and eases back after successes."""
+
+import asyncio
+import time
+
+from dispatcher import DomainRateLimiter
+
+URL = "https://docs.example.com/guide/page.html"
+
+
+def test_domains_are_keyed_by_netloc():
+    limiter = DomainRateLimiter(base_delay=(1.0, 1.0))
+    limiter.update(URL, 200)
+    limiter.update("https://docs.example.com/other.html", 429)
+    limiter.update("https://api.example.com/", 200)
+    assert set(limiter.domains) == {"docs.example.com", "api.example.com"}
+    assert limiter.domains["docs.example.com"].failures == 1
+    assert limiter.domains["api.example.com"].failures == 0
+
+
+def test_rate_limit_doubles_delay_and_retries_up_to_max_retries():
+    limiter = DomainRateLimiter(base_delay=(1.0, 1.0), max_retries=2)
+    assert limiter.update(URL, 429) is True
+    assert 2.0 <= limiter.domains["docs.example.com"].delay <= 2.5
+    previous = limiter.domains["docs.example.com"].delay
+    assert limiter.update(URL, 503) is True
+    assert previous * 2 <= limiter.domains["docs.example.com"].delay <= previous * 2 + 0.5
+    assert limiter.update(URL, 429) is False
+    assert limiter.domains["docs.example.com"].failures == 3
+    assert limiter.backoffs == 3
+
+
+def test_delay_is_capped_at_max_delay():
+    limiter = DomainRateLimiter(base_delay=(1.0, 1.0), max_delay=3.0, max_retries=10)
+    for _ in range(5):
+        limiter.update(URL, 429)
+    assert limiter.domains["docs.example.com"].delay == 3.0
+
+
+def test_other_statuses_are_not_retried():
+    limiter = DomainRateLimiter(base_delay=(1.0, 1.0))
+    assert limiter.update(URL, 200) is False
+    assert limiter.update(URL, 404) is False
+    assert limiter.update(URL, None) is False
+    assert limiter.backoffs == 0
+
+
+def test_success_resets_failures_and_eases_delay():
+    limiter = DomainRateLimiter(base_delay=(1.0, 1.0), max_retries=1, max_delay=8.0)
+    for _ in range(3):
+        limiter.update(URL, 429)
+    state = limiter.domains["docs.example.com"]
+    assert state.delay == 8.0
+    assert limiter.update(URL, 200) is False
+    assert state.failures == 0 and state.delay == 6.0
+    # A retry is allowed again after the success
+    assert limiter.update(URL, 429) is True
+    # Easing never drops below the base range
+    for _ in range(20):
+        limiter.update(URL, 200)
+    assert state.delay == 1.0
+
+
+def test_wait_reserves_slots_per_domain():
+    limiter = DomainRateLimiter(base_delay=(0.05, 0.05))
+
+    async def run():
+        await asyncio.gather(*(limiter.wait(URL) for _ in range(3)))
+        before_other = time.monotonic()
+        await limiter.wait("https://api.example.com/")
+        return time.monotonic() - before_other
+
+    start = time.monotonic()
+    other_wait = asyncio.run(run())
+    elapsed = time.monotonic() - start
+    # Three calls on one domain wait 0, 0.05 and 0.10s and leave the next slot 0.15s out
+    assert 0.09 <= elapsed < 0.5
+    assert 0.15 <= limiter.domains["docs.example.com"].next_allowed - start < 0.2
+    # Another domain has its own slots
+    assert other_wait < 0.04
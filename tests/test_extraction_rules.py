@@ -0,0 +1,81 @@
+"""SourceRules compiles a source's rules once; load_rules reads them from config/extraction_rules.json."""
+
+import json
+
+import pytest
+import soupsieve
+
+from extraction_rules import RULES_PATH, SourceRules, load_rules
+from html_parser import make_soup
+
+PAGE = ('<html><body><main><div class="body"><nav class="breadcrumbs">Home</nav><h1>Bucket</h1>'
+        '<a href="services/s3.html">S3</a><a href="#top">Top</a><a href="/other/x.html">Other</a>'
+        '<a href="services/ec2.html"></a></div></main></body></html>')
+
+
+def rules(**kwargs) -> SourceRules:
+    return SourceRules(name="test", **kwargs)
+
+
+def test_select_content_follows_priority_order():
+    source = rules(content_selectors=["div.section", "div.body", "main"])
+    only_main = make_soup("<main><p>Main only</p></main>")
+    assert source.select_content(only_main).name == "main"
+    assert source.winning_selector == "main"
+    # A later page matching a higher-priority selector gets that element, not the last winner's
+    both = make_soup(PAGE)
+    assert source.select_content(both)["class"] == ["body"]
+    assert source.winning_selector == "div.body"
+
+
+def test_select_content_without_a_match():
+    source = rules(content_selectors=["article"])
+    assert source.select_content(make_soup(PAGE)) is None
+    assert source.winning_selector is None
+    assert rules().select_content(make_soup(PAGE)) is None
+
+
+def test_clean_and_links():
+    source = rules(content_selectors=["div.body"], remove_selectors=[".breadcrumbs"],
+                   include=["services/"], exclude=["^#"])
+    content = source.clean(source.select_content(make_soup(PAGE)))
+    assert content.select_one(".breadcrumbs") is None
+    assert source.links(content, "https://example.com/docs/index.html") == [
+        {'href': 'https://example.com/docs/services/s3.html', 'text': 'S3'}]
+
+
+def test_in_scope():
+    source = rules(include=["/api-docs/", r"\.html$"], exclude=["^#", "CHANGELOG"])
+    assert source.in_scope("https://example.com/api-docs/s3/")
+    assert source.in_scope("guide.html")
+    assert not source.in_scope("https://example.com/blog/")
+    assert not source.in_scope("#section")
+    assert not source.in_scope("/api-docs/changelog.html")
+    assert rules().in_scope("anything")
+
+
+def test_from_config_defaults():
+    source = SourceRules.from_config("s3", {"url": "https://example.com/"})
+    assert source.output_dir == "s3" and source.link_selector == "a[href]"
+    assert source.content_selectors == [] and source.include == []
+
+
+def test_load_rules_reads_every_group():
+    groups = json.loads(RULES_PATH.read_text())
+    for crawler, sources in groups.items():
+        loaded = load_rules(crawler)
+        assert list(loaded) == list(sources)
+    assert load_rules("no_such_crawler") == {}
+
+
+def test_load_rules_errors_propagate(tmp_path):
+    with pytest.raises(OSError):
+        load_rules("doc_crawler", tmp_path / "missing.json")
+    broken = tmp_path / "broken.json"
+    broken.write_text("{")
+    with pytest.raises(json.JSONDecodeError):
+        load_rules("doc_crawler", broken)
+    bad_selector = tmp_path / "bad_selector.json"
+    bad_selector.write_text(json.dumps({"doc_crawler": {"s": {"content_selectors": ["div["]}}}))
+    with pytest.raises(soupsieve.SelectorSyntaxError):
+        load_rules("doc_crawler", bad_selector)
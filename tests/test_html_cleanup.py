@@ -0,0 +1,79 @@
+"""prune_tree must leave what preprocess_html's old cleanup loops left, in one pass."""
+
+import re
+
+import pytest
+
+from benchmark_cleanup import BLOG_PAGES_DIR, blog_content, old_cleanup, synthetic_post
+from html_cleanup import is_noise, prune_tree
+from html_parser import FALLBACK_PARSER, make_soup, parser_available, use_parser
+
+BLOG_PAGES = sorted(BLOG_PAGES_DIR.glob("*.html"))
+PARSERS = [parser for parser in ("lxml", FALLBACK_PARSER) if parser_available(parser)]
+
+
+def cleaned(cleanup, html):
+    tree = blog_content(html)
+    cleanup(tree)
+    return str(tree)
+
+
+def test_blog_pages_exist():
+    assert len(BLOG_PAGES) >= 2
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("path", BLOG_PAGES, ids=lambda p: p.stem)
+def test_matches_old_cleanup_on_blog_pages(parser, path):
+    html = path.read_text(encoding="utf-8")
+    with use_parser(parser):
+        assert cleaned(prune_tree, html) == cleaned(old_cleanup, html)
+
+
+def test_matches_old_cleanup_on_a_generated_post():
+    html = synthetic_post(20)
+    assert cleaned(prune_tree, html) == cleaned(old_cleanup, html)
+
+
+def test_blog_content_is_kept():
+    html = (BLOG_PAGES_DIR / "aws_news_blog_s3_express.html").read_text(encoding="utf-8")
+    tree = blog_content(html)
+    prune_tree(tree)
+    text = tree.get_text()
+    assert "Directory buckets" in text and "create-bucket" in text
+    assert tree.find("img") is None and tree.find("script") is None
+    assert "Share on LinkedIn" not in text and "Reader 1" not in text and "essential cookies" not in text
+
+
+def test_removes_tags_noise_and_empty_elements():
+    soup = make_soup('<div id="root"><script>x()</script><div class="Social-Links"><a>Follow</a></div>'
+                     '<p>Kept <span></span><b> </b></p><div><div><img src="a.png"></div></div>'
+                     '<!-- comment only --><div><!-- note --></div></div>')
+    root = soup.find(id="root")
+    removed = prune_tree(root)
+    assert str(root) == '<div id="root"><p>Kept </p><!-- comment only --></div>'
+    assert removed == 6
+
+
+def test_root_is_never_removed():
+    soup = make_soup('<div id="root"><span></span></div>')
+    root = soup.find(id="root")
+    prune_tree(root)
+    assert str(root) == '<div id="root"></div>'
+
+
+def test_options():
+    html = '<div id="root"><nav>Menu</nav><div class="share">Share</div><span></span></div>'
+    root = make_soup(html).find(id="root")
+    prune_tree(root, remove_tags=frozenset(), noise_classes=None, drop_empty=False)
+    assert str(root) == html
+    root = make_soup(html).find(id="root")
+    prune_tree(root, remove_tags=frozenset({'nav'}), noise_classes=re.compile("share"), drop_empty=False)
+    assert str(root) == '<div id="root"><span></span></div>'
+
+
+def test_is_noise():
+    soup = make_soup('<div class="lb-col blog-sidebar"></div><div class="post"></div><div></div>')
+    sidebar, post, bare = soup.find_all("div")
+    assert is_noise(sidebar) and not is_noise(post) and not is_noise(bare)
+    assert not is_noise(sidebar, None)
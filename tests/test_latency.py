@@ -0,0 +1,58 @@
+"""LatencyTracker derives per-source render timeouts and hedge delays from recent render times."""
+
+from latency import LatencyTracker
+
+
+def tracker_with(samples, **kwargs) -> LatencyTracker:
+    tracker = LatencyTracker(**kwargs)
+    for seconds in samples:
+        tracker.record("boto3", seconds)
+    return tracker
+
+
+def test_default_until_enough_samples():
+    tracker = tracker_with([1.0] * 19, min_samples=20)
+    assert tracker.percentile("boto3", 50) is None
+    assert tracker.timeout("boto3", 30) == 30
+    assert tracker.timeout("boto3") is None
+    assert tracker.hedge_after("boto3") is None
+    assert tracker.timeout("unknown", 30) == 30
+
+
+def test_timeout_is_p99_times_k_within_bounds():
+    tracker = tracker_with([float(i) for i in range(1, 101)], min_samples=20, k=3.0, floor=5.0)
+    assert tracker.percentile("boto3", 50) == 51.0
+    assert tracker.percentile("boto3", 99) == 100.0
+    # Never above the caller's timeout
+    assert tracker.timeout("boto3", 30) == 30
+    assert tracker.timeout("boto3") == 300.0
+    fast = tracker_with([0.5] * 20, min_samples=20, k=3.0, floor=5.0)
+    # Never below the floor
+    assert fast.timeout("boto3", 30) == 5.0
+
+
+def test_hedge_after_p95():
+    tracker = tracker_with([float(i) for i in range(1, 21)], min_samples=20)
+    assert tracker.hedge_after("boto3") == 20.0
+    assert tracker.percentile("boto3", 50) == 11.0
+
+
+def test_window_keeps_recent_renders():
+    tracker = tracker_with([60.0] * 20 + [1.0] * 20, window=20, min_samples=20, floor=0.0)
+    assert tracker.percentile("boto3", 99) == 1.0
+    assert tracker.timeout("boto3", 30) == 3.0
+
+
+def test_sources_are_tracked_separately():
+    tracker = tracker_with([2.0] * 20, min_samples=20, floor=0.0)
+    assert tracker.timeout("boto3", 30) == 6.0
+    assert tracker.timeout("pulumi_aws", 30) == 30
+
+
+def test_report(capsys):
+    tracker = tracker_with([2.0] * 20, min_samples=20, floor=0.0)
+    tracker.record("pulumi_aws", 1.0)
+    tracker.report()
+    out = capsys.readouterr().out
+    assert "boto3: p50 2.0s, p95 2.0s, p99 2.0s, timeout 6.0s" in out
+    assert "pulumi_aws" not in out
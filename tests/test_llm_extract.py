@@ -0,0 +1,102 @@
+"""ChunkCache keys chunk results by what decides them; LLMExtractor reuses them across pages and runs."""
+
+import asyncio
+import json
+
+from llm_extract import URL_FIELD, ChunkCache, LLMExtractor, chunk_markdown
+
+SHARED = "Shared footer text that every page of the site repeats word for word."
+
+
+def test_key_covers_chunk_schema_instruction_and_model():
+    key = ChunkCache.key("chunk", "{}", "Extract names.", "model-a")
+    assert key == ChunkCache.key("chunk", "{}", "Extract names.", "model-a")
+    assert len({key,
+                ChunkCache.key("chunk 2", "{}", "Extract names.", "model-a"),
+                ChunkCache.key("chunk", '{"type": "object"}', "Extract names.", "model-a"),
+                ChunkCache.key("chunk", "{}", "Extract prices.", "model-a"),
+                ChunkCache.key("chunk", "{}", "Extract names.", "model-b")}) == 5
+    # Parts are separated, so moving text between them changes the key
+    assert ChunkCache.key("ab", "c", "d", "e") != ChunkCache.key("a", "bc", "d", "e")
+
+
+def test_get_and_put(tmp_path):
+    cache = ChunkCache(tmp_path)
+    key = ChunkCache.key("chunk", "{}", "Extract names.", "model")
+    assert cache.get(key) is None
+    cache.put(key, {"items": [{"name": "a"}], "usage": {"prompt_tokens": 3}})
+    assert ChunkCache(tmp_path).get(key) == {"items": [{"name": "a"}], "usage": {"prompt_tokens": 3}}
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = ChunkCache(tmp_path)
+    key = ChunkCache.key("chunk", "{}", "", "model")
+    cache.put(key, {"items": []})
+    next(tmp_path.rglob("*.json")).write_text("{not json")
+    assert cache.get(key) is None
+
+
+def test_chunks_start_at_headings():
+    sections = "\n\n".join(f"## Section {i}\n\n" + " ".join(["word"] * 100) for i in range(6))
+    chunks = chunk_markdown(sections, chunk_tokens=400)
+    assert len(chunks) > 1
+    assert all(chunk.startswith("## Section") for chunk in chunks)
+    assert "\n\n".join(chunks) == sections
+
+
+def test_code_fences_stay_whole():
+    markdown = "Intro\n\n```python\na = 1\n\nb = 2\n```\n\nOutro"
+    assert chunk_markdown(markdown, chunk_tokens=1) == ["Intro", "```python\na = 1\n\nb = 2\n```", "Outro"]
+
+
+def extractor_with_model(cache, answers):
+    """An extractor whose model answers each prompt with the first word of its content."""
+    extractor = LLMExtractor(instruction="Extract names.", schema={"type": "object"}, model="stand-in",
+                             cache=cache, chunk_tokens=10)
+
+    async def complete(prompt):
+        answers.append(prompt)
+        word = prompt.split("<content>")[1].split()[0]
+        return {"choices": [{"message": {"content": json.dumps([{"name": word}])}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 2}}
+
+    extractor._complete = complete
+    return extractor
+
+
+def pages():
+    return {
+        "https://example.com/a": "Alpha page body.\n\n" + SHARED,
+        "https://example.com/b": "Beta page body.\n\n" + SHARED,
+    }
+
+
+def test_repeated_chunks_are_sent_once_and_tagged_per_page(tmp_path):
+    prompts = []
+    extractor = extractor_with_model(ChunkCache(tmp_path), prompts)
+    results = asyncio.run(extractor.extract_pages(pages()))
+    assert results == {
+        "https://example.com/a": [{"name": "Alpha", URL_FIELD: "https://example.com/a"},
+                                  {"name": "Shared", URL_FIELD: "https://example.com/a"}],
+        "https://example.com/b": [{"name": "Beta", URL_FIELD: "https://example.com/b"},
+                                  {"name": "Shared", URL_FIELD: "https://example.com/b"}],
+    }
+    assert len(prompts) == 3
+    assert all("example.com" not in prompt for prompt in prompts)
+    assert extractor.stats.chunks == 4 and extractor.stats.requests == 3 and extractor.stats.cached == 1
+
+
+def test_rerun_is_served_from_the_cache(tmp_path):
+    first = asyncio.run(extractor_with_model(ChunkCache(tmp_path), []).extract_pages(pages()))
+    prompts = []
+    extractor = extractor_with_model(ChunkCache(tmp_path), prompts)
+    assert asyncio.run(extractor.extract_pages(pages())) == first
+    assert prompts == []
+    assert extractor.stats.cached == 4 and extractor.stats.saved_tokens == 4 * 12
+
+
+def test_without_cache_every_chunk_is_sent():
+    prompts = []
+    asyncio.run(extractor_with_model(None, prompts).extract_pages(pages()))
+    assert len(prompts) == 4
@@ -0,0 +1,98 @@
+"""parse_markdown_doc splits off front matter and normalizes Terraform doc Markdown in one pass."""
+
+from markdown_docs import parse_markdown_doc, split_front_matter
+
+DOC = """---
+subcategory: "S3 (Simple Storage)"
+layout: "aws"
+page_title: "AWS: aws_s3_bucket"
+description: |-
+  Provides a S3 bucket resource.
+---
+
+# Resource: aws_s3_bucket
+
+Provides a S3 bucket resource.
+
+Example Usage
+-------------
+
+```HCL
+resource "aws_s3_bucket" "example" {
+  bucket = "my-tf-test-bucket"
+}
+```
+
+##Argument Reference ##
+
+* `bucket` - (Optional) Name of the bucket.
+"""
+
+
+def test_front_matter_and_title():
+    doc = parse_markdown_doc(DOC)
+    assert doc.metadata == {
+        "subcategory": "S3 (Simple Storage)",
+        "layout": "aws",
+        "page_title": "AWS: aws_s3_bucket",
+        "description": "Provides a S3 bucket resource.",
+    }
+    assert doc.title == "Resource: aws_s3_bucket"
+    assert not doc.markdown.startswith("# ")
+
+
+def test_body_is_normalized():
+    assert parse_markdown_doc(DOC).markdown == (
+        "Provides a S3 bucket resource.\n"
+        "\n"
+        "## Example Usage\n"
+        "\n"
+        "```terraform\n"
+        "resource \"aws_s3_bucket\" \"example\" {\n"
+        "  bucket = \"my-tf-test-bucket\"\n"
+        "}\n"
+        "```\n"
+        "\n"
+        "## Argument Reference\n"
+        "\n"
+        "* `bucket` - (Optional) Name of the bucket.\n"
+    )
+
+
+def test_without_front_matter():
+    doc = parse_markdown_doc("Title\n=====\n\nBody\n")
+    assert doc.metadata == {} and doc.title == "Title" and doc.markdown == "Body\n"
+
+
+def test_invalid_front_matter_is_dropped():
+    metadata, body = split_front_matter("---\n: [unclosed\n---\nBody\n")
+    assert metadata == {} and body == "Body\n"
+
+
+def test_trailing_whitespace_is_dropped_outside_code():
+    doc = parse_markdown_doc("# T\n\nText  \n\n```\nkeep  \n```\n")
+    assert doc.markdown == "Text\n\n```\nkeep  \n```\n"
+
+
+def test_headings_inside_code_are_kept():
+    doc = parse_markdown_doc("# T\n\n```\n# comment\nvalue\n---\n```\n")
+    assert doc.markdown == "```\n# comment\nvalue\n---\n```\n"
+
+
+def test_tilde_fence_is_widened_past_backtick_lines():
+    doc = parse_markdown_doc("# T\n\n~~~hcl\nexample = <<EOT\n```\nEOT\n````\n~~~\n\nAfter\n")
+    assert doc.markdown == "`````terraform\nexample = <<EOT\n```\nEOT\n````\n`````\n\nAfter\n"
+
+
+def test_tilde_fence_without_backticks_keeps_its_width():
+    doc = parse_markdown_doc("# T\n\n~~~~\ncode\n~~~~\n")
+    assert doc.markdown == "````\ncode\n````\n"
+
+
+def test_longer_backtick_fence_holds_shorter_fences():
+    doc = parse_markdown_doc("# T\n\n````markdown\n```hcl\nx = 1\n```\n````\n")
+    assert doc.markdown == "````markdown\n```hcl\nx = 1\n```\n````\n"
+
+
+def test_open_fence_is_closed():
+    assert parse_markdown_doc("# T\n\n~~~\ncode\n```\n").markdown == "````\ncode\n```\n````\n"
@@ -0,0 +1,103 @@
+"""lxml must extract the same documents as html.parser, which the crawlers used before html_parser."""
+
+from dataclasses import asdict
+from types import SimpleNamespace
+
+import pytest
+
+from benchmark_parsers import adapt_static, extraction_specs, run_configs
+from html_parser import FALLBACK_PARSER, make_soup, parser_available, use_parser
+from sections import split_sections
+from tests.conftest import fixture_pages
+
+pytestmark = pytest.mark.skipif(not parser_available("lxml"), reason="lxml is not installed")
+
+PAGES = fixture_pages()
+
+
+@pytest.fixture(scope="module")
+def specs(tmp_path_factory):
+    import os
+
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("specs"))
+    try:
+        return extraction_specs()
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture(scope="module")
+def configs(tmp_path_factory):
+    import os
+
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("configs"))
+    try:
+        return run_configs()
+    finally:
+        os.chdir(cwd)
+
+
+def under_both(func):
+    """Run func with html.parser, then with lxml."""
+    with use_parser(FALLBACK_PARSER):
+        expected = func()
+    with use_parser("lxml"):
+        actual = func()
+    return expected, actual
+
+
+def section_summary(html):
+    return [{
+        "title": section.title,
+        "level": section.level,
+        "paragraphs": [p.get_text() for p in section.paragraphs],
+        "intro": [p.get_text() for p in section.intro],
+        "code": [c.get_text() for c in section.code],
+        "parameters": section.parameters(),
+    } for section in split_sections(make_soup(html))]
+
+
+def test_fixture_pages_exist():
+    assert len(PAGES) >= 5
+
+
+@pytest.mark.parametrize("path", PAGES, ids=lambda p: p.stem)
+def test_extract_document(api_crawler, path):
+    html = path.read_text(encoding="utf-8")
+    expected, actual = under_both(
+        lambda: api_crawler.extract_document(api_crawler.parse_document(html), path.stem, path.stem))
+    assert actual == expected
+
+
+@pytest.mark.parametrize("path", PAGES, ids=lambda p: p.stem)
+def test_split_sections(path):
+    html = path.read_text(encoding="utf-8")
+    expected, actual = under_both(lambda: section_summary(html))
+    assert actual == expected
+
+
+@pytest.mark.parametrize("path", PAGES, ids=lambda p: p.stem)
+def test_extraction_specs(specs, path):
+    html = path.read_text(encoding="utf-8")
+    result = SimpleNamespace(html=html, url=f"https://example.com/{path.stem}")
+    for name, spec in specs.items():
+        expected, actual = under_both(lambda: asdict(spec.extract(result)))
+        assert actual == expected, name
+
+
+@pytest.mark.parametrize("path", PAGES, ids=lambda p: p.stem)
+def test_adapt_result(configs, path):
+    html = path.read_text(encoding="utf-8")
+    for name, config in configs.items():
+        expected, actual = under_both(lambda: adapt_static(html, f"https://example.com/{path.stem}", config))
+        assert actual == expected, name
+
+
+def test_documents_are_not_empty(api_crawler):
+    documents = {path.stem: api_crawler.extract_document(
+        api_crawler.parse_document(path.read_text(encoding="utf-8")), path.stem, path.stem) for path in PAGES}
+    assert all(document["examples"] for document in documents.values())
+    assert any(document["api_reference"] for document in documents.values())
+    assert any(entry["parameters"] for document in documents.values() for entry in document["api_reference"])
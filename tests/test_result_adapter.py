@@ -0,0 +1,56 @@
+"""adapt_result reads crawl4ai results as they are, and narrows static results the way crawl4ai would."""
+
+from types import SimpleNamespace
+
+from result_adapter import adapt_result
+
+PAGE = ('<html><head><title>Bucket | Docs</title></head><body>'
+        '<nav><a href="/docs/nav.html">Nav link</a></nav>'
+        '<article><h1>Bucket<a class="headerlink" href="#bucket">¶</a></h1>'
+        '<p>Creates a <a href="/docs/object.html#put">bucket object</a>, see '
+        '<a href="https://other.example.org/ref">the reference</a>.</p>'
+        '<footer>Article footer</footer></article></body></html>')
+
+
+def static_result(html=PAGE, url="https://example.com/docs/bucket.html"):
+    return SimpleNamespace(success=True, html=html, url=url)
+
+
+def test_static_result_applies_the_run_config():
+    config = SimpleNamespace(css_selector="article", excluded_tags=["footer"], excluded_selector=".headerlink")
+    page = adapt_result(static_result(), config=config)
+    assert page.title == "Bucket | Docs"
+    assert page.content.startswith("# Bucket\n")
+    assert "Nav link" not in page.markdown
+    assert "Article footer" not in page.markdown and "¶" not in page.markdown
+    assert page.links == {
+        'internal': [{'href': 'https://example.com/docs/object.html#put', 'text': 'bucket object'}],
+        'external': [{'href': 'https://other.example.org/ref', 'text': 'the reference'}],
+    }
+    assert page.internal_links() == [{'href': 'https://example.com/docs/object.html', 'text': 'bucket object'}]
+
+
+def test_static_result_without_config_converts_the_page():
+    page = adapt_result(static_result())
+    assert "Nav link" in page.markdown and "Article footer" in page.markdown
+    assert len(page.links['internal']) == 3
+
+
+def test_static_result_missing_the_selector_is_empty():
+    page = adapt_result(static_result(), config=SimpleNamespace(css_selector="main"))
+    assert page.markdown == "" and page.links == {}
+
+
+def test_crawl4ai_result_is_read_as_is():
+    markdown = SimpleNamespace(raw_markdown="# Raw", fit_markdown="# Fit")
+    links = {'internal': [{'href': '/a', 'text': 'A'}]}
+    result = SimpleNamespace(success=True, url="https://example.com/", html=PAGE, markdown_v2=markdown,
+                             links=links, metadata={'title': 'From metadata'})
+    page = adapt_result(result, config=SimpleNamespace(css_selector="article"))
+    assert (page.markdown, page.fit_markdown, page.content) == ("# Raw", "# Fit", "# Fit")
+    assert page.links is links and page.title == "From metadata"
+
+
+def test_failed_result_is_none():
+    assert adapt_result(SimpleNamespace(success=False, html=PAGE)) is None
+    assert adapt_result(None) is None